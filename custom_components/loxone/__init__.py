@@ -14,7 +14,6 @@ from functools import cached_property
 
 import homeassistant.components.group as group
 import voluptuous as vol
-import websockets
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (CONF_HOST, CONF_PASSWORD, CONF_PORT,
                                  CONF_USERNAME, EVENT_COMPONENT_LOADED,
@@ -31,22 +30,29 @@ from homeassistant.helpers.entity import Entity
 from homeassistant.setup import async_setup_component
 
 from .const import (ATTR_AREA_CREATE, ATTR_CODE, ATTR_COMMAND, ATTR_DEVICE,
-                    ATTR_UUID, ATTR_VALUE,
+                    ATTR_UUID, ATTR_VALUE, CONF_COMMAND_ENCRYPTION,
+                    CONF_FILTER_UNUSED_STATES, CONF_FIRE_STATE_EVENTS,
                     CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN, CONF_SCENE_GEN,
-                    CONF_SCENE_GEN_DELAY, CONF_VERIFY_SSL, DEFAULT,
-                    DEFAULT_DELAY_SCENE, DEFAULT_PORT, DEFAULT_VERIFY_SSL,
-                    DOMAIN, DOMAIN_DEVICES, ERROR_VALUE, EVENT, LOXONE_PLATFORMS,
+                    CONF_SCENE_GEN_DELAY, CONF_STATE_EVENT_UUIDS,
+                    CONF_STATE_WRITE_DELAY, CONF_VERIFY_SSL, DEFAULT,
+                    DEFAULT_COMMAND_ENCRYPTION, DEFAULT_DELAY_SCENE,
+                    DEFAULT_FILTER_UNUSED_STATES, DEFAULT_FIRE_STATE_EVENTS,
+                    DEFAULT_PORT, DEFAULT_STATE_EVENT_UUIDS,
+                    DEFAULT_STATE_WRITE_DELAY, DEFAULT_VERIFY_SSL, DOMAIN,
+                    DOMAIN_DEVICES, ERROR_VALUE, EVENT, LOXONE_PLATFORMS,
                     SECUREDSENDDOMAIN, SENDDOMAIN, cfmt)
 from .coordinator import LoxoneCoordinator
 from .helpers import get_miniserver_type
 from .miniserver import MiniServer, get_miniserver_from_hass
 from .pyloxone_api.connection import LoxoneConnection
-from .pyloxone_api.exceptions import (LoxoneConnectionClosedOk,
+from .pyloxone_api.exceptions import (LoxoneCommandSupersededError,
+                                      LoxoneConnectionClosedOk,
                                       LoxoneConnectionError, LoxoneException,
-                                      LoxoneOutOfServiceException,
                                       LoxoneServiceUnAvailableError,
-                                      LoxoneTokenError,
+                                      LoxoneStructureChangedError,
                                       LoxoneUnauthorisedError)
+from .pyloxone_api.helper import get_control_state_uuids
+from .pyloxone_api.outbound_queue import Lane
 
 REQUIREMENTS = ["websockets", "pycryptodome", "numpy"]
 
@@ -191,6 +197,21 @@ async def async_set_options(hass, config_entry):
         CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN: options_in.pop(
             CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN, ""
         ),
+        CONF_FILTER_UNUSED_STATES: options_in.pop(
+            CONF_FILTER_UNUSED_STATES, DEFAULT_FILTER_UNUSED_STATES
+        ),
+        CONF_FIRE_STATE_EVENTS: options_in.pop(
+            CONF_FIRE_STATE_EVENTS, DEFAULT_FIRE_STATE_EVENTS
+        ),
+        CONF_STATE_EVENT_UUIDS: options_in.pop(
+            CONF_STATE_EVENT_UUIDS, DEFAULT_STATE_EVENT_UUIDS
+        ),
+        CONF_STATE_WRITE_DELAY: options_in.pop(
+            CONF_STATE_WRITE_DELAY, DEFAULT_STATE_WRITE_DELAY
+        ),
+        CONF_COMMAND_ENCRYPTION: options_in.pop(
+            CONF_COMMAND_ENCRYPTION, DEFAULT_COMMAND_ENCRYPTION
+        ),
     }
     hass.config_entries.async_update_entry(
         config_entry, data=config_entry.data, options=options
@@ -322,53 +343,31 @@ async def async_setup_entry(hass, config_entry):
         await hass.services.async_call("loxone", "reload")
 
     def handle_task_result(task: asyncio.Task) -> None:
+        # Lost connections are resumed by the api, after a rejected token
+        # with a new one. Only what it cannot recover from ends up here.
         try:
             task.result()
-        except LoxoneTokenError as e:
-            _LOGGER.debug(
-                "Token is not valid anymore. Delete token and try to reloading Loxone integration."
-            )
-            # First we delete the invalid token then try to reload
-            hass.config_entries.async_update_entry(
-                config_entry,
-                data={
-                    "token": "",
-                    "hash_alg": "",
-                    "valid_until": "",
-                },
-            )
-            # Loxone-Integration neu laden
-            hass.async_create_task(_reload_after_delay(1.0))
-        except LoxoneOutOfServiceException as e:
-            _LOGGER.debug(
-                "Loxone LoxoneOutOfServiceException received. Try to reloading Loxone integration."
+        except LoxoneStructureChangedError as e:
+            _LOGGER.info(
+                f"Loxone configuration changed ({e}). Reloading Loxone integration."
             )
-            # Loxone-Integration neu laden
             hass.async_create_task(_reload_after_delay(1.0))
-        except LoxoneConnectionError as e:
-            _LOGGER.debug(
-                "Loxone LoxoneConnectionError received. Try to reloading Loxone integration."
+        except LoxoneUnauthorisedError:
+            _LOGGER.error(
+                "Could not reconnect to Loxone Miniserver. Unauthorised. Please check username and password."
             )
-            # Loxone-Integration neu laden
-            hass.async_create_task(_reload_after_delay(1.0))
-        except (
-            LoxoneConnectionClosedOk,
-            websockets.exceptions.ConnectionClosedOK,
-        ) as e:
-            _LOGGER.debug(
-                "Loxone LoxoneConnectionClosedOk received. Mostly a timeout Problem. Try to reloading Loxone integration."
-            )
-            # Loxone-Integration neu laden
-            hass.async_create_task(_reload_after_delay(1.0))
+            coordinator.async_set_connected(False)
         except asyncio.exceptions.CancelledError as e:
             _LOGGER.error(e)
         except Exception as e:
             raise e
 
     async def message_callback(message):
-        """Fire message on HomeAssistant Bus."""
+        """Hand message to the entities and fire it on HomeAssistant Bus."""
         _LOGGER.debug(f"{message}")
-        hass.bus.async_fire(EVENT, message)
+        await coordinator.async_dispatch_states(message)
+        if event_data := coordinator.state_event_data(message):
+            hass.bus.async_fire(EVENT, event_data)
 
     async def handle_websocket_command(call):
         """Handle websocket command services."""
@@ -380,7 +379,18 @@ async def async_setup_entry(hass, config_entry):
             entity_id = call.data.get(ATTR_DEVICE)
             entity = entity_registry.async_get(entity_id)
             entity_uuid = entity.unique_id
-        await coordinator.api.send_websocket_command(entity_uuid, value)
+        # Service calls come from scripts and automations, entities use
+        # SENDDOMAIN events which are sent in the interactive lane.
+        await coordinator.api.send_websocket_command(entity_uuid, value, lane=Lane.BULK)
+
+    async def send_secured_command(device_uuid, value, code):
+        try:
+            await coordinator.api.send_secured__websocket_command(
+                device_uuid, value, code
+            )
+        except LoxoneCommandSupersededError as e:
+            # A newer command for the same control is sent instead
+            _LOGGER.debug(e)
 
     async def handle_secured_websocket_command(call):
         """Handle websocket command services."""
@@ -393,7 +403,7 @@ async def async_setup_entry(hass, config_entry):
             entity_id = call.data.get(ATTR_DEVICE)
             entity = entity_registry.async_get(entity_id)
             entity_uuid = entity.unique_id
-        await coordinator.api.send_secured__websocket_command(entity_uuid, value, code)
+        await send_secured_command(entity_uuid, value, code)
 
     async def sync_areas_with_loxone(data={}):
         create_areas = data.get(ATTR_AREA_CREATE, DEFAULT)
@@ -568,7 +578,10 @@ async def async_setup_entry(hass, config_entry):
     async def start_event():
         try:
             listening_task = asyncio.create_task(
-                coordinator.api.start_listening(callback=message_callback)
+                coordinator.api.start_listening(
+                    callback=message_callback,
+                    connection_callback=coordinator.async_set_connected,
+                )
             )
             listening_task.add_done_callback(handle_task_result)
 
@@ -576,16 +589,8 @@ async def async_setup_entry(hass, config_entry):
             raise e
 
     async def stop_event(_):
-        token = coordinator.api.get_token_dict()
-        hass.config_entries.async_update_entry(
-            config_entry,
-            data={
-                **config_entry.data,  # preserve existing data
-                "token": token["token"],
-                "hash_alg": token["hash_alg"],
-                "valid_until": token["valid_until"],
-            },
-        )
+        coordinator.async_token_changed(coordinator.api.get_token_dict())
+        coordinator.async_save_token()
         await coordinator.api.close()
 
     async def loxone_send(event):
@@ -613,11 +618,7 @@ async def async_setup_entry(hass, config_entry):
                     value = DEFAULT
                 if device_uuid is None:
                     device_uuid = DEFAULT
-                _ = asyncio.create_task(
-                    coordinator.api.send_secured__websocket_command(
-                        device_uuid, value, code
-                    )
-                )
+                _ = asyncio.create_task(send_secured_command(device_uuid, value, code))
 
         except Exception as e:
             _LOGGER.error(e)
@@ -675,6 +676,10 @@ class LoxoneEntity(Entity):
                     sys.exit(-1)
 
         self.listener = None
+        self._connection_listener = None
+        self._coordinator = None
+        self._state_write_delay = 0.0
+        self._state_write_handle: asyncio.Handle | None = None
 
         # Initialize base extra state attributes with common Loxone fields
         self._attr_extra_state_attributes = {
@@ -688,17 +693,100 @@ class LoxoneEntity(Entity):
         if "cat" in kwargs and kwargs["cat"]:
             self._attr_extra_state_attributes["category"] = kwargs["cat"]
 
+    @property
+    def state_uuids(self) -> set[str]:
+        """Return the uuids of all states this entity listens to."""
+        control = {
+            "uuidAction": getattr(self, "uuidAction", None),
+            "states": getattr(self, "states", None) or {},
+            "subControls": getattr(self, "subControls", None) or {},
+        }
+        return {uuid for uuid in get_control_state_uuids(control) if uuid}
+
     async def async_added_to_hass(self):
-        """Subscribe to device events."""
-        self.listener = self.hass.bus.async_listen(EVENT, self.event_handler)
+        """Subscribe to the states of the device."""
+        coordinator = None
+        if self.platform and self.platform.config_entry:
+            coordinator = self.hass.data.get(DOMAIN, {}).get(
+                self.platform.config_entry.entry_id
+            )
+        if coordinator is not None:
+            self._coordinator = coordinator
+            self._state_write_delay = coordinator.state_write_delay
+            self.listener = coordinator.async_subscribe_states(
+                self.state_uuids, self.event_handler
+            )
+            # Written again when the connection is lost or back
+            self._connection_listener = coordinator.async_add_listener(
+                self.async_schedule_state_write
+            )
+        else:
+            self.listener = self.hass.bus.async_listen(EVENT, self.event_handler)
 
     async def async_will_remove_from_hass(self):
         """Disconnect callbacks."""
+        if self.listener is not None:
+            self.listener()
         self.listener = None
+        if self._connection_listener is not None:
+            self._connection_listener()
+            self._connection_listener = None
+        if self._state_write_handle is not None:
+            self._state_write_handle.cancel()
+            self._state_write_handle = None
+
+    def async_schedule_state_write(self) -> None:
+        """Write the state once for all updates of a burst of frames.
+
+        Event handlers call this instead of async_write_ha_state. The entity
+        is only marked dirty, the state is written after the frames queued
+        in this event loop iteration are handled, or after the configured
+        state write delay.
+        """
+        if self._state_write_handle is not None:
+            return
+        if self._state_write_delay:
+            self._state_write_handle = self.hass.loop.call_later(
+                self._state_write_delay, self._write_state
+            )
+        else:
+            self._state_write_handle = self.hass.loop.call_soon(self._write_state)
+
+    def _write_state(self) -> None:
+        self._state_write_handle = None
+        self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        """Unavailable while the connection to the Miniserver is lost."""
+        return super().available and (
+            self._coordinator is None or self._coordinator.last_update_success
+        )
 
     async def event_handler(self, e):
         pass
 
+    def get_stored_state(self, state: str, default=None):
+        """Return the current value of a state of this entity by name.
+
+        The value is read from the state store of the coordinator, so the
+        entity does not need to keep its own copy.
+        """
+        uuid = (getattr(self, "states", None) or {}).get(state)
+        if isinstance(uuid, list):
+            # e.g. the "temperatures" of a room controller
+            if self._coordinator is None:
+                return default
+            store = self._coordinator.states
+            return [store.get(u) for u in uuid if u in store]
+        return self.get_stored_value(uuid, default)
+
+    def get_stored_value(self, uuid: str, default=None):
+        """Return the current value of a state by uuid, see get_stored_state."""
+        if self._coordinator is None or not isinstance(uuid, str):
+            return default
+        return self._coordinator.states.get(uuid, default)
+
     @cached_property
     def name(self):
         return self._attr_name
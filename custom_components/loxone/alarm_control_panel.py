@@ -18,8 +18,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import DOMAIN, SECUREDSENDDOMAIN, SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 DEFAULT_NAME = "Loxone Alarm"
@@ -27,6 +26,17 @@ DEFAULT_FORCE_UPDATE = False
 
 _LOGGER = logging.getLogger(__name__)
 
+# States of the alarm control, read from the state store
+_ALARM_STATES = (
+    "armed",
+    "disabledMove",
+    "armedAt",
+    "nextLevelAt",
+    "armedDelay",
+    "armedDelayTotal",
+    "level",
+)
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_PASSWORD): cv.string,
@@ -54,10 +64,9 @@ async def async_setup_entry(
 ) -> None:
     """Set up Loxone Alarms."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
-    for loxone_alarm in get_all(loxconfig, "Alarm"):
-        loxone_alarm = add_room_and_cat_to_value_values(loxconfig, loxone_alarm)
+    for loxone_alarm in miniserver.index.get_all("Alarm"):
+        loxone_alarm = add_room_and_cat_to_value_values(miniserver.index, loxone_alarm)
         loxone_alarm.update({"code": None})
         new_alarm = LoxoneAlarm(**loxone_alarm)
         entities.append(new_alarm)
@@ -69,13 +78,6 @@ async def async_setup_entry(
 class LoxoneAlarm(LoxoneEntity, AlarmControlPanelEntity):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._state = 0.0
-        self._disabled_move = 0.0
-        self._level = 0.0
-        self._armed_delay = 0.0
-        self._armed_delay_total_delay = 0.0
-        self._armed_at = 0
-        self._next_level_at = 0
         self._code = str(kwargs["code"]) if kwargs["code"] else None
         self._attr_device_info = get_or_create_device(
             self.unique_id, self.name, "Alarm", self.room
@@ -99,61 +101,35 @@ class LoxoneAlarm(LoxoneEntity, AlarmControlPanelEntity):
         return self.isSecured
 
     async def event_handler(self, e):
-        request_update = False
-        if self.states["armed"] in e.data:
-            self._state = e.data[self.states["armed"]]
-            request_update = True
-
-        if self.states["disabledMove"] in e.data:
-            self._disabled_move = e.data[self.states["disabledMove"]]
-            request_update = True
-
-        if "armedAt" in self.states and self.states["armedAt"] in e.data:
-            self._armed_at = e.data[self.states["armedAt"]]
-            request_update = True
-
-        if "nextLevelAt" in self.states and self.states["nextLevelAt"] in e.data:
-            self._next_level_at = e.data[self.states["nextLevelAt"]]
-            request_update = True
-
-        if self.states["armedDelay"] in e.data:
-            self._armed_delay = e.data[self.states["armedDelay"]]
-            request_update = True
-
-        if self.states["armedDelayTotal"] in e.data:
-            self._armed_delay_total_delay = e.data[self.states["armedDelayTotal"]]
-            request_update = True
-
-        if self.states["level"] in e.data:
-            self._level = e.data[self.states["level"]]
-            request_update = True
-
-        if request_update:
-            self.async_schedule_update_ha_state()
+        if any(
+            name in self.states and self.states[name] in e.data
+            for name in _ALARM_STATES
+        ):
+            self.async_schedule_state_write()
 
     @property
     def armed_at(self):
-        return self._armed_at
+        return self.get_stored_state("armedAt", 0)
 
     @property
     def next_level_at(self):
-        return self._next_level_at
+        return self.get_stored_state("nextLevelAt", 0)
 
     @property
     def armed_delay(self):
-        return self._armed_delay
+        return self.get_stored_state("armedDelay", 0.0)
 
     @property
     def armed_delay_total_delay(self):
-        return self._armed_delay_total_delay
+        return self.get_stored_state("armedDelayTotal", 0.0)
 
     @property
     def disabled_move(self):
-        return self._disabled_move
+        return self.get_stored_state("disabledMove", 0.0)
 
     @property
     def level(self):
-        return self._level
+        return self.get_stored_state("level", 0.0)
 
     @property
     def hidden(self) -> bool:
@@ -215,13 +191,14 @@ class LoxoneAlarm(LoxoneEntity, AlarmControlPanelEntity):
     @property
     def alarm_state(self) -> AlarmControlPanelState | None:
         """Return the state of the device."""
-        if self._level >= 1.0:
+        armed = self.get_stored_state("armed", 0.0)
+        if self.level >= 1.0:
             return AlarmControlPanelState.TRIGGERED
-        if self._armed_delay or self._armed_at:
+        if self.armed_delay or self.armed_at:
             return AlarmControlPanelState.ARMING
-        if self._state and self._disabled_move:
+        if armed and self.disabled_move:
             return AlarmControlPanelState.ARMED_HOME
-        if self._state:
+        if armed:
             return AlarmControlPanelState.ARMED_AWAY
         return AlarmControlPanelState.DISARMED
 
@@ -231,11 +208,11 @@ class LoxoneAlarm(LoxoneEntity, AlarmControlPanelEntity):
         return {
             **self._attr_extra_state_attributes,
             "device_type": self.type,
-            "level": self._level,
-            "armed_at": self._armed_at,
-            "next_level_at": self._next_level_at,
-            "armed_delay": self._armed_delay,
-            "armed_delay_total_delay": self._armed_delay_total_delay,
+            "level": self.level,
+            "armed_at": self.armed_at,
+            "next_level_at": self.next_level_at,
+            "armed_delay": self.armed_delay,
+            "armed_delay_total_delay": self.armed_delay_total_delay,
         }
 
     def _validate_code(self, code):
@@ -21,8 +21,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import CONF_ACTIONID, DOMAIN, SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -62,21 +61,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for sensor in get_all(loxconfig, "InfoOnlyDigital"):
-        sensor = add_room_and_cat_to_value_values(loxconfig, sensor)
+    for sensor in miniserver.index.get_all("InfoOnlyDigital"):
+        sensor = add_room_and_cat_to_value_values(miniserver.index, sensor)
         sensor.update({"type": "digital"})
         entities.append(LoxoneDigitalSensor(**sensor))
 
-    for sensor in get_all(loxconfig, "PresenceDetector"):
-        sensor = add_room_and_cat_to_value_values(loxconfig, sensor)
+    for sensor in miniserver.index.get_all("PresenceDetector"):
+        sensor = add_room_and_cat_to_value_values(miniserver.index, sensor)
         sensor.update({"type": "presence"})
         entities.append(LoxoneDigitalSensor(**sensor))
 
-    for sensor in get_all(loxconfig, "SmokeAlarm"):
-        sensor = add_room_and_cat_to_value_values(loxconfig, sensor)
+    for sensor in miniserver.index.get_all("SmokeAlarm"):
+        sensor = add_room_and_cat_to_value_values(miniserver.index, sensor)
         sensor.update({"type": "smoke"})
         entities.append(LoxoneDigitalSensor(**sensor))
 
@@ -123,11 +121,8 @@ class LoxoneDigitalSensor(LoxoneEntity, BinarySensorEntity):
         else:
             self._state_uuid = self.uuidAction
 
-        self._state = STATE_UNKNOWN
         self._format = self._get_format(kwargs.get("details", {}).get("format", ""))
         self._parent_id = kwargs.get("parent_id", None)
-        self._on_state = STATE_ON
-        self._off_state = STATE_OFF
         self._attr_available = True
         if self.type in LOXONE_DEVICE_CLASS_MAP:
             self._attr_device_class = LOXONE_DEVICE_CLASS_MAP[self.type]
@@ -162,14 +157,9 @@ class LoxoneDigitalSensor(LoxoneEntity, BinarySensorEntity):
 
     async def event_handler(self, e):
         if self._state_uuid in e.data:
-            self._state = e.data[self._state_uuid]
-            if self._state == 1.0:
-                self._state = self._on_state
-            else:
-                self._state = self._off_state
             if not self._attr_available:
                 self._attr_available = True
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @final
     @property
@@ -182,7 +172,7 @@ class LoxoneDigitalSensor(LoxoneEntity, BinarySensorEntity):
     @property
     def is_on(self) -> bool | None:
         """Return true if sensor is on."""
-        return self._state == self._on_state
+        return self.get_stored_value(self._state_uuid) == 1.0
 
 
 class LoxoneCustomBinarySensor(LoxoneEntity, BinarySensorEntity):
@@ -217,7 +207,7 @@ class LoxoneCustomBinarySensor(LoxoneEntity, BinarySensorEntity):
                 self._state = self._on_state
             else:
                 self._state = self._off_state
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def name(self):
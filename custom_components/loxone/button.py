@@ -19,7 +19,7 @@ from homeassistant.util import dt as dt_util
 
 from . import LoxoneEntity
 from .const import DOMAIN, SENDDOMAIN
-from .helpers import add_room_and_cat_to_value_values, get_all
+from .helpers import add_room_and_cat_to_value_values
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,11 +42,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for button_entity in get_all(loxconfig, ["Pushbutton"]):
-        button_entity = add_room_and_cat_to_value_values(loxconfig, button_entity)
+    for button_entity in miniserver.index.get_all(["Pushbutton"]):
+        button_entity = add_room_and_cat_to_value_values(
+            miniserver.index, button_entity
+        )
         entities.append(LoxoneButton(**button_entity))
 
     async_add_entities(entities)
@@ -63,7 +64,6 @@ class LoxoneButton(LoxoneEntity, ButtonEntity):
         self._attr_icon = None
         self._attr_unique_id = self.uuidAction
         self._attr_state = None
-        self._state_value = None
 
     @property
     def icon(self):
@@ -91,11 +91,10 @@ class LoxoneButton(LoxoneEntity, ButtonEntity):
                 new_state = True if active == 1.0 else False
                 if new_state != self._attr_state:
                     self._attr_state = new_state
-                    self._state_value = active
                     self.__set_state(dt_util.utcnow().isoformat())
                     request_update = True
         if request_update:
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @cached_property
     def unique_id(self) -> str:
@@ -114,7 +113,7 @@ class LoxoneButton(LoxoneEntity, ButtonEntity):
             **self._attr_extra_state_attributes,
             "state_uuid": self.states["active"],
             "new_state": self._attr_state,
-            "state_value": self._state_value,
+            "state_value": self.get_stored_state("active"),
             "device_type": self.type,
         }
 
@@ -21,8 +21,7 @@ from voluptuous import All, Optional, Range
 
 from . import LoxoneEntity
 from .const import CONF_HVAC_AUTO_MODE, SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -77,11 +76,10 @@ async def async_setup_entry(
 ) -> None:
     """Set up LoxoneRoomControllerV2."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for climate in get_all(loxconfig, "IRoomControllerV2"):
-        climate = add_room_and_cat_to_value_values(loxconfig, climate)
+    for climate in miniserver.index.get_all("IRoomControllerV2"):
+        climate = add_room_and_cat_to_value_values(miniserver.index, climate)
         climate.update(
             {
                 "hass": hass,
@@ -90,8 +88,8 @@ async def async_setup_entry(
         )
         entities.append(LoxoneRoomControllerV2(**climate))
 
-    for climate in get_all(loxconfig, "IRoomController"):
-        climate = add_room_and_cat_to_value_values(loxconfig, climate)
+    for climate in miniserver.index.get_all("IRoomController"):
+        climate = add_room_and_cat_to_value_values(miniserver.index, climate)
         climate.update(
             {
                 "hass": hass,
@@ -100,8 +98,8 @@ async def async_setup_entry(
         )
         entities.append(LoxoneRoomController(**climate))
 
-    for accontrol in get_all(loxconfig, "AcControl"):
-        accontrol = add_room_and_cat_to_value_values(loxconfig, accontrol)
+    for accontrol in miniserver.index.get_all("AcControl"):
+        accontrol = add_room_and_cat_to_value_values(miniserver.index, accontrol)
         accontrol.update(
             {
                 "hass": hass,
@@ -124,7 +122,6 @@ class LoxoneRoomController(LoxoneEntity, ClimateEntity, ABC):
         self.hass = kwargs["hass"]
         self._autoMode = kwargs[CONF_HVAC_AUTO_MODE]
         self._stateAttribUuids = kwargs["states"]
-        self._stateAttribValues = {}
         self.type = "RoomController"
 
         # Set supported features
@@ -147,51 +144,30 @@ class LoxoneRoomController(LoxoneEntity, ClimateEntity, ABC):
         )
 
     async def event_handler(self, event):
-        update = False
-
-        for key in self._all_uuids & event.data.keys():
-            self._stateAttribValues[key] = event.data[key]
-            update = True
-
-        if update:
-            self.async_write_ha_state()
-
-    def get_state_value(self, name):
-        uuid = self._stateAttribUuids.get(name)
-        if isinstance(uuid, list):
-            # For "temperatures" which is a list of UUIDs
-            return [
-                self._stateAttribValues.get(u)
-                for u in uuid
-                if u in self._stateAttribValues
-            ]
-        return (
-            self._stateAttribValues[uuid]
-            if uuid and uuid in self._stateAttribValues
-            else None
-        )
+        if not self._all_uuids.isdisjoint(event.data.keys()):
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
         """Return device specific state attributes."""
         return {
             **self._attr_extra_state_attributes,
-            "mode": self.get_state_value("mode"),
-            "override": self.get_state_value("override"),
-            "open_window": self.get_state_value("openWindow"),
-            "curr_heat_temp_ix": self.get_state_value("currHeatTempIx"),
-            "curr_cool_temp_ix": self.get_state_value("currCoolTempIx"),
+            "mode": self.get_stored_state("mode"),
+            "override": self.get_stored_state("override"),
+            "open_window": self.get_stored_state("openWindow"),
+            "curr_heat_temp_ix": self.get_stored_state("currHeatTempIx"),
+            "curr_cool_temp_ix": self.get_stored_state("currCoolTempIx"),
         }
 
     @property
     def current_temperature(self):
         """Return the current temperature."""
-        return self.get_state_value("tempActual")
+        return self.get_stored_state("tempActual")
 
     @property
     def target_temperature(self) -> float | None:
         """Return the temperature we try to reach."""
-        return self.get_state_value("tempTarget")
+        return self.get_stored_state("tempTarget")
 
     def set_temperature(self, **kwargs):
         """Set new target temperature"""
@@ -201,12 +177,12 @@ class LoxoneRoomController(LoxoneEntity, ClimateEntity, ABC):
 
         # IRoomController uses setTemp with current temperature index
         # Get the current active temperature index based on mode
-        mode = self.get_state_value("mode")
+        mode = self.get_stored_state("mode")
 
         # Determine which temperature index to use
-        temp_idx = self.get_state_value("currHeatTempIx")
+        temp_idx = self.get_stored_state("currHeatTempIx")
         if mode == 2:  # Cooling mode
-            cool_idx = self.get_state_value("currCoolTempIx")
+            cool_idx = self.get_stored_state("currCoolTempIx")
             if cool_idx is not None:
                 temp_idx = cool_idx
 
@@ -224,15 +200,15 @@ class LoxoneRoomController(LoxoneEntity, ClimateEntity, ABC):
     @property
     def hvac_action(self) -> HVACAction | None:
         """Return the current HVAC action (heating, cooling)."""
-        valve_heat = self.get_state_value("valveHeat")
-        valve_cool = self.get_state_value("valveCool")
+        valve_heat = self.get_stored_state("valveHeat")
+        valve_cool = self.get_stored_state("valveCool")
 
         if valve_heat and valve_heat > 0:
             return HVACAction.HEATING
         elif valve_cool and valve_cool > 0:
             return HVACAction.COOLING
 
-        if self.get_state_value("isPreparing") == 1:
+        if self.get_stored_state("isPreparing") == 1:
             return HVACAction.PREHEATING
 
         return HVACAction.IDLE
@@ -240,7 +216,7 @@ class LoxoneRoomController(LoxoneEntity, ClimateEntity, ABC):
     @property
     def hvac_mode(self) -> HVACMode | None:
         """Return hvac operation mode."""
-        mode = self.get_state_value("mode")
+        mode = self.get_stored_state("mode")
 
         # mode: 0=Auto, 1=Heat, 2=Cool, 3=Heat/Cool, 4=Off
         if mode == 0:
@@ -332,7 +308,6 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
         self.hass = kwargs["hass"]
         self._autoMode = kwargs[CONF_HVAC_AUTO_MODE]
         self._stateAttribUuids = kwargs["states"]
-        self._stateAttribValues = {}
         self.type = "RoomControllerV2"
         self._modeList = kwargs["details"]["timerModes"]
 
@@ -347,22 +322,8 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
 
     async def event_handler(self, event):
         # _LOGGER.debug(f"Climate Event data: {event.data}")
-        update = False
-
-        for key in set(self._stateAttribUuids.values()) & event.data.keys():
-            self._stateAttribValues[key] = event.data[key]
-            update = True
-
-        if update:
-            self.schedule_update_ha_state()
-
-        # _LOGGER.debug(f"State attribs after event handling: {self._stateAttribValues}")
-
-    def get_state_value(self, name):
-        uuid = self._stateAttribUuids[name]
-        return (
-            self._stateAttribValues[uuid] if uuid in self._stateAttribValues else None
-        )
+        if not event.data.keys().isdisjoint(self._stateAttribUuids.values()):
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -381,7 +342,7 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
         true = True
         false = False
         null = None
-        _override_entries = self.get_state_value("overrideEntries")
+        _override_entries = self.get_stored_state("overrideEntries")
         if _override_entries:
             _override_entries = eval(_override_entries)
             if isinstance(_override_entries, list) and len(_override_entries) > 0:
@@ -391,12 +352,12 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
     @property
     def current_temperature(self):
         """Return the current temperature."""
-        return self.get_state_value("tempActual")
+        return self.get_stored_state("tempActual")
 
     def set_temperature(self, **kwargs):
         """Set new target temperature"""
         if (
-            self.get_state_value("operatingMode") > 2
+            self.get_stored_state("operatingMode") > 2
         ):  # Set manual temp if any of the manual modes selected
             self.hass.bus.fire(
                 SENDDOMAIN,
@@ -406,7 +367,7 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
                 ),
             )
         else:  # Set comfort temp offset otherwise
-            new_offset = kwargs["temperature"] - self.get_state_value(
+            new_offset = kwargs["temperature"] - self.get_stored_state(
                 "comfortTemperature"
             )
             self.hass.bus.fire(
@@ -417,7 +378,7 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
     @property
     def hvac_action(self) -> HVACAction | None:
         """Return the current HVAC action (heating, cooling)."""
-        if self.get_state_value("prepareState") == 1:
+        if self.get_stored_state("prepareState") == 1:
             return HVACAction.PREHEATING
         return None  # return none due to unknown other state (HVACAction.IDLE, HVACAction.COOLING, HVACAction.HEATING)
 
@@ -427,7 +388,7 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
 
         Need to be one of HVAC_MODE_*.
         """
-        return OPMODES[self.get_state_value("operatingMode")]
+        return OPMODES[self.get_stored_state("operatingMode")]
 
     @property
     def hvac_modes(self) -> list[HVACMode]:
@@ -467,7 +428,7 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
     def target_temperature(self) -> float | None:
         """Return the temperature we try to reach."""
 
-        return self.get_state_value("tempTarget")
+        return self.get_stored_state("tempTarget")
 
     @property
     def target_temperature_step(self) -> float | None:
@@ -481,7 +442,7 @@ class LoxoneRoomControllerV2(LoxoneEntity, ClimateEntity, ABC):
         Requires SUPPORT_PRESET_MODE.
         """
         # return self._activeMode
-        return self.get_mode_from_id(self.get_state_value("activeMode"))
+        return self.get_mode_from_id(self.get_stored_state("activeMode"))
 
     @property
     def preset_modes(self):
@@ -539,7 +500,6 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
         self.hass = kwargs["hass"]
 
         self._stateAttribUuids = kwargs["states"]
-        self._stateAttribValues = {}
         self.type = "AcControl"
         self._attr_device_info = get_or_create_device(
             self.unique_id, self.name, self.type, self.room
@@ -547,22 +507,8 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
 
     async def event_handler(self, event):
         # _LOGGER.debug(f"Climate Event data: {event.data}")
-        update = False
-
-        for key in set(self._stateAttribUuids.values()) & event.data.keys():
-            self._stateAttribValues[key] = event.data[key]
-            update = True
-
-        if update:
-            self.schedule_update_ha_state()
-
-        # _LOGGER.debug(f"State attribs after event handling: {self._stateAttribValues}")
-
-    def get_state_value(self, name):
-        uuid = self._stateAttribUuids[name]
-        return (
-            self._stateAttribValues[uuid] if uuid in self._stateAttribValues else None
-        )
+        if not event.data.keys().isdisjoint(self._stateAttribUuids.values()):
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -578,7 +524,7 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
     @property
     def current_temperature(self):
         """Return the current temperature."""
-        return self.get_state_value("temperature")
+        return self.get_stored_state("temperature")
 
     def set_temperature(self, **kwargs):
         """Set new target temperature"""
@@ -599,14 +545,14 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
 
         Need to be one of HVAC_MODE_*.
         """
-        if self.get_state_value("status"):
-            if self.get_state_value("mode") == 2:
+        if self.get_stored_state("status"):
+            if self.get_stored_state("mode") == 2:
                 return HVACMode.HEAT
-            elif self.get_state_value("mode") == 3:
+            elif self.get_stored_state("mode") == 3:
                 return HVACMode.COOL
-            elif self.get_state_value("mode") == 4:
+            elif self.get_stored_state("mode") == 4:
                 return HVACMode.DRY
-            elif self.get_state_value("mode") == 5:
+            elif self.get_stored_state("mode") == 5:
                 return HVACMode.FAN_ONLY
             else:
                 return HVACMode.AUTO
@@ -670,7 +616,7 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
     def target_temperature(self) -> float | None:
         """Return the temperature we try to reach."""
 
-        return self.get_state_value("targetTemperature")
+        return self.get_stored_state("targetTemperature")
 
     @property
     def target_temperature_step(self) -> float | None:
@@ -681,11 +627,11 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
     def fan_mode(self) -> str | None:
         """Return current fan mode."""
 
-        if self.get_state_value("fanspeeds") is not None:
-            modes = json.loads(self.get_state_value("fanspeeds"))
+        if self.get_stored_state("fanspeeds") is not None:
+            modes = json.loads(self.get_stored_state("fanspeeds"))
 
             for mode in modes:
-                if self.get_state_value("fan") == mode["id"]:
+                if self.get_stored_state("fan") == mode["id"]:
                     return mode["name"]
 
         return "Auto"
@@ -696,7 +642,7 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
             SENDDOMAIN,
             dict(
                 uuid=self.uuidAction,
-                value=f'setFan/{next((o["id"] for o in json.loads(self.get_state_value("fanspeeds")) if o["name"] == fan_mode), None)}',
+                value=f'setFan/{next((o["id"] for o in json.loads(self.get_stored_state("fanspeeds")) if o["name"] == fan_mode), None)}',
             ),
         )
 
@@ -704,8 +650,8 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
     def fan_modes(self) -> list[str]:
         """Return the list of available hvac operation modes."""
 
-        if self.get_state_value("fanspeeds") is not None:
-            return [o["name"] for o in json.loads(self.get_state_value("fanspeeds"))]
+        if self.get_stored_state("fanspeeds") is not None:
+            return [o["name"] for o in json.loads(self.get_stored_state("fanspeeds"))]
         else:
             return None
 
@@ -713,11 +659,11 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
     def swing_mode(self) -> str | None:
         """Return current swing mode."""
 
-        if self.get_state_value("airflows") is not None:
-            modes = json.loads(self.get_state_value("airflows"))
+        if self.get_stored_state("airflows") is not None:
+            modes = json.loads(self.get_stored_state("airflows"))
 
             for mode in modes:
-                if self.get_state_value("ventMode") == mode["id"]:
+                if self.get_stored_state("ventMode") == mode["id"]:
                     return mode["name"]
 
         return "Auto"
@@ -729,7 +675,7 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
             SENDDOMAIN,
             dict(
                 uuid=self.uuidAction,
-                value=f'setAirDir/{next((o["id"] for o in json.loads(self.get_state_value("airflows")) if o["name"] == swing_mode), None)}',
+                value=f'setAirDir/{next((o["id"] for o in json.loads(self.get_stored_state("airflows")) if o["name"] == swing_mode), None)}',
             ),
         )
 
@@ -737,7 +683,7 @@ class LoxoneAcControl(LoxoneEntity, ClimateEntity, ABC):
     def swing_modes(self) -> list[str]:
         """Return the list of available swing modes."""
 
-        if self.get_state_value("airflows") is not None:
-            return [o["name"] for o in json.loads(self.get_state_value("airflows"))]
+        if self.get_stored_state("airflows") is not None:
+            return [o["name"] for o in json.loads(self.get_stored_state("airflows"))]
         else:
             return None
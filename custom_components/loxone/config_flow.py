@@ -15,14 +15,21 @@ from homeassistant.helpers.schema_config_entry_flow import (
     SchemaFlowFormStep)
 from homeassistant.helpers.selector import (BooleanSelector, NumberSelector,
                                             NumberSelectorConfig,
-                                            NumberSelectorMode, TextSelector,
+                                            NumberSelectorMode, SelectSelector,
+                                            SelectSelectorConfig,
+                                            SelectSelectorMode, TextSelector,
                                             TextSelectorConfig,
                                             TextSelectorType)
 
-from .const import (CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN, CONF_SCENE_GEN,
-                    CONF_SCENE_GEN_DELAY, CONF_VERIFY_SSL,
-                    DEFAULT_DELAY_SCENE, DEFAULT_IP, DEFAULT_PORT,
-                    DEFAULT_VERIFY_SSL, DOMAIN)
+from .const import (CONF_COMMAND_ENCRYPTION, CONF_FILTER_UNUSED_STATES,
+                    CONF_FIRE_STATE_EVENTS,
+                    CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN, CONF_SCENE_GEN,
+                    CONF_SCENE_GEN_DELAY, CONF_STATE_EVENT_UUIDS,
+                    CONF_STATE_WRITE_DELAY, CONF_VERIFY_SSL,
+                    DEFAULT_COMMAND_ENCRYPTION, DEFAULT_DELAY_SCENE,
+                    DEFAULT_FILTER_UNUSED_STATES, DEFAULT_FIRE_STATE_EVENTS,
+                    DEFAULT_IP, DEFAULT_PORT, DEFAULT_STATE_EVENT_UUIDS,
+                    DEFAULT_STATE_WRITE_DELAY, DEFAULT_VERIFY_SSL, DOMAIN)
 
 
 async def validate_loxone_setup(
@@ -51,6 +58,8 @@ async def validate_loxone_setup(
         user_input[CONF_PORT] = int(user_input[CONF_PORT])
     if CONF_SCENE_GEN_DELAY in user_input:
         user_input[CONF_SCENE_GEN_DELAY] = int(user_input[CONF_SCENE_GEN_DELAY])
+    if CONF_STATE_WRITE_DELAY in user_input:
+        user_input[CONF_STATE_WRITE_DELAY] = int(user_input[CONF_STATE_WRITE_DELAY])
 
     return user_input
 
@@ -77,6 +86,30 @@ DATA_SCHEMA_SETUP = vol.Schema(
         vol.Required(
             CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN, default=False
         ): BooleanSelector(),
+        vol.Required(
+            CONF_FILTER_UNUSED_STATES, default=DEFAULT_FILTER_UNUSED_STATES
+        ): BooleanSelector(),
+        vol.Required(
+            CONF_FIRE_STATE_EVENTS, default=DEFAULT_FIRE_STATE_EVENTS
+        ): BooleanSelector(),
+        vol.Optional(
+            CONF_STATE_EVENT_UUIDS, default=DEFAULT_STATE_EVENT_UUIDS
+        ): TextSelector(TextSelectorConfig(type=TextSelectorType.TEXT)),
+        vol.Required(
+            CONF_STATE_WRITE_DELAY, default=DEFAULT_STATE_WRITE_DELAY
+        ): NumberSelector(
+            NumberSelectorConfig(
+                mode=NumberSelectorMode.BOX, min=0, max=1000, unit_of_measurement="ms"
+            )
+        ),
+        vol.Required(
+            CONF_COMMAND_ENCRYPTION, default=DEFAULT_COMMAND_ENCRYPTION
+        ): SelectSelector(
+            SelectSelectorConfig(
+                options=["auto", "always", "full"],
+                mode=SelectSelectorMode.DROPDOWN,
+            )
+        ),
     }
 )
 
@@ -102,6 +135,30 @@ DATA_SCHEMA_OPTIONS = vol.Schema(
         vol.Required(
             CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN, default=False
         ): BooleanSelector(),
+        vol.Required(
+            CONF_FILTER_UNUSED_STATES, default=DEFAULT_FILTER_UNUSED_STATES
+        ): BooleanSelector(),
+        vol.Required(
+            CONF_FIRE_STATE_EVENTS, default=DEFAULT_FIRE_STATE_EVENTS
+        ): BooleanSelector(),
+        vol.Optional(
+            CONF_STATE_EVENT_UUIDS, default=DEFAULT_STATE_EVENT_UUIDS
+        ): TextSelector(TextSelectorConfig(type=TextSelectorType.TEXT)),
+        vol.Required(
+            CONF_STATE_WRITE_DELAY, default=DEFAULT_STATE_WRITE_DELAY
+        ): NumberSelector(
+            NumberSelectorConfig(
+                mode=NumberSelectorMode.BOX, min=0, max=1000, unit_of_measurement="ms"
+            )
+        ),
+        vol.Required(
+            CONF_COMMAND_ENCRYPTION, default=DEFAULT_COMMAND_ENCRYPTION
+        ): SelectSelector(
+            SelectSelectorConfig(
+                options=["auto", "always", "full"],
+                mode=SelectSelectorMode.DROPDOWN,
+            )
+        ),
     }
 )
 
@@ -31,8 +31,15 @@ LOXONE_DEFAULT_PORT = 8080
 ERROR_VALUE = -1
 DEFAULT_PORT = 8080
 DEFAULT_VERIFY_SSL = True
+DEFAULT_FILTER_UNUSED_STATES = False
+DEFAULT_FIRE_STATE_EVENTS = True
+DEFAULT_STATE_EVENT_UUIDS = ""
+DEFAULT_STATE_WRITE_DELAY = 0
+DEFAULT_COMMAND_ENCRYPTION = "auto"
 DEFAULT_DELAY_SCENE = 3
 DEFAULT_IP = ""
+# seconds to collect token changes before writing them to the config entry
+TOKEN_SAVE_DELAY = 5
 
 EVENT = "loxone_event"
 DOMAIN = "loxone"
@@ -56,6 +63,11 @@ CONF_SCENE_GEN = "generate_scenes"
 CONF_SCENE_GEN_DELAY = "generate_scenes_delay"
 CONF_LIGHTCONTROLLER_SUBCONTROLS_GEN = "generate_lightcontroller_subcontrols"
 CONF_VERIFY_SSL = "verify_ssl"
+CONF_FILTER_UNUSED_STATES = "filter_unused_states"
+CONF_FIRE_STATE_EVENTS = "fire_state_events"
+CONF_STATE_EVENT_UUIDS = "state_event_uuids"
+CONF_STATE_WRITE_DELAY = "state_write_delay"
+CONF_COMMAND_ENCRYPTION = "command_encryption"
 DEFAULT_FORCE_UPDATE = False
 
 SUPPORT_SUN_AUTOMATION = 1024
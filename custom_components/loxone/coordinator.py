@@ -1,18 +1,69 @@
+import asyncio
 import logging
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (CONF_HOST, CONF_PASSWORD, CONF_PORT,
                                  CONF_USERNAME)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL
+from .const import (CONF_COMMAND_ENCRYPTION, CONF_FILTER_UNUSED_STATES,
+                    CONF_FIRE_STATE_EVENTS, CONF_STATE_EVENT_UUIDS,
+                    CONF_STATE_WRITE_DELAY, CONF_VERIFY_SSL,
+                    DEFAULT_COMMAND_ENCRYPTION, DEFAULT_FILTER_UNUSED_STATES,
+                    DEFAULT_FIRE_STATE_EVENTS, DEFAULT_STATE_EVENT_UUIDS,
+                    DEFAULT_STATE_WRITE_DELAY, DEFAULT_VERIFY_SSL, DOMAIN,
+                    TOKEN_SAVE_DELAY)
 from .miniserver import MiniServer
 from .pyloxone_api.connection import LoxoneConnection, LoxoneException
+from .pyloxone_api.helper import get_control_state_uuids
+from .pyloxone_api.state_store import StateStore
+from .pyloxone_api.structure_index import StructureIndex
+from .pyloxone_api.structure_snapshot import close_snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
+# Keys of messages which are events, not states. They are handed to the
+# entities even if the value did not change.
+EVENT_KEYS = frozenset({"keep_alive"})
+
+
+@dataclass(slots=True)
+class LoxoneStateEvent:
+    """The dispatched states of one frame, as {state uuid: value}.
+
+    Only the states of the frame which are subscribed and changed are in
+    data, not the whole frame. Passed to LoxoneEntity.event_handler, which
+    reads event.data like the data of a loxone_event bus event.
+    """
+
+    data: dict
+
+
+StateHandler = Callable[[LoxoneStateEvent], Awaitable[None]]
+
+
+def get_event_uuids(option: str, structure: dict) -> frozenset[str] | None:
+    """Parse the state_event_uuids option.
+
+    The option lists state or control uuids separated by commas or spaces.
+    A control uuid stands for all states of the control and its subcontrols.
+    Return None if the option is empty, so every state is fired.
+    """
+    uuids = set()
+    controls = structure.get("controls", {})
+    for uuid in option.replace(",", " ").split():
+        if uuid in controls:
+            uuids.update(get_control_state_uuids(controls[uuid]))
+        else:
+            uuids.add(uuid)
+    return frozenset(uuids) if uuids else None
+
 
 class LoxoneCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the Loxone Miniserver."""
@@ -37,6 +88,27 @@ class LoxoneCoordinator(DataUpdateCoordinator):
         self.api: LoxoneConnection | None = None
         self.miniserver: MiniServer | None = None
         self.listeners = []
+        # current value of every state, the store of the api once connected
+        self.states = StateStore()
+        self.state_uuids: set[str] = set()
+        # state uuid -> handlers of the entities using that state
+        self._state_handlers: dict[str, list[StateHandler]] = {}
+        self._state_filter_scheduled = False
+        # last value handed to the entities, per state uuid
+        self._last_values: dict[str, Any] = {}
+        self._fire_state_events = config_entry.options.get(
+            CONF_FIRE_STATE_EVENTS, DEFAULT_FIRE_STATE_EVENTS
+        )
+        # state uuids fired on the bus, None fires all of them
+        self._event_uuids: frozenset[str] | None = None
+        # seconds an entity waits before writing its updated state
+        self.state_write_delay = (
+            config_entry.options.get(CONF_STATE_WRITE_DELAY, DEFAULT_STATE_WRITE_DELAY)
+            / 1000
+        )
+        # token to write to the config entry, see async_token_changed
+        self._pending_token: dict | None = None
+        self._token_save_handle: asyncio.TimerHandle | None = None
 
     async def async_config_entry_first_refresh(self) -> None:
         _LOGGER.debug("async_config_entry_first_refresh")
@@ -52,6 +124,11 @@ class LoxoneCoordinator(DataUpdateCoordinator):
                 password=self._password,
                 token=self.config_entry.data,
                 verify_ssl=self._verify_ssl,
+                structure_cache_dir=self._structure_cache_dir(),
+                token_callback=self.async_token_changed,
+                command_encryption=self.config_entry.options.get(
+                    CONF_COMMAND_ENCRYPTION, DEFAULT_COMMAND_ENCRYPTION
+                ),
             )
         else:
             self.api = LoxoneConnection(
@@ -60,6 +137,11 @@ class LoxoneCoordinator(DataUpdateCoordinator):
                 username=self._username,
                 password=self._password,
                 verify_ssl=self._verify_ssl,
+                structure_cache_dir=self._structure_cache_dir(),
+                token_callback=self.async_token_changed,
+                command_encryption=self.config_entry.options.get(
+                    CONF_COMMAND_ENCRYPTION, DEFAULT_COMMAND_ENCRYPTION
+                ),
             )
         try:
             session = async_get_clientsession(self.hass)
@@ -71,23 +153,182 @@ class LoxoneCoordinator(DataUpdateCoordinator):
             _LOGGER.error("Could not connect to Loxone Miniserver")
             raise e
 
+        # Both walk the whole structure file, keep them off the event loop
+        index, self.api.states = await asyncio.gather(
+            self.hass.async_add_executor_job(StructureIndex, self.api.structure_file),
+            self.hass.async_add_executor_job(
+                StateStore.from_structure, self.api.structure_file
+            ),
+        )
+        # The decoder of the state tables writes into the store of the api
+        self.states = self.api.states
         self.miniserver = MiniServer(
-            self.hass, self.api.structure_file, self.config_entry
+            self.hass, self.api.structure_file, self.config_entry, index
+        )
+        # Global states (operating mode, sunrise, ...) are always kept.
+        self.state_uuids.update(
+            self.api.structure_file.get("globalStates", {}).values()
+        )
+        self._event_uuids = get_event_uuids(
+            self.config_entry.options.get(
+                CONF_STATE_EVENT_UUIDS, DEFAULT_STATE_EVENT_UUIDS
+            ),
+            self.api.structure_file,
         )
 
         return None
 
-    async def _async_update_data(self) -> None:
-        """Fetch data from API endpoint.
+    def _structure_cache_dir(self) -> str:
+        """Return the directory of the cached structure files.
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
+        Home Assistant versions with a cache directory keep them there,
+        older versions in a subdirectory of .storage.
         """
-        print("_async_update_data")
-        return None
+        cache_path = getattr(self.hass.config, "cache_path", None)
+        if cache_path is not None:
+            return cache_path(DOMAIN)
+        return self.hass.config.path(STORAGE_DIR, DOMAIN)
+
+    def async_register_state_uuids(self, uuids) -> None:
+        """Register state uuids used by an entity.
+
+        With the filter option enabled, states which are not registered by
+        any entity are dropped while decoding the state tables.
+        """
+        self.state_uuids.update(uuids)
+        if self._state_filter_scheduled or not self.config_entry.options.get(
+            CONF_FILTER_UNUSED_STATES, DEFAULT_FILTER_UNUSED_STATES
+        ):
+            return
+        # Entities are added in bursts, apply the filter once per burst.
+        self._state_filter_scheduled = True
+        self.hass.loop.call_soon(self._apply_state_filter)
+
+    def _apply_state_filter(self) -> None:
+        self._state_filter_scheduled = False
+        if self.api is None:
+            return
+        uuids = self.state_uuids
+        # States fired as loxone_event are kept, even if no entity uses them
+        if self._fire_state_events and self._event_uuids:
+            uuids = uuids | self._event_uuids
+        self.api.set_state_filter(uuids)
+
+    def async_subscribe_states(
+        self, uuids: Iterable[str], handler: StateHandler
+    ) -> Callable[[], None]:
+        """Call handler for every frame which changes one of the uuids.
+
+        Return a function which removes the subscription.
+        """
+        uuids = set(uuids)
+        for uuid in uuids:
+            self._state_handlers.setdefault(uuid, []).append(handler)
+            # The new handler has not seen the last value yet
+            self._last_values.pop(uuid, None)
+        self.async_register_state_uuids(uuids)
+
+        def unsubscribe() -> None:
+            for uuid in uuids:
+                handlers = self._state_handlers.get(uuid)
+                if handlers and handler in handlers:
+                    handlers.remove(handler)
+                    if not handlers:
+                        del self._state_handlers[uuid]
+
+        return unsubscribe
+
+    async def async_dispatch_states(self, data: dict) -> None:
+        """Hand the changed states of a frame to the subscribed entities.
+
+        Only the entities using one of the changed states are called, each
+        of them once per frame. A state counts as changed if its value
+        differs from the value last handed to the entities. The Miniserver
+        sends all values again after enabling the status updates.
+        """
+        handlers: dict[StateHandler, None] = {}
+        changed = {}
+        last_values = self._last_values
+        for uuid in data.keys() & self._state_handlers.keys():
+            value = data[uuid]
+            if (
+                uuid in last_values
+                and uuid not in EVENT_KEYS
+                and last_values[uuid] == value
+            ):
+                continue
+            last_values[uuid] = value
+            changed[uuid] = value
+            handlers.update(dict.fromkeys(self._state_handlers[uuid]))
+        if not handlers:
+            return
+        event = LoxoneStateEvent(changed)
+        for handler in handlers:
+            try:
+                await handler(event)
+            except Exception as e:
+                _LOGGER.error(f"Error handling state update: {e}", exc_info=True)
+
+    def async_token_changed(self, token: dict) -> None:
+        """Persist a new or refreshed token in the config entry.
+
+        Changes are collected for TOKEN_SAVE_DELAY seconds, so a token
+        acquired and refreshed in quick succession is written once.
+        """
+        self._pending_token = token
+        if self._token_save_handle is None:
+            self._token_save_handle = self.hass.loop.call_later(
+                TOKEN_SAVE_DELAY, self.async_save_token
+            )
+
+    def async_save_token(self) -> None:
+        """Write a pending token change to the config entry now."""
+        if self._token_save_handle is not None:
+            self._token_save_handle.cancel()
+            self._token_save_handle = None
+        token, self._pending_token = self._pending_token, None
+        if not token:
+            return
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            data={
+                **self.config_entry.data,  # preserve existing data
+                "token": token["token"],
+                "hash_alg": token["hash_alg"],
+                "valid_until": token["valid_until"],
+                "unsecure_password": token["unsecure_password"],
+            },
+        )
+        _LOGGER.debug("Token saved to the config entry")
+
+    def async_set_connected(self, connected: bool) -> None:
+        """Mark the entities unavailable while the connection is lost."""
+        if connected == self.last_update_success:
+            return
+        self.last_update_success = connected
+        self.async_update_listeners()
+
+    def state_event_data(self, data: dict) -> dict | None:
+        """Return the part of a frame to fire as loxone_event, if any."""
+        if not self._fire_state_events:
+            return None
+        if self._event_uuids is None:
+            return data
+        return {
+            uuid: value for uuid, value in data.items() if uuid in self._event_uuids
+        } or None
+
+    async def _async_update_data(self) -> StateStore:
+        """Return the state store.
+
+        Nothing is polled, the Miniserver pushes the state changes, which
+        are written into the store while they are decoded.
+        """
+        return self.states
 
     async def async_cleanup(self):
         """Clean up resources."""
+        self.async_save_token()
         if hasattr(self, "listeners"):
             # Clean up all event listeners
             for listener in self.listeners:
@@ -98,3 +339,4 @@ class LoxoneCoordinator(DataUpdateCoordinator):
         # Close API connection
         if hasattr(self, "api"):
             await self.api.close()
+            close_snapshot(self.api.structure_file)
@@ -24,8 +24,8 @@ from . import LoxoneEntity
 from .const import (SENDDOMAIN, SERVICE_DISABLE_SUN_AUTOMATION,
                     SERVICE_ENABLE_SUN_AUTOMATION, SERVICE_QUICK_SHADE,
                     SUPPORT_QUICK_SHADE, SUPPORT_SUN_AUTOMATION)
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device, map_range)
+from .helpers import (add_room_and_cat_to_value_values, get_or_create_device,
+                      map_range)
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,6 +33,11 @@ _LOGGER = logging.getLogger(__name__)
 NEW_COVERS = "covers"
 
 
+def _percent(value):
+    """Return a state value of 0..1 in percent, None if it is unknown."""
+    return None if value is None else float(value) * 100.0
+
+
 async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
@@ -50,11 +55,10 @@ async def async_setup_entry(
 ) -> None:
     """Set Loxone covers."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for cover in get_all(loxconfig, ["Jalousie", "Gate", "Window"]):
-        cover = add_room_and_cat_to_value_values(loxconfig, cover)
+    for cover in miniserver.index.get_all(["Jalousie", "Gate", "Window"]):
+        cover = add_room_and_cat_to_value_values(miniserver.index, cover)
         cover.update(
             {
                 "hass": hass,
@@ -107,19 +111,11 @@ class LoxoneGate(LoxoneEntity, CoverEntity):
         self.hass = kwargs["hass"]
         self._position_uuid = kwargs["states"]["position"]
         self._state_uuid = kwargs["states"]["active"]
-        self._position = None
-        self._is_opening = False
-        self._is_closing = False
         self.type = "Gate"
         self._attr_device_info = get_or_create_device(
             self.unique_id, self.name, self.type, self.room
         )
 
-        if self._position is None:
-            self._closed = True
-        else:
-            self._closed = self.current_cover_position <= 0
-
     @property
     def supported_features(self):
         """Flag supported features."""
@@ -150,33 +146,33 @@ class LoxoneGate(LoxoneEntity, CoverEntity):
     @property
     def current_cover_position(self):
         """Return the current position of the cover."""
-        return self._position
+        return _percent(self.get_stored_state("position"))
 
     @property
     def is_closed(self):
         """Return if the cover is closed."""
-        return self._closed
+        return self.current_cover_position in (None, 0)
 
     @property
     def is_closing(self):
         """Return if the cover is closing."""
-        return self._is_closing
+        return self.get_stored_state("active") == -1
 
     @property
     def is_opening(self):
         """Return if the cover is opening."""
-        return self._is_opening
+        return self.get_stored_state("active") == 1
 
     def open_cover(self, **kwargs):
         """Open the cover."""
-        if self._position == 100.0:
+        if self.current_cover_position == 100.0:
             return
         self.hass.bus.fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="open"))
         self.schedule_update_ha_state()
 
     def close_cover(self, **kwargs):
         """Close the cover."""
-        if self._position == 0:
+        if self.current_cover_position == 0:
             return
         self.hass.bus.fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="close"))
         self.schedule_update_ha_state()
@@ -192,23 +188,8 @@ class LoxoneGate(LoxoneEntity, CoverEntity):
             return
 
     async def event_handler(self, event):
-        if self.states["position"] in event.data or self._state_uuid in event.data:
-            if self.states["position"] in event.data:
-                self._position = float(event.data[self.states["position"]]) * 100.0
-                if self._position == 0:
-                    self._closed = True
-                else:
-                    self._closed = False
-
-            if self._state_uuid in event.data:
-                self._is_closing = False
-                self._is_opening = False
-
-                if event.data[self._state_uuid] == -1:
-                    self._is_closing = True
-                elif event.data[self._state_uuid] == 1:
-                    self._is_opening = True
-            self.schedule_update_ha_state()
+        if self._position_uuid in event.data or self._state_uuid in event.data:
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -227,10 +208,6 @@ class LoxoneWindow(LoxoneEntity, CoverEntity):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.hass = kwargs["hass"]
-        self._position = None
-        self._target_position = None
-        self._closed = True
-        self._direction = 0
 
         self.type = "Window"
         self._attr_device_info = get_or_create_device(
@@ -238,25 +215,12 @@ class LoxoneWindow(LoxoneEntity, CoverEntity):
         )
 
     async def event_handler(self, e):
-        if (self.states["position"] in e.data 
+        if (
+            self.states["position"] in e.data
             or self.states["direction"] in e.data
             or self.states["targetPosition"] in e.data
         ):
-            if self.states["position"] in e.data:
-                self._position = float(e.data[self.states["position"]]) * 100.0
-                if self._position == 0:
-                    self._closed = True
-                else:
-                    self._closed = False
-
-            if self.states["direction"] in e.data:
-                self._direction = e.data[self.states["direction"]]
-
-            if self.states["targetPosition"] in e.data:
-                target_position_loxone = float(e.data[self.states["targetPosition"]]) * 100.0
-                self._target_position = target_position_loxone
-                
-            self.schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def current_cover_position(self):
@@ -264,11 +228,11 @@ class LoxoneWindow(LoxoneEntity, CoverEntity):
 
         None is unknown, 0 is closed, 100 is fully open.
         """
-        return self._position
+        return _percent(self.get_stored_state("position"))
 
     @property
     def target_position(self):
-        return self._target_position
+        return _percent(self.get_stored_state("targetPosition"))
 
     @property
     def extra_state_attributes(self):
@@ -291,20 +255,16 @@ class LoxoneWindow(LoxoneEntity, CoverEntity):
     @property
     def is_closing(self):
         """Return if the cover is closing."""
-        if self._direction == -1:
-            return True
-        return False
+        return self.get_stored_state("direction") == -1
 
     @property
     def is_opening(self):
         """Return if the cover is opening."""
-        if self._direction == 1:
-            return True
-        return False
+        return self.get_stored_state("direction") == 1
 
     @property
     def is_closed(self):
-        return self._closed
+        return self.current_cover_position in (None, 0)
 
     def open_cover(self, **kwargs: Any) -> None:
         self.hass.bus.fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="fullopen"))
@@ -344,33 +304,19 @@ class LoxoneJalousie(LoxoneEntity, CoverEntity):
             self.states["autoInfoText"] = ""
         if "autoState" not in self.states:
             self.states["autoState"] = ""
-        self._position = 0
-        self._position_loxone = -1
-        self._tilt_position_loxone = 1
-        self._target_position = None
         self._set_position = None
         self._set_tilt_position = None
-        self._tilt_position = None
         self._requested_closing = True
         self._unsub_listener_cover = None
         self._unsub_listener_cover_tilt = None
-        self._is_opening = False
-        self._is_closing = False
         self._animation = 0
         self._is_automatic = False
-        self._auto_text = ""
-        self._auto_state = 0
 
         if "isAutomatic" in self.details:
             self._is_automatic = self.details["isAutomatic"]
         if "animation" in self.details:
             self._animation = self.details["animation"]
 
-        if self._position is None:
-            self._closed = True
-        else:
-            self._closed = self.current_cover_position <= 0
-
         self.type = "Jalousie"
         self._attr_device_info = get_or_create_device(
             self.unique_id, self.name, self.type, self.room
@@ -412,79 +358,55 @@ class LoxoneJalousie(LoxoneEntity, CoverEntity):
             or self.states["autoState"] in e.data
             or (self._is_automatic and self.states["targetPosition"] in e.data)
         ):
-            if self.states["position"] in e.data:
-                self._position_loxone = float(e.data[self.states["position"]]) * 100.0
-                self._position = map_range(self._position_loxone, 0, 100, 100, 0)
-
-                if self._position == 0:
-                    self._closed = True
-                else:
-                    self._closed = False
-
-            if self.states["shadePosition"] in e.data:
-                self._tilt_position_loxone = (
-                    float(e.data[self.states["shadePosition"]]) * 100.0
-                )
-                self._tilt_position = map_range(
-                    self._tilt_position_loxone, 0, 100, 100, 0
-                )
-            if self._is_automatic and self.states["targetPosition"] in e.data:
-                target_position_loxone = (
-                    float(e.data[self.states["targetPosition"]]) * 100.0
-                )
-                self._target_position = map_range(
-                    target_position_loxone, 0, 100, 100, 0
-                )
-
-            if self.states["up"] in e.data:
-                self._is_opening = e.data[self.states["up"]]
-
-            if self.states["down"] in e.data:
-                self._is_closing = e.data[self.states["down"]]
-
-            if self.states["autoInfoText"] in e.data:
-                self._auto_text = e.data[self.states["autoInfoText"]]
-
-            if self.states["autoState"] in e.data:
-                self._auto_state = e.data[self.states["autoState"]]
-
-            self.schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def should_poll(self):
         """No polling needed for a demo cover."""
         return False
 
+    @property
+    def _position_loxone(self):
+        """Return the position as shown by Loxone, -1 while unknown."""
+        position = _percent(self.get_stored_state("position"))
+        return -1 if position is None else position
+
     @property
     def current_cover_position(self):
         """Return the current position of the cover."""
-        return self._position
+        position = _percent(self.get_stored_state("position"))
+        return 0 if position is None else map_range(position, 0, 100, 100, 0)
 
     @property
     def current_cover_tilt_position(self):
         """Return the current tilt position of the cover."""
         if self.device_class == CoverDeviceClass.BLIND:
-            return self._tilt_position
+            position = _percent(self.get_stored_state("shadePosition"))
+            if position is not None:
+                return map_range(position, 0, 100, 100, 0)
         return None
 
     @property
     def is_closed(self):
         """Return if the cover is closed."""
-        return self._closed
+        return self.current_cover_position == 0
 
     @property
     def is_closing(self):
         """Return if the cover is closing."""
-        return self._is_closing
+        return self.get_stored_state("down", False)
 
     @property
     def is_opening(self):
         """Return if the cover is opening."""
-        return self._is_opening
+        return self.get_stored_state("up", False)
 
     @property
     def target_position(self):
-        return self._target_position
+        if not self._is_automatic:
+            return None
+        position = _percent(self.get_stored_state("targetPosition"))
+        return None if position is None else map_range(position, 0, 100, 100, 0)
 
     @property
     def device_class(self) -> CoverDeviceClass | None:
@@ -513,7 +435,7 @@ class LoxoneJalousie(LoxoneEntity, CoverEntity):
 
     @property
     def auto(self):
-        if self._is_automatic and self._auto_state:
+        if self._is_automatic and self.get_stored_state("autoState", 0):
             return STATE_ON
         else:
             return STATE_OFF
@@ -548,7 +470,7 @@ class LoxoneJalousie(LoxoneEntity, CoverEntity):
         if self._is_automatic:
             device_att.update(
                 {
-                    "automatic_text": self._auto_text,
+                    "automatic_text": self.get_stored_state("autoInfoText", ""),
                     "auto_state": self.auto,
                     "is_sun_automation_enabled": self.is_sun_automation_enabled,
                     "target_position": self.target_position,
@@ -559,11 +481,7 @@ class LoxoneJalousie(LoxoneEntity, CoverEntity):
 
     def close_cover(self, **kwargs):
         """Close the cover."""
-        if self._position == 0:
-            return
-        elif self._position is None:
-            self._closed = True
-            self.schedule_update_ha_state()
+        if self.current_cover_position == 0:
             return
 
         self.hass.bus.fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="FullDown"))
@@ -571,11 +489,7 @@ class LoxoneJalousie(LoxoneEntity, CoverEntity):
 
     def open_cover(self, **kwargs):
         """Open the cover."""
-        if self._position == 100.0:
-            return
-        elif self._position is None:
-            self._closed = False
-            self.schedule_update_ha_state()
+        if self.current_cover_position == 100.0:
             return
         self.hass.bus.fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="FullUp"))
         self.schedule_update_ha_state()
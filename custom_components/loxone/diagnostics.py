@@ -8,6 +8,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN
+from .pyloxone_api.structure_snapshot import snapshot_to_dict
 
 
 async def async_get_config_entry_diagnostics(
@@ -16,6 +17,9 @@ async def async_get_config_entry_diagnostics(
     """Return diagnostics for a config entry."""
     for k, v in hass.data[DOMAIN].items():
         return {
-            "LoxAPP3.json": v.miniserver.lox_config.json,
+            "LoxAPP3.json": snapshot_to_dict(v.miniserver.lox_config.json),
+            "outbound_queue": v.api.outbound_metrics() if v.api else None,
+            "bootstrap": v.api.bootstrap_timings if v.api else None,
+            "state_store": v.states.metrics(),
         }
     return None
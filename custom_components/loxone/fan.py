@@ -15,8 +15,7 @@ from voluptuous import Any, Optional
 from . import LoxoneEntity
 from .binary_sensor import LoxoneDigitalSensor
 from .const import SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 from .sensor import LoxoneSensor
 
@@ -52,11 +51,10 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for fan in get_all(loxconfig, "Ventilation"):
-        fan = add_room_and_cat_to_value_values(loxconfig, fan)
+    for fan in miniserver.index.get_all("Ventilation"):
+        fan = add_room_and_cat_to_value_values(miniserver.index, fan)
         fan.update(
             {
                 "type": "ventilation",
@@ -153,7 +151,6 @@ class LoxoneVentilation(LoxoneEntity, FanEntity):
         self._attr_available = True
 
         self._stateAttribUuids = kwargs["states"]
-        self._stateAttribValues = {}
         self._details = kwargs["details"]
 
         self.type = "Fan"
@@ -179,16 +176,8 @@ class LoxoneVentilation(LoxoneEntity, FanEntity):
 
     async def event_handler(self, event):
         # _LOGGER.debug(f"Fan Event data: {event.data}")
-        update = False
-
-        for key in set(self._stateAttribUuids.values()) & event.data.keys():
-            self._stateAttribValues[key] = event.data[key]
-            update = True
-
-        if update:
-            self.schedule_update_ha_state()
-
-        # _LOGGER.debug(f"State attribs after event handling: {self._stateAttribValues}")
+        if not event.data.keys().isdisjoint(self._stateAttribUuids.values()):
+            self.async_schedule_state_write()
 
     @property
     def icon(self):
@@ -219,12 +208,12 @@ class LoxoneVentilation(LoxoneEntity, FanEntity):
     @property
     def preset_mode(self) -> str | None:
         """Return a list of available preset modes."""
-        return VENTELATION_INT_TO_STR.get(self.get_state_value("mode"))
+        return VENTELATION_INT_TO_STR.get(self.get_stored_state("mode"))
 
     @property
     def percentage(self) -> Optional[int]:
         """Return the current speed percentage."""
-        return self.get_state_value("speed")
+        return self.get_stored_state("speed")
 
     @device_class.setter
     def device_class(self, device_class):
@@ -233,12 +222,6 @@ class LoxoneVentilation(LoxoneEntity, FanEntity):
         else:
             self._device_class = device_class
 
-    def get_state_value(self, name):
-        uuid = self._stateAttribUuids[name]
-        return (
-            self._stateAttribValues[uuid] if uuid in self._stateAttribValues else None
-        )
-
     def set_preset_mode(self, preset_mode: str) -> None:
         """Set the preset mode of the fan."""
 
@@ -249,7 +232,7 @@ class LoxoneVentilation(LoxoneEntity, FanEntity):
             SENDDOMAIN,
             dict(
                 uuid=self.uuidAction,
-                value=f'setTimer/{interval}/{percentage}/{VENTELATION_INT_TO_STR.get( self.get_state_value("mode") )}/-1',
+                value=f'setTimer/{interval}/{percentage}/{VENTELATION_INT_TO_STR.get( self.get_stored_state("mode") )}/-1',
             ),
         )
 
@@ -8,6 +8,7 @@ https://home-assistant.io/components/loxone/
 import re
 
 from .const import DOMAIN, cfmt
+from .pyloxone_api.structure_index import StructureIndex
 
 # Initialize a device registry
 device_registry = {}
@@ -83,26 +84,11 @@ def to_loxone_color_temp(temp: float):
     return 6500 + (temp - 153) * (2700 - 6500) / (500 - 153)
 
 
-def get_room_name_from_room_uuid(lox_config: dict, room_uuid: str):
-    if "rooms" in lox_config:
-        if room_uuid in lox_config["rooms"]:
-            return lox_config["rooms"][room_uuid]["name"]
-
-    return ""
-
-
-def get_cat_name_from_cat_uuid(lox_config: dict, cat_uuid: str):
-    if "cats" in lox_config:
-        if cat_uuid in lox_config["cats"]:
-            return lox_config["cats"][cat_uuid]["name"]
-    return ""
-
-
-def add_room_and_cat_to_value_values(loxconfig: dict, sensor: dict):
+def add_room_and_cat_to_value_values(index: StructureIndex, sensor: dict):
     sensor.update(
         {
-            "room": get_room_name_from_room_uuid(loxconfig, sensor.get("room", "")),
-            "cat": get_cat_name_from_cat_uuid(loxconfig, sensor.get("cat", "")),
+            "room": index.room_name(sensor.get("room", "")),
+            "cat": index.cat_name(sensor.get("cat", "")),
         }
     )
     return sensor
@@ -122,19 +108,6 @@ def get_miniserver_type(t):
     return "Unknown type"
 
 
-def get_all(json_data, name):
-    controls = []
-    if isinstance(name, list):
-        for c in json_data["controls"].keys():
-            if json_data["controls"][c]["type"] in name:
-                controls.append(json_data["controls"][c])
-    else:
-        for c in json_data["controls"].keys():
-            if json_data["controls"][c]["type"] == name:
-                controls.append(json_data["controls"][c])
-    return controls
-
-
 def clean_unit(lox_format):
     """Extract the unit string from a Loxone format specifier like '%.1f °C'."""
     search = re.search(cfmt, lox_format, flags=re.X)
@@ -6,7 +6,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
-from .helpers import add_room_and_cat_to_value_values, get_all
+from .helpers import add_room_and_cat_to_value_values
 from .lights.colorpickers import LumiTech, RGBColorPicker, TunableWhiteLight
 from .lights.dimmer import EIBDimmer, LoxoneDimmer
 from .lights.lightcontroller import LoxoneLightControllerV2
@@ -58,16 +58,17 @@ async def async_setup_entry(
     generate_subcontrols = config_entry.options.get(
         "generate_lightcontroller_subcontrols", False
     )
-    loxconfig = miniserver.lox_config.json
     entities = []
-    dimmers_without_light_controller = get_all(loxconfig, ["Dimmer", "EIBDimmer"])
+    dimmers_without_light_controller = miniserver.index.get_all(["Dimmer", "EIBDimmer"])
 
     switches = []
     dimmers = []
     color_pickers = []
 
-    for light_controller in get_all(loxconfig, "LightControllerV2"):
-        light_controller = add_room_and_cat_to_value_values(loxconfig, light_controller)
+    for light_controller in miniserver.index.get_all("LightControllerV2"):
+        light_controller = add_room_and_cat_to_value_values(
+            miniserver.index, light_controller
+        )
         light_controller.update(
             {
                 "async_add_devices": async_add_entities,
@@ -85,7 +86,9 @@ async def async_setup_entry(
                     continue
                 sub_control = light_controller["subControls"][sub_control_uuid]
                 # Update for all entities
-                sub_control = add_room_and_cat_to_value_values(loxconfig, sub_control)
+                sub_control = add_room_and_cat_to_value_values(
+                    miniserver.index, sub_control
+                )
                 sub_control.update(
                     {
                         "lightcontroller_id": light_controller.get("uuidAction", None),
@@ -113,7 +116,7 @@ async def async_setup_entry(
 
     for dimmer in dimmers + dimmers_without_light_controller:
         if "async_add_devices" not in dimmer:
-            dimmer = add_room_and_cat_to_value_values(loxconfig, dimmer)
+            dimmer = add_room_and_cat_to_value_values(miniserver.index, dimmer)
             dimmer.update(
                 {
                     "async_add_devices": async_add_entities,
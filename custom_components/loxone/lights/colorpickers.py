@@ -111,7 +111,7 @@ class TunableWhiteLight(LoxoneEntity, LightEntity):
         if request_update:
             if not self._attr_available:
                 self._attr_available = True
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @cached_property
     def icon(self):
@@ -254,7 +254,7 @@ class RGBColorPicker(LoxoneEntity, LightEntity):
         if request_update:
             if not self._attr_available:
                 self._attr_available = True
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @cached_property
     def icon(self):
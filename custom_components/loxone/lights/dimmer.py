@@ -2,7 +2,6 @@ from functools import cached_property
 
 from homeassistant.components.light import (ATTR_BRIGHTNESS, ColorMode,
                                             LightEntity)
-from homeassistant.const import STATE_UNKNOWN
 from homeassistant.helpers.entity import DeviceInfo
 
 from .. import LoxoneEntity
@@ -21,16 +20,11 @@ class LoxoneDimmer(LoxoneEntity, LightEntity):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         """Initialize the dimmer ."""
-        self._attr_is_on = STATE_UNKNOWN
         self._attr_unique_id = self.uuidAction
-        self._position = 0.0
-        self._step = 1
         self._min_uuid = kwargs.get("states", {}).get("min", None)
         self._max_uuid = kwargs.get("states", {}).get("max", None)
         self._position_uuid = kwargs.get("states", {}).get("position", None)
         self._step_uuid = kwargs.get("states", {}).get("step", None)
-        self._min = STATE_UNKNOWN
-        self._max = STATE_UNKNOWN
         self._async_add_devices = kwargs["async_add_devices"]
         self._light_controller_id = kwargs.get("lightcontroller_id", None)
         self._light_controller_name = kwargs.get("lightcontroller_name", None)
@@ -81,44 +75,31 @@ class LoxoneDimmer(LoxoneEntity, LightEntity):
         self.hass.bus.async_fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="Off"))
         self.async_schedule_update_ha_state()
 
+    @property
+    def brightness(self):
+        position = self.get_stored_value(self._position_uuid)
+        if position is None:
+            return None
+        min_value = self.get_stored_value(self._min_uuid)
+        max_value = self.get_stored_value(self._max_uuid)
+        if min_value is not None and max_value is not None:
+            return lox2hass_mapped(position, min_value, max_value)
+        return lox_to_hass(position)
+
+    @property
+    def is_on(self):
+        brightness = self.brightness
+        return True if brightness and brightness > 0 else False
+
     async def event_handler(self, e):
-        request_update = False
-        if self._min_uuid in e.data:
-            self._min = e.data[self._min_uuid]
-            request_update = True
-
-        if self._max_uuid in e.data:
-            self._max = e.data[self._max_uuid]
-            request_update = True
-
-        if self._step_uuid in e.data:
-            self._step = e.data[self._step_uuid]
-            request_update = True
-
-        if self._position_uuid in e.data:
-            if (
-                self._min is not None
-                and self._max is not None
-                and self._min != STATE_UNKNOWN
-                and self._max != STATE_UNKNOWN
-            ):
-                self._attr_brightness = lox2hass_mapped(
-                    e.data[self._position_uuid], self._min, self._max
-                )
-            else:
-                self._attr_brightness = lox_to_hass(e.data[self._position_uuid])
-            request_update = True
-
-        self._attr_is_on = (
-            True if self._attr_brightness and self._attr_brightness > 0 else False
-        )
-
-        if request_update:
-            if not self._attr_available:
-                min_max_values_are_not_unknown = self._min != STATE_UNKNOWN and self._max != STATE_UNKNOWN
-                if min_max_values_are_not_unknown or self._attr_is_on != STATE_UNKNOWN:
-                    self._attr_available = True
-            self.async_schedule_update_ha_state()
+        if (
+            self._min_uuid in e.data
+            or self._max_uuid in e.data
+            or self._step_uuid in e.data
+            or self._position_uuid in e.data
+        ):
+            self._attr_available = True
+            self.async_schedule_state_write()
 
     @cached_property
     def icon(self):
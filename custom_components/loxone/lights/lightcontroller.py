@@ -30,14 +30,11 @@ class LoxoneLightControllerV2(LoxoneEntity, LightEntity):
         self._active_moods = []
         self._moodlist = []
         self._additional_moodlist = []
-        self._attr_brightness = None
         self._master_value = None
         self._master_value_uuid = None
         self._master_position_uuid = None
         self._master_min_uuid = None
         self._master_max_uuid = None
-        self._master_min = STATE_UNKNOWN
-        self._master_max = STATE_UNKNOWN
         self._async_add_devices = kwargs["async_add_devices"]
 
         self.kwargs = kwargs
@@ -161,6 +158,17 @@ class LoxoneLightControllerV2(LoxoneEntity, LightEntity):
         )
         self.async_schedule_update_ha_state()
 
+    @property
+    def brightness(self):
+        position = self.get_stored_value(self._master_position_uuid)
+        if position is None:
+            return None
+        master_min = self.get_stored_value(self._master_min_uuid)
+        master_max = self.get_stored_value(self._master_max_uuid)
+        if master_min is not None and master_max is not None:
+            return lox2hass_mapped(position, master_min, master_max)
+        return lox_to_hass(position)
+
     async def event_handler(self, event):
         request_update = False
 
@@ -168,31 +176,13 @@ class LoxoneLightControllerV2(LoxoneEntity, LightEntity):
             self._attr_state = event.data[self.uuidAction]
             request_update = True
 
-        if self._master_min_uuid and self._master_min_uuid in event.data:
-            self._master_min = event.data[self._master_min_uuid]
-            request_update = True
-
-        if self._master_max_uuid and self._master_max_uuid in event.data:
-            self._master_max = event.data[self._master_max_uuid]
-            request_update = True
-
-        if self._master_position_uuid and self._master_position_uuid in event.data:
-            if (
-                self._master_min is not None
-                and self._master_max is not None
-                and self._master_min != "unknown"
-                and self._master_max != "unknown"
-            ):
-                self._attr_brightness = lox2hass_mapped(
-                    event.data[self._master_position_uuid],
-                    self._master_min,
-                    self._master_max,
-                )
-            else:
-                self._attr_brightness = lox_to_hass(
-                    event.data[self._master_position_uuid]
-                )
-            request_update = True
+        for uuid in (
+            self._master_min_uuid,
+            self._master_max_uuid,
+            self._master_position_uuid,
+        ):
+            if uuid and uuid in event.data:
+                request_update = True
 
         if self.states["activeMoods"] in event.data:
             self._active_moods = eval(event.data[self.states["activeMoods"]])
@@ -219,10 +209,10 @@ class LoxoneLightControllerV2(LoxoneEntity, LightEntity):
         if request_update:
             if not self._attr_available:
                 attr_is_on_is_not_unknown = self._attr_is_on == True or self._attr_is_on == False
-                both_master_values_are_not_unknown = self._master_min != STATE_UNKNOWN and self._master_max != STATE_UNKNOWN
+                both_master_values_are_not_unknown = self.get_stored_value(self._master_min_uuid) is not None and self.get_stored_value(self._master_max_uuid) is not None
                 if attr_is_on_is_not_unknown or both_master_values_are_not_unknown:
                     self._attr_available = True
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
 
     @property
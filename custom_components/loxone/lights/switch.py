@@ -22,7 +22,6 @@ class LoxoneLightSwitch(LoxoneEntity, LightEntity):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._attr_state = STATE_UNKNOWN
-        self._attr_is_on = STATE_UNKNOWN
         self._attr_unique_id = self.uuidAction
         self._async_add_devices = kwargs["async_add_devices"]
         self._light_controller_id = kwargs.get("lightcontroller_id", None)
@@ -65,17 +64,14 @@ class LoxoneLightSwitch(LoxoneEntity, LightEntity):
         self.hass.bus.async_fire(SENDDOMAIN, dict(uuid=self.uuidAction, value="off"))
         self.async_schedule_update_ha_state()
 
-    async def event_handler(self, event):
-        request_update = False
-        if "active" in self.states:
-            if self.states["active"] in event.data:
-                active = event.data[self.states["active"]]
-                new_state = True if active == 1.0 else False
-                if new_state != self._attr_is_on:
-                    self._attr_is_on = new_state
-                    request_update = True
+    @property
+    def is_on(self):
+        active = self.get_stored_state("active")
+        if active is None:
+            return STATE_UNKNOWN
+        return active == 1.0
 
-        if request_update:
-            if not self._attr_available:
-                self._attr_available = True
-            self.async_schedule_update_ha_state()
+    async def event_handler(self, event):
+        if self.states.get("active") in event.data:
+            self._attr_available = True
+            self.async_schedule_state_write()
@@ -15,8 +15,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import DEFAULT_AUDIO_ZONE_V2_PLAY_STATE, SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -54,11 +53,10 @@ async def async_setup_entry(
 ) -> None:
     """Load Loxone Audio zones based on a config entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for audioZone in get_all(loxconfig, "AudioZoneV2"):
-        audioZone = add_room_and_cat_to_value_values(loxconfig, audioZone)
+    for audioZone in miniserver.index.get_all("AudioZoneV2"):
+        audioZone = add_room_and_cat_to_value_values(miniserver.index, audioZone)
         audioZone.update(
             {
                 "hass": hass,
@@ -92,8 +90,6 @@ class LoxoneAudioZoneV2(LoxoneEntity, MediaPlayerEntity):
         self.hass = kwargs["hass"]
 
         self._attr_device_class = MediaPlayerDeviceClass.SPEAKER
-        self._state = play_state_to_media_player_state(DEFAULT_AUDIO_ZONE_V2_PLAY_STATE)
-        self._volume = 0
 
         self.type = "AudioZoneV2"
         self._attr_device_info = get_or_create_device(
@@ -101,31 +97,24 @@ class LoxoneAudioZoneV2(LoxoneEntity, MediaPlayerEntity):
         )
 
     async def event_handler(self, event):
-        should_update = False
-
-        if self.states["volume"] in event.data:
-            self._volume = float(event.data[self.states["volume"]]) / 100
-            should_update = True
-
-        if self.states["playState"] in event.data:
-            self._state = play_state_to_media_player_state(
-                event.data[self.states["playState"]]
-            )
-            should_update = True
-
-        if should_update:
-            self.async_schedule_update_ha_state()
+        if (
+            self.states["volume"] in event.data
+            or self.states["playState"] in event.data
+        ):
+            self.async_schedule_state_write()
 
     # properties
     @property
     def state(self) -> MediaPlayerState:
         """Return the playback state."""
-        return self._state
+        return play_state_to_media_player_state(
+            self.get_stored_state("playState", DEFAULT_AUDIO_ZONE_V2_PLAY_STATE)
+        )
 
     @property
     def volume_level(self) -> float | None:
         """Volume level of the media player (0..1)."""
-        return self._volume
+        return float(self.get_stored_state("volume", 0)) / 100
 
     @property
     def supported_features(self) -> MediaPlayerEntityFeature:
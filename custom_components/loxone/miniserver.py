@@ -11,6 +11,7 @@ from homeassistant.helpers import device_registry as dr
 
 # from .api import LoxApp, LoxWs
 from .helpers import get_miniserver_type
+from .pyloxone_api.structure_index import StructureIndex
 
 _LOGGER = logging.getLogger(__name__)
 CONNECTION_NETWORK_MAC = "mac"
@@ -49,9 +50,10 @@ class ConfigDataClass:
 
 
 class MiniServer:
-    def __init__(self, hass, lox_config, config_entry):
+    def __init__(self, hass, lox_config, config_entry, index=None):
         self.hass = hass
         self.lox_config: ConfigDataClass = ConfigDataClass(lox_config)
+        self.index: StructureIndex = index or StructureIndex(lox_config)
         self.config_entry = config_entry
         self.listeners = []
 
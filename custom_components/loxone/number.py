@@ -9,15 +9,13 @@ import logging
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_UNKNOWN
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -40,11 +38,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for number_entity in get_all(loxconfig, ["Slider"]):
-        number_entity = add_room_and_cat_to_value_values(loxconfig, number_entity)
+    for number_entity in miniserver.index.get_all(["Slider"]):
+        number_entity = add_room_and_cat_to_value_values(
+            miniserver.index, number_entity
+        )
         new_number = LoxoneNumber(**number_entity)
         entities.append(new_number)
 
@@ -57,7 +56,6 @@ class LoxoneNumber(LoxoneEntity, NumberEntity):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         """Initialize the Loxone number."""
-        self._state = STATE_UNKNOWN
         self._icon = None
         self._assumed = False
         self._native_max_value = kwargs["details"]["max"]
@@ -102,21 +100,11 @@ class LoxoneNumber(LoxoneEntity, NumberEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return self._state
+        return self.get_stored_value(self.uuidAction)
 
     async def event_handler(self, e):
         if self.uuidAction in e.data:
-            data = e.data[self.uuidAction]
-            if isinstance(data, (list, dict)):
-                data = str(data)
-                if len(data) >= 255:
-                    self._state = data[:255]
-                else:
-                    self._state = data
-            else:
-                self._state = data
-
-            self.schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -0,0 +1,79 @@
+"""
+Component to create an interface to the Loxone Miniserver.
+
+For more details about this component, please refer to the documentation at
+https://github.com/JoDehli/pyloxone-api
+"""
+
+from __future__ import annotations
+
+from base64 import b64decode, b64encode
+from typing import Union
+
+from Crypto.Cipher import AES
+from Crypto.Util import Padding
+
+ENC_PREFIX = "jdev/sys/enc/"
+# Full encryption, the Miniserver encrypts the response as well
+FENC_PREFIX = "jdev/sys/fenc/"
+# urllib.parse.quote of a base64 string, which only has to quote "+" and "="
+_QUOTE_BASE64 = str.maketrans({"+": "%2B", "=": "%3D"})
+# PKCS#7 padding by its length
+_PADDINGS = [bytes([length]) * length for length in range(AES.block_size + 1)]
+
+
+class CommandCipher:
+    """AES-256-CBC encryption of the commands of one session.
+
+    Loxone encrypts every command with the session key and iv, starting the
+    CBC chain anew. Instead of a new cipher object (and key expansion) per
+    command, one encrypting and one decrypting CBC object are kept for the
+    session and chained back to the iv after each command: encrypting the
+    block D(iv) xor last cipher block yields the iv as next chaining block,
+    decrypting the iv makes it the chaining block of the decryption.
+    With full=True commands are sent as jdev/sys/fenc.
+    """
+
+    def __init__(self, key: bytes, iv: bytes, full: bool = False) -> None:
+        self._iv = iv
+        self._encryptor = AES.new(key, AES.MODE_CBC, iv)
+        self._decryptor = AES.new(key, AES.MODE_CBC, iv)
+        self._rewind = int.from_bytes(AES.new(key, AES.MODE_ECB).decrypt(iv), "big")
+        self.prefix = FENC_PREFIX if full else ENC_PREFIX
+
+    def encrypt(self, command_string: str) -> str:
+        """Return command_string (with salt) as encrypted command."""
+        padded = Padding.pad(command_string.encode(), AES.block_size)
+        encrypted = self._encryptor.encrypt(padded)
+        last_block = int.from_bytes(encrypted[-AES.block_size :], "big")
+        self._encryptor.encrypt(
+            (self._rewind ^ last_block).to_bytes(AES.block_size, "big")
+        )
+        cipher = b64encode(encrypted).decode("ascii")
+        return self.prefix + cipher.translate(_QUOTE_BASE64)
+
+    def decrypt(self, data: Union[str, bytes]) -> bytes:
+        """Decrypt an encrypted command or response.
+
+        data is a jdev/sys/enc or jdev/sys/fenc command, or the base64 cipher
+        text of a fully encrypted response.
+        """
+        # Encrypted strings returned by the miniserver are not %encoded (even
+        # if they were when sent to the miniserver)
+        if isinstance(data, str):
+            if data.startswith(ENC_PREFIX):
+                data = data[len(ENC_PREFIX) :]
+            elif data.startswith(FENC_PREFIX):
+                data = data[len(FENC_PREFIX) :]
+        encrypted = b64decode(data)
+        if not encrypted or len(encrypted) % AES.block_size:
+            raise ValueError("Cipher text is not a multiple of the block size")
+        decrypted = self._decryptor.decrypt(encrypted)
+        self._decryptor.decrypt(self._iv)
+        padding = decrypted[-1]
+        if not 0 < padding <= AES.block_size or not decrypted.endswith(
+            _PADDINGS[padding]
+        ):
+            raise ValueError("Padding is incorrect.")
+        # The miniserver seems to terminate the text with a zero byte
+        return decrypted[:-padding].rstrip(b"\x00")
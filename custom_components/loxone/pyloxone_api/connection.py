@@ -6,14 +6,17 @@ https://github.com/JoDehli/pyloxone-api
 """
 
 import asyncio
+import binascii
 import hashlib
 import json
 import logging
+import random
+import re
 import ssl
 import time
-import urllib
-from base64 import b64decode, b64encode
-from collections.abc import Awaitable, Callable
+from base64 import b64encode
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import dataclass
 from types import TracebackType
 from typing import Any, NoReturn, Optional, Union
@@ -22,33 +25,52 @@ from urllib.parse import urlparse
 import aiohttp
 import websockets as wslib
 import websockets.exceptions
-from Crypto.Cipher import AES, PKCS1_v1_5
+from Crypto.Cipher import PKCS1_v1_5
 from Crypto.Hash import HMAC, SHA1, SHA256
 from Crypto.PublicKey import RSA
 from Crypto.Random import get_random_bytes
-from Crypto.Util import Padding
 
-from .const import (AES_KEY_SIZE, CMD_AUTH_WITH_TOKEN, CMD_ENABLE_UPDATES,
-                    CMD_GET_API_KEY, CMD_GET_KEY, CMD_GET_KEY_AND_SALT,
-                    CMD_GET_PUBLIC_KEY, CMD_GET_VISUAL_PASSWD, CMD_KEEP_ALIVE,
-                    CMD_KEY_EXCHANGE, CMD_REFRESH_TOKEN,
+from .command_cipher import CommandCipher
+from .const import (AES_KEY_SIZE, BULK_LANE_SIZE, CMD_AUTH_WITH_TOKEN,
+                    CMD_ENABLE_UPDATES, CMD_GET_API_KEY, CMD_GET_KEY,
+                    CMD_GET_KEY_AND_SALT, CMD_GET_PUBLIC_KEY,
+                    CMD_GET_STRUCTURE_VERSION, CMD_GET_VISUAL_PASSWD,
+                    CMD_KEEP_ALIVE, CMD_KEY_EXCHANGE, CMD_REFRESH_TOKEN,
                     CMD_REFRESH_TOKEN_JSON_WEB, CMD_REQUEST_TOKEN,
-                    CMD_REQUEST_TOKEN_JSON_WEB, DELAY_CHECK_TOKEN_REFRESH,
-                    IV_BYTES, KEEP_ALIVE_PERIOD, LOXAPPPATH, MAX_REFRESH_DELAY,
-                    MAX_WEBSOCKET_MESSAGE_SIZE, RECONNECT_DELAY,
-                    RECONNECT_TRIES, SALT_BYTES, SALT_MAX_AGE_SECONDS,
-                    SALT_MAX_USE_COUNT, TIMEOUT, TOKEN_PERMISSION)
-from .exceptions import (LoxoneConnectionClosedOk, LoxoneConnectionError,
+                    CMD_REQUEST_TOKEN_JSON_WEB, COALESCED_COMMANDS,
+                    COMMAND_ENCRYPTION_ALWAYS, COMMAND_ENCRYPTION_AUTO,
+                    COMMAND_ENCRYPTION_FULL, DELAY_CHECK_TOKEN_REFRESH,
+                    DISPATCH_OVERFLOW_BLOCK, DISPATCH_OVERFLOW_DROP_NEWEST,
+                    DISPATCH_QUEUE_SIZE, INTERACTIVE_LANE_SIZE, IV_BYTES,
+                    KEEP_ALIVE_PERIOD, LOXAPPPATH, MAX_REFRESH_DELAY,
+                    MAX_WEBSOCKET_MESSAGE_SIZE, PROTOCOL_LANE_SIZE,
+                    RECONNECT_BACKOFF_BASE, RECONNECT_BACKOFF_MAX,
+                    RECONNECT_DELAY, RECONNECT_TRIES, SALT_BYTES,
+                    SALT_MAX_AGE_SECONDS, SALT_MAX_USE_COUNT,
+                    SECURED_LANE_SIZE, TIMEOUT, TOKEN_PERMISSION,
+                    VISUAL_SALT_MAX_AGE_SECONDS)
+from .exceptions import (LoxoneCommandSupersededError,
+                         LoxoneConnectionClosedOk, LoxoneConnectionError,
                          LoxoneException, LoxoneOutOfServiceException,
-                         LoxoneServiceUnAvailableError, LoxoneTokenError)
+                         LoxoneServiceUnAvailableError,
+                         LoxoneStructureChangedError, LoxoneTokenError,
+                         LoxoneUnauthorisedError)
+from .helper import get_state_uuids
 from .loxone_http_client import LoxoneAsyncHttpClient
 from .loxone_token import LoxoneToken, LxJsonKeySalt
-from .message import (BaseMessage, BinaryFile, Keepalive, LLResponse,
-                      MessageType, TextMessage, check_and_decode_if_needed,
-                      parse_header, parse_message)
+from .message import (KEEPALIVE, BaseMessage, LLResponse, MessageType,
+                      TextMessage, check_and_decode_if_needed,
+                      loxone_uuid_bytes, parse_header, parse_message,
+                      seed_uuid_cache)
+from .outbound_queue import Lane, OutboundQueue
+from .state_store import StateStore
+from .structure_cache import StructureCache
 from .websocket_protocol import LoxoneClientConnection
 
 _LOGGER = logging.getLogger(__name__)
+
+# Miniserver serial -> public key, so reconnects and reloads skip the request
+_public_keys: dict[str, str] = {}
 import warnings
 
 # Filter out the specific warning
@@ -59,6 +81,27 @@ warnings.filterwarnings(
 )
 
 
+def reconnect_delay(attempt: int) -> float:
+    """Return the seconds to wait before the reconnect attempt (from 0).
+
+    The delay doubles with every attempt up to RECONNECT_BACKOFF_MAX, and
+    a random part of up to half of it keeps many clients from reconnecting
+    at the same time after a Miniserver restart.
+    """
+    delay = min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_BASE * 2 ** min(attempt, 16))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _is_plain_text(message: Union[str, bytes]) -> bool:
+    """Return if a text message is a plain json response.
+
+    Fully encrypted responses are base64 cipher text, which never starts
+    with a brace.
+    """
+    text = message.lstrip()[:1]
+    return text in ("{", b"{")
+
+
 def time_elapsed_in_seconds():
     return int(round(time.time()))
 
@@ -67,6 +110,60 @@ def time_elapsed_in_seconds():
 class MessageForQueue:
     command: str
     flag: bool
+    device_uuid: Optional[str] = None
+    # Set for value commands which may be replaced while they are queued
+    coalesce_key: Optional[str] = None
+    lane: Lane = Lane.INTERACTIVE
+    # Resolved with the time.perf_counter() value when the command was sent
+    sent: Optional[asyncio.Future] = None
+
+
+def coalesce_key(value: Union[str, int, float]) -> Optional[str]:
+    """Return the key under which a queued command for a control is replaced.
+
+    Numeric values share the key "". Value setters from COALESCED_COMMANDS
+    use the command without its last argument, e.g. "setTemp/1" for
+    "setTemp/1/21.5". None means the command must not be coalesced.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return ""
+    value = str(value)
+    try:
+        float(value)
+        return ""
+    except ValueError:
+        pass
+    name = re.split(r"[/(]", value, maxsplit=1)[0]
+    if name == value or name not in COALESCED_COMMANDS:
+        return None
+    if value.startswith(f"{name}("):
+        return name
+    return value.rsplit("/", 1)[0]
+
+
+_SALT_PREFIX = re.compile(r"^(salt/[0-9a-fA-F]+|nextSalt/[0-9a-fA-F]+/[0-9a-fA-F]+)/")
+
+
+def request_key(control: str | bytes) -> str:
+    """Return the key which matches a command with the control of its response.
+
+    The Miniserver echoes the command as the control of its response,
+    sometimes with "dev/" instead of "jdev/" and, for encrypted commands,
+    with the salt in front. Only the leading part of the command is used,
+    e.g. "dev/sys/getkey2" or "dev/sps/io/<uuid>".
+    """
+    control = check_and_decode_if_needed(control).strip("\x00").lstrip("/")
+    control = _SALT_PREFIX.sub("", control)
+    if control.startswith("jdev/"):
+        control = control[1:]
+    segments = control.split("/")
+    if segments[0] != "dev":
+        return segments[0]
+    if len(segments) > 1 and segments[1] == "sps":
+        return "/".join(segments[:4])
+    return "/".join(segments[:3])
 
 
 class LoxoneBaseConnection:
@@ -83,6 +180,11 @@ class LoxoneBaseConnection:
         port: int = 8080,
         timeout: Optional[float] = None,
         verify_ssl: bool = True,
+        dispatch_queue_size: int = DISPATCH_QUEUE_SIZE,
+        overflow_policy: str = DISPATCH_OVERFLOW_BLOCK,
+        structure_cache_dir: Optional[str] = None,
+        token_callback: Optional[Callable[[dict], None]] = None,
+        command_encryption: str = COMMAND_ENCRYPTION_AUTO,
     ):
         # Validate input parameters
         if not host or not isinstance(host, str):
@@ -101,18 +203,37 @@ class LoxoneBaseConnection:
             )
         if not isinstance(verify_ssl, bool):
             raise ValueError("verify_ssl must be a boolean")
+        if not isinstance(dispatch_queue_size, int) or dispatch_queue_size < 1:
+            raise ValueError(
+                f"dispatch_queue_size must be a positive integer, got {dispatch_queue_size}"
+            )
+        if overflow_policy not in (
+            DISPATCH_OVERFLOW_BLOCK,
+            DISPATCH_OVERFLOW_DROP_NEWEST,
+        ):
+            raise ValueError(f"Unknown overflow_policy '{overflow_policy}'")
+        if command_encryption not in (
+            COMMAND_ENCRYPTION_ALWAYS,
+            COMMAND_ENCRYPTION_AUTO,
+            COMMAND_ENCRYPTION_FULL,
+        ):
+            raise ValueError(f"Unknown command_encryption '{command_encryption}'")
 
         self.host = host
         self.username = username
         self.password = password
         self.token = token
+        # Called with get_token_dict() whenever the token changes
+        self._token_callback = token_callback
         self.port = port
         self.timeout = None if timeout == 0 else timeout
         self.verify_ssl = verify_ssl
         self.connection: wslib.ClientConnection | None = None
+        # Session passed to open(), used again to resume the connection
+        self._session: aiohttp.ClientSession | None = None
+        self.reconnects: int = 0
         self._pending_task = []
         self._closed = False
-        self._key_update_event: Optional[asyncio.Event] = None
         self._shutdown_event = asyncio.Event()
         self._reconnect_event: asyncio.Event = asyncio.Event()
 
@@ -144,6 +265,14 @@ class LoxoneBaseConnection:
             self._aes_key: bytes = get_random_bytes(AES_KEY_SIZE)
         except Exception as e:
             raise RuntimeError(f"Failed to generate cryptographic keys: {e}") from e
+        self._full_encryption = command_encryption == COMMAND_ENCRYPTION_FULL
+        self._cipher = CommandCipher(
+            self._aes_key, self._iv, full=self._full_encryption
+        )
+        # Plain value commands need no jdev/sys/enc on a TLS connection
+        self._plain_io_unencrypted = (
+            command_encryption == COMMAND_ENCRYPTION_AUTO and self.scheme == "https"
+        )
 
         self._public_key: str = ""
         self._session_key: bytes
@@ -151,6 +280,11 @@ class LoxoneBaseConnection:
         self.miniserver_version: list[int] = []
         self.miniserver_serial: str = ""
         self.structure_file: dict = {}
+        # bootstrap stage -> seconds it took in the last open()
+        self.bootstrap_timings: dict[str, float] = {}
+        self._structure_cache: Optional[StructureCache] = (
+            StructureCache(structure_cache_dir) if structure_cache_dir else None
+        )
 
         # Validate and initialize token
         try:
@@ -195,13 +329,67 @@ class LoxoneBaseConnection:
         self._salt_time_stamp: int = 0
         self._salt: str = ""
         self._salt_used_count: int = 0
-        self._visual_hash = None
+        self._visual_hash: Optional[LxJsonKeySalt] = None
+        # device uuid -> (value, code, waiter) of secured commands which wait
+        # for the visual password salt
+        self._pending_secured: dict[
+            str, tuple[Union[str, int, float], str, asyncio.Future]
+        ] = {}
+        self._secured_sender: Optional[asyncio.Task] = None
         # Replace synchronous Queue with asyncio.Queue with bounded size
-        self._message_queue: asyncio.Queue[MessageForQueue] = asyncio.Queue(
-            maxsize=1000
+        self._message_queue: OutboundQueue[MessageForQueue] = OutboundQueue(
+            {
+                Lane.PROTOCOL: PROTOCOL_LANE_SIZE,
+                Lane.SECURED: SECURED_LANE_SIZE,
+                Lane.INTERACTIVE: INTERACTIVE_LANE_SIZE,
+                Lane.BULK: BULK_LANE_SIZE,
+            }
         )
-        self._secured_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        # device uuid -> (lowest priority lane used, number of queued commands)
+        self._queued_per_device: dict[str, tuple[Lane, int]] = {}
+        # request key -> futures of the requests waiting for a response
+        self._pending_requests: dict[str, deque[asyncio.Future]] = {}
+        # device uuid -> coalesce key -> queued value command
+        self._pending_values: dict[str, dict[str, MessageForQueue]] = {}
+        self.coalesced_commands: int = 0
         self.message_header = None
+        # Raw 16 byte uuids of the states to decode, see set_state_filter
+        self._state_filter: Optional[frozenset[bytes]] = None
+        # Current value of every state, written by the decoder of the state tables
+        self.states = StateStore()
+        # Received messages, dispatched in order by _dispatch_messages
+        self._dispatch_queue_size = dispatch_queue_size
+        self._overflow_policy = overflow_policy
+        self._dispatch_queue: asyncio.Queue[BaseMessage] = asyncio.Queue(
+            maxsize=dispatch_queue_size
+        )
+        self.dropped_messages: int = 0
+
+    def set_state_filter(self, uuids: Optional[Iterable[str]]) -> None:
+        """Only decode value and text states with one of these uuids.
+
+        States with other uuids are dropped before they are decoded. Pass
+        None to decode all states again. Entries which are not Loxone uuids
+        are ignored.
+        """
+        if uuids is None:
+            self._state_filter = None
+            return
+        state_filter = set()
+        for uuid_str in uuids:
+            try:
+                state_filter.add(loxone_uuid_bytes(uuid_str))
+            except (ValueError, AttributeError):
+                continue
+        self._state_filter = frozenset(state_filter)
+        _LOGGER.debug(f"State filter set to {len(state_filter)} uuids")
+
+    def outbound_metrics(self) -> dict[str, dict[str, Any]]:
+        """Return statistics of the outbound queue lanes."""
+        return {
+            "lanes": self._message_queue.metrics(),
+            "coalesced_commands": self.coalesced_commands,
+        }
 
     def _websocket_ssl_context(self) -> ssl.SSLContext | None:
         """Return an unverified TLS context when explicitly configured."""
@@ -240,6 +428,16 @@ class LoxoneBaseConnection:
             _LOGGER.debug("Token reset successfully")
         except Exception as e:
             _LOGGER.error(f"Failed to reset token: {e}")
+        self._token_changed()
+
+    def _token_changed(self) -> None:
+        """Hand the current token to the token callback, to persist it."""
+        if self._token_callback is None:
+            return
+        try:
+            self._token_callback(self.get_token_dict())
+        except Exception as e:
+            _LOGGER.error(f"Token callback failed: {e}")
 
     async def _send_text_command(
         self, command: str = "", encrypted: bool = False
@@ -247,8 +445,8 @@ class LoxoneBaseConnection:
         """Send a (text) command to the Miniserver, and return the response.
 
         If encrypted=True, the message will be encrypted, and will be sent using
-        Loxone's 'jdev/sys/enc' command. We do not handle 'jdev/sys/fenc'
-        full encryption, which encrypts the response as well.
+        Loxone's 'jdev/sys/enc' command, or 'jdev/sys/fenc' with full
+        encryption, which encrypts the response as well.
 
         Miniserver gen 2 uses TLS, so most commands do not need encrypting. But
         some commands (to do with tokens) still seem to need it.
@@ -256,19 +454,7 @@ class LoxoneBaseConnection:
         """
         _LOGGER.debug(f"Send text command: {command}")
         if encrypted:
-            if self._new_salt_needed():
-                old_salt = self._salt
-                self._generate_salt()
-                # The miniserver needs the text terminated with a zero byte,
-                # though this is not documented
-                command_string = f"nextSalt/{old_salt}/{self._salt}/{command}\x00"
-            else:
-                command_string = f"salt/{self._salt}/{command}\x00"
-            padded_bytes = Padding.pad(bytes(command_string, "utf-8"), 16)
-            aes_cipher = AES.new(self._aes_key, AES.MODE_CBC, self._iv)
-            cipher = b64encode(aes_cipher.encrypt(padded_bytes))
-            enc_cipher = urllib.parse.quote(cipher.decode())
-            command = f"jdev/sys/enc/{enc_cipher}"
+            command = self._encode_command(command)
         try:
             # Check if connection is open before sending
             if not self.connection or not self.is_connected:
@@ -282,22 +468,92 @@ class LoxoneBaseConnection:
             _LOGGER.error("Error while sending...", e)
             raise e
 
-    def _decrypt(self, command: str) -> bytes:
-        """AES decrypt a command returned by the miniserver."""
+    def _encode_command(self, command: str) -> str:
+        """Return the command as sent when flagged encrypted."""
+        if self._plain_io_unencrypted and command.startswith("jdev/sps/io/"):
+            return command
+        if self._new_salt_needed():
+            old_salt = self._salt
+            self._generate_salt()
+            # The miniserver needs the text terminated with a zero byte,
+            # though this is not documented
+            return self._cipher.encrypt(
+                f"nextSalt/{old_salt}/{self._salt}/{command}\x00"
+            )
+        return self._cipher.encrypt(f"salt/{self._salt}/{command}\x00")
+
+    async def request(
+        self,
+        command: str,
+        encrypted: bool = False,
+        timeout: Optional[float] = None,
+        lane: Lane = Lane.PROTOCOL,
+    ) -> LLResponse:
+        """Send a command and return the response of the Miniserver.
+
+        The command is queued in lane and the response is matched to it by its
+        control. Raises TimeoutError if no response arrives within timeout
+        seconds. The round trip time from sending the command is stored in
+        LLResponse.round_trip.
+
+        Must not be awaited from _websocket_event, which resolves the request.
+        """
+        loop = asyncio.get_running_loop()
+        key = request_key(command)
+        future = loop.create_future()
+        waiting = self._pending_requests.setdefault(key, deque())
+        waiting.append(future)
+        message = MessageForQueue(
+            command, encrypted, lane=lane, sent=loop.create_future()
+        )
+
+        async def send_and_wait() -> tuple[LLResponse, float]:
+            await self._message_queue.put(message, lane)
+            sent_at = await message.sent
+            return await future, sent_at
+
+        try:
+            response, sent_at = await asyncio.wait_for(
+                send_and_wait(), timeout=timeout or self.timeout or TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No response to {key} within timeout") from None
+        finally:
+            if future in waiting:
+                waiting.remove(future)
+            if not waiting and self._pending_requests.get(key) is waiting:
+                del self._pending_requests[key]
+        response.round_trip = time.perf_counter() - sent_at
+        _LOGGER.debug(f"Response to {key} after {response.round_trip * 1000:.1f} ms")
+        return response
+
+    def _resolve_request(self, message: TextMessage) -> None:
+        """Hand a response to the oldest request waiting for it."""
+        waiting = self._pending_requests.get(request_key(message.control))
+        while waiting:
+            future = waiting.popleft()
+            if not future.done():
+                response = message.response
+                # The control may have been decrypted in the meantime
+                response.control = check_and_decode_if_needed(message.control)
+                future.set_result(response)
+                return
+
+    def _fail_pending_requests(self, exc: Exception) -> None:
+        for waiting in self._pending_requests.values():
+            for future in waiting:
+                if not future.done():
+                    future.set_exception(exc)
+        self._pending_requests.clear()
+
+    def _decrypt(self, command: Union[str, bytes]) -> bytes:
+        """AES decrypt a command or response returned by the miniserver."""
         # control will be in the form:
-        # "jdev/sys/enc/CHG6k...A=="
+        # "jdev/sys/enc/CHG6k...A==", a fully encrypted response is only
+        # the base64 cipher text
         # Encrypted strings returned by the miniserver are not %encoded (even
         # if they were when sent to the miniserver )
-        remove_text = "jdev/sys/enc/"
-        enc_text = (
-            command[len(remove_text) :] if command.startswith(remove_text) else command
-        )
-        decoded = b64decode(enc_text)
-        aes_cipher = AES.new(self._aes_key, AES.MODE_CBC, self._iv)
-        decrypted = aes_cipher.decrypt(decoded)
-        unpadded = Padding.unpad(decrypted, 16)
-        # The miniserver seems to terminate the text with a zero byte
-        return unpadded.rstrip(b"\x00")
+        return self._cipher.decrypt(command)
 
     def _generate_salt(self) -> None:
         try:
@@ -334,15 +590,108 @@ class LoxoneBaseConnection:
             else:
                 command = f"{CMD_REFRESH_TOKEN_JSON_WEB}{token_hash}/{self.username}"
 
-            try:
-                await self._message_queue.put(MessageForQueue(command, True))
-            except asyncio.TimeoutError:
-                _LOGGER.error("Timeout adding refresh token command to queue")
-                raise
+            response = await self.request(command, encrypted=True)
+            _LOGGER.debug("Got token refresh response")
+            value_dict = response.value_as_dict
+            token = value_dict.get("token")
+            valid_until = value_dict.get("validUntil")
+
+            if not token:
+                raise ValueError("Received empty token in refresh")
+            if valid_until is None:
+                raise ValueError("Missing validUntil in refresh")
+
+            self._token.token = token
+            self._token.valid_until = valid_until
+
+            if "unsecurePass" in value_dict:
+                self._token.unsecure_password = value_dict.get("unsecurePass", False)
+
+            _LOGGER.debug(f"Token refreshed successfully, valid until: {valid_until}")
+            self._token_changed()
         except Exception as e:
             _LOGGER.error(f"Token refresh failed: {e}")
             raise
 
+    async def _authenticate(self) -> None:
+        """Exchange the session key and authenticate with a (new) token."""
+        try:
+            if not self._session_key:
+                raise RuntimeError("Session key not initialized")
+            # The Miniserver handles the commands of a websocket in order, so
+            # the key and salt are requested without waiting for the key
+            # exchange. This saves a round trip on every (re)connect.
+            exchange_response, response = await asyncio.gather(
+                self.request(f"{CMD_KEY_EXCHANGE}{self._session_key.decode()}"),
+                self.request(f"{CMD_GET_KEY_AND_SALT}/{self.username}", encrypted=True),
+            )
+            if exchange_response.code != 200:
+                # The Miniserver may have a new key, fetch it on the next open
+                _public_keys.pop(self.miniserver_serial, None)
+                raise LoxoneException(f"Key exchange failed ({exchange_response.code})")
+            _LOGGER.debug("Key exchange with miniserver...")
+            _LOGGER.debug("Got get key2")
+            value_dict = response.value_as_dict
+            self._key = value_dict.get("key", "")
+            self._user_salt = value_dict.get("salt", "")
+            self._hash_alg = value_dict.get("hashAlg", "SHA1")
+
+            if not self._key:
+                raise ValueError("Key is empty")
+            if not self._user_salt:
+                raise ValueError("Salt is empty")
+
+            if self._token.seconds_to_expire() > 100:
+                _LOGGER.debug("Use old token...")
+                token_hash = self._hash_token()
+                if token_hash is None:
+                    raise RuntimeError("Failed to hash token")
+                response = await self.request(
+                    f"{CMD_AUTH_WITH_TOKEN}{token_hash}/{self.username}",
+                    encrypted=True,
+                )
+                if response.code == 401:
+                    self.reset_token()
+                    raise LoxoneTokenError("Token authentication failed (401)")
+                _LOGGER.debug("Got message authwithtoken")
+            else:
+                _LOGGER.debug("Acquire new token...")
+                new_hash = self._hash_credentials()
+                if new_hash is None:
+                    raise RuntimeError("Failed to hash credentials")
+
+                # Request new Token
+                if self.miniserver_version < [10, 2]:
+                    command = f"{CMD_REQUEST_TOKEN}/{new_hash}/{self.username}/{TOKEN_PERMISSION}/edfc5f9a-df3f-4cad-9dddcdc42c732b82/pyloxone_api"
+                else:
+                    command = f"{CMD_REQUEST_TOKEN_JSON_WEB}/{new_hash}/{self.username}/{TOKEN_PERMISSION}/edfc5f9a-df3f-4cad-9dddcdc42c732b82/pyloxone_api"
+                response = await self.request(command, encrypted=True)
+                value_dict = response.value_as_dict
+
+                self._token.token = value_dict.get("token")
+                self._token.valid_until = value_dict.get("validUntil", 0)
+                self._token.key = value_dict.get("key", "")
+                self._token.hash_alg = self._hash_alg
+
+                if "unsecurePass" in value_dict:
+                    self._token.unsecure_password = value_dict.get(
+                        "unsecurePass", False
+                    )
+
+                if not self._token.token:
+                    raise ValueError("Received empty token")
+                self._token_changed()
+
+            await self._message_queue.put(
+                MessageForQueue(f"{CMD_ENABLE_UPDATES}", True, lane=Lane.PROTOCOL),
+                Lane.PROTOCOL,
+            )
+        except (asyncio.CancelledError, LoxoneTokenError):
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Authentication with miniserver failed: {e}")
+            raise LoxoneConnectionError("Authentication failed") from e
+
     def _hash_token(self):
         try:
             if not self._token or not self._token.token:
@@ -382,17 +731,17 @@ class LoxoneBaseConnection:
             _LOGGER.error(f"Token hashing error: {e}")
             return None
 
-    async def _send_secure(self, device_uuid, value, code):
-        pwd_hash_str = code + ":" + self._visual_hash.salt
-        if self._visual_hash.hash_alg == "SHA1":
+    def _hash_visual_password(self, visual_hash: LxJsonKeySalt, code: str):
+        pwd_hash_str = code + ":" + visual_hash.salt
+        if visual_hash.hash_alg == "SHA1":
             m = hashlib.sha1()
             hash_module = SHA1
-        elif self._visual_hash.hash_alg == "SHA256":
+        elif visual_hash.hash_alg == "SHA256":
             m = hashlib.sha256()
             hash_module = SHA256
         else:
             _LOGGER.error(
-                "Unrecognised hash algorithm: {}".format(self._visual_hash.hash_alg)
+                "Unrecognised hash algorithm: {}".format(visual_hash.hash_alg)
             )
             return None
 
@@ -400,18 +749,69 @@ class LoxoneBaseConnection:
         pwd_hash = m.hexdigest().upper()
 
         digester = HMAC.new(
-            bytes.fromhex(self._visual_hash.key), pwd_hash.encode("utf-8"), hash_module
+            bytes.fromhex(visual_hash.key), pwd_hash.encode("utf-8"), hash_module
         )
-        new_hash = digester.hexdigest()
-        # Ensure value is string when formatting command
-        command = "jdev/sps/ios/{}/{}/{}".format(new_hash, device_uuid, str(value))
-        # Fix: Use await with put() and timeout for critical secure commands
-        try:
-            await self._message_queue.put(MessageForQueue(command, True))
-        except asyncio.TimeoutError:
-            _LOGGER.error(f"Timeout queueing secure command for {device_uuid}")
-            raise
-        return None
+        return digester.hexdigest()
+
+    async def _get_visual_hash(self) -> LxJsonKeySalt:
+        """Return the visual password key and salt, requested if outdated."""
+        if (
+            self._visual_hash is not None
+            and time_elapsed_in_seconds() - self._visual_hash.time_elapsed_in_seconds
+            < VISUAL_SALT_MAX_AGE_SECONDS
+        ):
+            return self._visual_hash
+        command = f"{CMD_GET_VISUAL_PASSWD}{self.username}"
+        _LOGGER.debug(f"Request visual password salt: {command}")
+        response = await self.request(command, encrypted=True, lane=Lane.SECURED)
+        value_dict = response.value_as_dict
+        key_and_salt = LxJsonKeySalt(
+            value_dict.get("key"),
+            value_dict.get("salt"),
+            value_dict.get("hashAlg", "SHA1"),
+        )
+        key_and_salt.time_elapsed_in_seconds = time_elapsed_in_seconds()
+        self._visual_hash = key_and_salt
+        return key_and_salt
+
+    async def _send_pending_secured(self) -> None:
+        """Hash and queue the pending secured commands.
+
+        All commands waiting for the same salt are sent together, the
+        password hash is computed once per code.
+        """
+        while self._pending_secured:
+            try:
+                visual_hash = await self._get_visual_hash()
+            except Exception as e:
+                pending, self._pending_secured = self._pending_secured, {}
+                for _, _, waiter in pending.values():
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                continue
+
+            pending, self._pending_secured = self._pending_secured, {}
+            hashes: dict[str, Optional[str]] = {}
+            for device_uuid, (value, code, waiter) in pending.items():
+                try:
+                    if code not in hashes:
+                        hashes[code] = self._hash_visual_password(visual_hash, code)
+                    if hashes[code] is None:
+                        raise ValueError("Could not hash the visual password")
+                    # Ensure value is string when formatting command
+                    command = "jdev/sps/ios/{}/{}/{}".format(
+                        hashes[code], device_uuid, str(value)
+                    )
+                    await self._message_queue.put(
+                        MessageForQueue(command, True, lane=Lane.SECURED),
+                        Lane.SECURED,
+                    )
+                except Exception as e:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                else:
+                    if not waiter.done():
+                        waiter.set_result(None)
 
     def _hash_credentials(self):
         try:
@@ -456,9 +856,122 @@ class LoxoneConnection(LoxoneBaseConnection):
         await self.close()
 
     async def start_listening(
-        self, callback: Optional[Callable[[str, Any], Optional[Awaitable[None]]]] = None
+        self,
+        callback: Optional[Callable[[str, Any], Optional[Awaitable[None]]]] = None,
+        connection_callback: Optional[Callable[[bool], None]] = None,
+    ) -> None:
+        """Open, and listen until the connection is closed.
+
+        A lost connection is resumed with exponential backoff, reusing the
+        structure file and the token. connection_callback is called with
+        False when the connection is lost and with True once the connection
+        is authenticated again. A failed authentication counts as a failed
+        attempt, so it is retried with backoff as well.
+        Raises LoxoneStructureChangedError if the structure file changed in
+        the meantime, a new setup is needed then.
+        """
+        attempt = 0
+
+        def authenticated() -> None:
+            nonlocal attempt
+            if attempt:
+                _LOGGER.info(
+                    f"Reconnected to the Miniserver after {attempt} attempt(s)"
+                )
+                self.reconnects += 1
+            attempt = 0
+            if connection_callback:
+                connection_callback(True)
+
+        while True:
+            try:
+                await self._listen(callback, authenticated)
+            except (
+                LoxoneConnectionError,
+                LoxoneConnectionClosedOk,
+                LoxoneOutOfServiceException,
+                LoxoneTokenError,
+                ConnectionError,
+                TimeoutError,
+            ) as e:
+                if self._closed:
+                    return
+                _LOGGER.warning(f"Connection to the Miniserver lost ({e!r})")
+            else:
+                if self._closed:
+                    return
+                _LOGGER.warning("Connection to the Miniserver ended")
+            if connection_callback:
+                connection_callback(False)
+
+            while True:
+                delay = reconnect_delay(attempt)
+                attempt += 1
+                _LOGGER.debug(f"Reconnecting in {delay:.1f} seconds")
+                try:
+                    await asyncio.wait_for(self._shutdown_event.wait(), delay)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    self.connection = await self.resume()
+                    break
+                except (LoxoneStructureChangedError, LoxoneUnauthorisedError):
+                    raise
+                except Exception as e:
+                    _LOGGER.debug(f"Reconnect attempt {attempt} failed: {e}")
+
+            if self._closed:
+                return
+
+    async def resume(self) -> LoxoneClientConnection:
+        """Connect the websocket again after the connection was lost.
+
+        The structure file, the session key and the token of the first open()
+        are reused. Only the structure version is requested, to check that
+        the structure file is still up to date.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot resume a closed connection")
+        if self.connection is not None:
+            try:
+                await self.connection.close()
+            except Exception as e:
+                _LOGGER.debug(f"Error closing the lost websocket: {e}")
+            self.connection = None
+
+        connector = LoxoneAsyncHttpClient(
+            url=self.url,
+            username=self.username,
+            password=self.password,
+            scheme=self.scheme,
+            verify_ssl=self.verify_ssl,
+            session=self._session,
+        )
+        try:
+            last_modified = await self._get_structure_version(connector)
+        finally:
+            if self._session is None:
+                await connector.session.close()
+        if last_modified != self.structure_file.get("lastModified", last_modified):
+            raise LoxoneStructureChangedError(
+                f"Structure file changed ({last_modified})"
+            )
+
+        self._generate_salt()
+        # The visual password salt belongs to the lost session
+        self._visual_hash = None
+        return await self._connect_websocket()
+
+    async def _listen(
+        self,
+        callback: Optional[Callable[[str, Any], Optional[Awaitable[None]]]],
+        authenticated: Optional[Callable[[], None]] = None,
     ) -> None:
-        """Open, and start listening."""
+        """Listen on the current connection until it is lost or closed.
+
+        authenticated is called once the connection is authenticated.
+        """
 
         if not self.connection:
             _LOGGER.debug("No existing connection found. Opening a new connection.")
@@ -469,6 +982,8 @@ class LoxoneConnection(LoxoneBaseConnection):
 
         # Clear shutdown event when starting
         self._shutdown_event.clear()
+        # Do not dispatch messages left over from a previous connection
+        self._dispatch_queue = asyncio.Queue(maxsize=self._dispatch_queue_size)
 
         async def keep_alive() -> NoReturn:
             """Send keep-alive messages to the Miniserver."""
@@ -521,46 +1036,23 @@ class LoxoneConnection(LoxoneBaseConnection):
                         if self._shutdown_event.is_set():
                             break
 
-                        command = f"{CMD_GET_KEY}"
                         # gets a new key for the token refresh
-                        # Store old key and create event to wait for update
-                        old_key = self._key
-                        key_updated_event = asyncio.Event()
-                        self._key_update_event = (
-                            key_updated_event  # Store for _websocket_event to signal
-                        )
-
-                        try:
-                            _ = asyncio.create_task(
-                                self._send_text_command(command, encrypted=False)
-                            )
-                            await asyncio.sleep(0)
-                        except Exception as exc:
-                            _LOGGER.error(f"Error requesting new key: {exc}")
-                            self._key_update_event = None
-                            await asyncio.sleep(1)
-                            continue
-
                         try:
-                            await asyncio.sleep(0)
-                            await asyncio.wait_for(
-                                key_updated_event.wait(), timeout=15.0
-                            )
-                            # Verify key actually changed
-                            if self._key == old_key:
-                                _LOGGER.warning(
-                                    "Key was not updated despite event being set"
-                                )
-                                continue
-                            else:
-                                _LOGGER.debug("Key changed successfully.")
-                                _ = asyncio.create_task(self._refresh_token())
-                        except asyncio.TimeoutError:
+                            response = await self.request(CMD_GET_KEY, timeout=15.0)
+                        except TimeoutError:
                             _LOGGER.warning(
                                 "Timed out waiting for new key (15s). Will retry on next cycle."
                             )
-                        finally:
-                            self._key_update_event = None
+                            continue
+                        _LOGGER.debug("Got get getkey")
+                        old_key = self._key
+                        self._key = response.value_as_dict.get("value", "")
+                        # Verify key actually changed
+                        if self._key == old_key:
+                            _LOGGER.warning("Key was not updated")
+                            continue
+                        _LOGGER.debug("Key changed successfully.")
+                        await self._refresh_token()
 
                     except asyncio.CancelledError:
                         raise
@@ -575,17 +1067,6 @@ class LoxoneConnection(LoxoneBaseConnection):
                 _LOGGER.error(f"Token refresh task failed: {exc}")
                 raise
 
-        try:
-            if not self._session_key:
-                raise RuntimeError("Session key not initialized")
-
-            await self.connection.send(
-                f"{CMD_KEY_EXCHANGE}{self._session_key.decode()}"
-            )
-        except Exception as e:
-            _LOGGER.error(f"Failed to send key exchange: {e}")
-            raise
-
         async def reconnect_task() -> None:
             try:
                 while True:
@@ -616,9 +1097,16 @@ class LoxoneConnection(LoxoneBaseConnection):
                 # Task was canceled during shutdown
                 raise
 
+        async def authenticate() -> None:
+            await self._authenticate()
+            if authenticated:
+                authenticated()
+
         # noinspection PyUnreachableCode
         self._pending_task = [
-            asyncio.create_task(self._do_start_listening(callback, self.connection)),
+            asyncio.create_task(self._do_start_listening(self.connection)),
+            asyncio.create_task(self._dispatch_messages(callback)),
+            asyncio.create_task(authenticate()),
             asyncio.create_task(self._process_message()),
             asyncio.create_task(keep_alive()),
             asyncio.create_task(check_refresh_token()),
@@ -665,6 +1153,7 @@ class LoxoneConnection(LoxoneBaseConnection):
         except Exception:
             raise
         finally:
+            self._fail_pending_requests(LoxoneConnectionError("Connection closed"))
             # Cancel pending tasks
             for task in self._pending_task:
                 if task and not task.done():
@@ -673,6 +1162,24 @@ class LoxoneConnection(LoxoneBaseConnection):
             if self._pending_task:
                 await asyncio.gather(*self._pending_task, return_exceptions=True)
 
+    def _dequeued(self, msg: MessageForQueue) -> None:
+        """Update the per control bookkeeping once msg has left the queue."""
+        if msg.device_uuid is None:
+            return
+        lane, count = self._queued_per_device.get(msg.device_uuid, (msg.lane, 1))
+        if count > 1:
+            self._queued_per_device[msg.device_uuid] = (lane, count - 1)
+        else:
+            self._queued_per_device.pop(msg.device_uuid, None)
+        if msg.coalesce_key is None:
+            return
+        # Stop coalescing into msg
+        pending = self._pending_values.get(msg.device_uuid)
+        if pending and pending.get(msg.coalesce_key) is msg:
+            del pending[msg.coalesce_key]
+            if not pending:
+                del self._pending_values[msg.device_uuid]
+
     async def _process_message(self) -> NoReturn:
         """Process queued messages with graceful shutdown."""
         _LOGGER.debug("Message processing task started")
@@ -682,14 +1189,17 @@ class LoxoneConnection(LoxoneBaseConnection):
                 try:
                     # Use asyncio.Queue.get() with timeout
                     msg = await self._message_queue.get()
-                    await asyncio.sleep(0)
+                    self._dequeued(msg)
                     try:
-                        _ = asyncio.create_task(
-                            self._send_text_command(msg.command, encrypted=msg.flag)
-                        )
-                        await asyncio.sleep(0)
+                        # Send one by one. While a send waits for the
+                        # connection, newer values replace queued ones.
+                        await self._send_text_command(msg.command, encrypted=msg.flag)
+                        if msg.sent is not None and not msg.sent.done():
+                            msg.sent.set_result(time.perf_counter())
                     except Exception as e:
                         _LOGGER.error(f"Error sending message: {e}")
+                        if msg.sent is not None and not msg.sent.done():
+                            msg.sent.set_exception(e)
                     finally:
                         # Mark task as done for queue.join()
                         self._message_queue.task_done()
@@ -712,6 +1222,7 @@ class LoxoneConnection(LoxoneBaseConnection):
             while not self._message_queue.empty():
                 try:
                     msg = self._message_queue.get_nowait()
+                    self._dequeued(msg)
                     remaining_count += 1
                     try:
                         await self._send_text_command(msg.command, encrypted=msg.flag)
@@ -734,13 +1245,10 @@ class LoxoneConnection(LoxoneBaseConnection):
             _LOGGER.error(f"Message processing task failed: {e}")
             raise
 
-    async def _do_start_listening(
-        self,
-        callback: Optional[Callable[[Any], Optional[Awaitable[None]]]],
-        connection: LoxoneClientConnection,
-    ) -> None:
-
-        # Optimization: Use a set for O(1) lookup instead of creating a list every iteration
+    async def _dispatch_messages(
+        self, callback: Optional[Callable[[Any], Optional[Awaitable[None]]]]
+    ) -> NoReturn:
+        """Handle received messages one by one, in the order they arrived."""
         callback_types = {
             MessageType.VALUE_STATES,
             MessageType.TEXT_STATES,
@@ -748,13 +1256,41 @@ class LoxoneConnection(LoxoneBaseConnection):
             MessageType.KEEPALIVE,
         }
 
-        last_header = None
-
-        async def _run_callback(msg):
+        while True:
+            message = await self._dispatch_queue.get()
             try:
-                await callback(msg.as_dict())
+                await self._websocket_event(message)
+                if callback and message.message_type in callback_types:
+                    await callback(message.as_dict())
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 _LOGGER.error(f"Callback error: {e}", exc_info=True)
+            finally:
+                self._dispatch_queue.task_done()
+
+    async def _queue_for_dispatch(self, message: BaseMessage) -> None:
+        try:
+            self._dispatch_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if (
+                self._overflow_policy == DISPATCH_OVERFLOW_DROP_NEWEST
+                and message.message_type != MessageType.TEXT
+            ):
+                self.dropped_messages += 1
+                _LOGGER.warning(
+                    f"Dispatch queue is full, dropping {message.message_type.name} "
+                    f"({self.dropped_messages} dropped so far)"
+                )
+                return
+            await self._dispatch_queue.put(message)
+
+    async def _do_start_listening(
+        self,
+        connection: LoxoneClientConnection,
+    ) -> None:
+
+        last_header = None
 
         try:
             async for message in connection:
@@ -770,22 +1306,27 @@ class LoxoneConnection(LoxoneBaseConnection):
                     if last_header.message_type == MessageType.OUT_OF_SERVICE:
                         raise LoxoneOutOfServiceException
                     if last_header.message_type == MessageType.KEEPALIVE:
-                        asyncio.create_task(_run_callback(Keepalive("")))
+                        await self._queue_for_dispatch(KEEPALIVE)
 
                 elif last_header and last_header.payload_length == message_length:
                     msg_type = last_header.message_type
 
                     if msg_type == MessageType.TEXT:
+                        if self._full_encryption and not _is_plain_text(message):
+                            try:
+                                message = self._decrypt(message)
+                            except (ValueError, binascii.Error) as e:
+                                _LOGGER.error(
+                                    f"Dropping response which could not be decrypted: {e}"
+                                )
+                                continue
                         message = check_and_decode_if_needed(message)
 
-                    parsed_message = parse_message(message, msg_type)
-
-                    # Fire internal event processing
-                    asyncio.create_task(self._websocket_event(parsed_message))
+                    parsed_message = parse_message(
+                        message, msg_type, self._state_filter, self.states
+                    )
 
-                    # Fire external callback if type matches
-                    if callback and msg_type in callback_types:
-                        asyncio.create_task(_run_callback(parsed_message))
+                    await self._queue_for_dispatch(parsed_message)
                 else:
                     _LOGGER.error(f"Message not handled: {message}")
         except asyncio.CancelledError:
@@ -806,6 +1347,9 @@ class LoxoneConnection(LoxoneBaseConnection):
             raise RuntimeError("Cannot open a closed connection")
 
         connector = None
+        structure_task = None
+        connection = None
+        self._session = session
         try:
             connector = LoxoneAsyncHttpClient(
                 url=self.url,
@@ -815,161 +1359,197 @@ class LoxoneConnection(LoxoneBaseConnection):
                 verify_ssl=self.verify_ssl,
                 session=session,
             )
-            api_resp = None
-            for attempt in range(RECONNECT_TRIES):
-                try:
-                    api_resp = await connector.get(CMD_GET_API_KEY)
-                    break  # connection successful
-                except (
-                    LoxoneServiceUnAvailableError,
-                    ConnectionError,
-                    OSError,
-                    TimeoutError,
-                ) as e:
-                    if attempt < RECONNECT_TRIES - 1:
-                        _LOGGER.debug(
-                            f"Connection error (attempt {attempt + 1}/{RECONNECT_TRIES}), retrying in {RECONNECT_DELAY} seconds: {e}"
-                        )
-                        await asyncio.sleep(RECONNECT_DELAY)
-                    else:
-                        _LOGGER.exception("Max connection tries exceeded. Stopping.")
-                        raise
-                except TimeoutError:
-                    if attempt < RECONNECT_TRIES - 1:
-                        _LOGGER.debug(
-                            f"TimeoutError, try again in {RECONNECT_DELAY} seconds..."
-                        )
-                        await asyncio.sleep(RECONNECT_DELAY)
-                    else:
-                        _LOGGER.error("Max tries exceeded. Stopping.")
-                        raise
-                except ConnectionError:
-                    if attempt < RECONNECT_TRIES - 1:
-                        _LOGGER.debug(
-                            f"ConnectionError, try again in {RECONNECT_DELAY} seconds..."
-                        )
-                        await asyncio.sleep(RECONNECT_DELAY)
-                    else:
-                        _LOGGER.error("Max tries exceeded. Stopping.")
-                        raise
-            try:
-                if api_resp:
-                    data = await asyncio.wait_for(
-                        api_resp.content.read(), timeout=self.timeout or TIMEOUT
-                    )
-            except asyncio.TimeoutError:
-                raise TimeoutError("Timeout reading API key response")
-            except Exception as e:
-                raise RuntimeError(f"Failed to read API key response: {e}") from e
+            start = time.monotonic()
+            self.bootstrap_timings = {}
+            await self._timed("api_key", self._get_api_key(connector))
+
+            # The structure file is downloaded and decoded in the background
+            # while the session key is created and the websocket connects.
+            structure_task = asyncio.create_task(
+                self._timed("structure_file", self._get_structure_file(connector))
+            )
+            await self._timed("public_key", self._get_public_key(connector))
 
-            try:
-                _value = LLResponse(data).value
-            except Exception as e:
-                raise ValueError(f"Invalid API key response format: {e}") from e
+            loop = asyncio.get_running_loop()
+            # RSA is slow, keep it off the event loop
+            await self._timed(
+                "session_key", loop.run_in_executor(None, self._init_session_key)
+            )
 
-            # The json returned by the miniserver is invalid. It contains " and '.
-            # We need to normalize it
+            # generate first salt
             try:
-                value = json.loads(_value.replace("'", '"'))
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in API key response: {e}") from e
+                self._generate_salt()
             except Exception as e:
-                raise ValueError(f"Failed to parse API key response: {e}") from e
-
-            # Validate response structure
-            if not isinstance(value, dict):
-                raise ValueError(f"Expected dict response, got {type(value)}")
-
-            version_str = value.get("version")
-            if version_str:
-                try:
-                    self.miniserver_version = [int(x) for x in version_str.split(".")]
-                except (ValueError, AttributeError) as e:
-                    _LOGGER.warning(f"Invalid version format '{version_str}': {e}")
-                    self.miniserver_version = []
-            else:
-                _LOGGER.warning("No version in API response")
-                self.miniserver_version = []
+                _LOGGER.error(f"Failed to generate initial salt: {e}")
+                raise
 
-            self.miniserver_serial = value.get("snr", "")
-            local = value.get("local", True)
+            connection = await self._timed("websocket", self._connect_websocket())
 
-            if not local:
+            self.structure_file = await structure_task
+            self.structure_file["softwareVersion"] = (
+                self.miniserver_version
+            )  # FIXME Legacy use only. Need to fix pyloxone
+            seeded = await loop.run_in_executor(
+                None, seed_uuid_cache, get_state_uuids(self.structure_file)
+            )
+            _LOGGER.debug(f"Seeded uuid cache with {seeded} state uuids")
+            self.bootstrap_timings["total"] = round(time.monotonic() - start, 3)
+            _LOGGER.debug(f"Connection opened in {self.bootstrap_timings}")
+            return connection
+        except LoxoneServiceUnAvailableError:
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Failed to initialize connection: {e}", exc_info=True)
+            if connection is not None:
+                await connection.close()
+            raise
+        finally:
+            if structure_task is not None and not structure_task.done():
+                structure_task.cancel()
+            # Async httpx client must always be closed
+            if session is None and connector:
                 try:
-                    connector.base_url = str(api_resp.url).replace(CMD_GET_API_KEY, "")
-                    self.url = connector.base_url.replace("https://", "").replace(
-                        "http://", ""
-                    )
+                    await connector.session.close()
                 except Exception as e:
-                    _LOGGER.warning(f"Failed to update URL for remote access: {e}")
-
-            # Get the structure file
-            try:
-                lox_app_data = await connector.get(LOXAPPPATH)
-            except Exception as e:
-                _LOGGER.error(f"Failed to get structure file: {e}", exc_info=True)
-                raise
+                    _LOGGER.warning(f"Error closing HTTP session: {e}")
 
-            if lox_app_data.status != 200:
-                raise RuntimeError(
-                    f"Failed to get structure file, status: {lox_app_data.status}"
-                )
+    async def _timed(self, stage: str, awaitable: Awaitable[Any]) -> Any:
+        """Await a bootstrap stage and record how long it took."""
+        start = time.monotonic()
+        try:
+            return await awaitable
+        finally:
+            self.bootstrap_timings[stage] = round(time.monotonic() - start, 3)
 
+    async def _get_api_key(self, connector: LoxoneAsyncHttpClient) -> None:
+        """Read version, serial and remote url of the Miniserver."""
+        api_resp = None
+        for attempt in range(RECONNECT_TRIES):
             try:
+                api_resp = await connector.get(CMD_GET_API_KEY)
+                break  # connection successful
+            except (
+                LoxoneServiceUnAvailableError,
+                ConnectionError,
+                OSError,
+                TimeoutError,
+            ) as e:
+                if attempt < RECONNECT_TRIES - 1:
+                    _LOGGER.debug(
+                        f"Connection error (attempt {attempt + 1}/{RECONNECT_TRIES}), retrying in {RECONNECT_DELAY} seconds: {e}"
+                    )
+                    await asyncio.sleep(RECONNECT_DELAY)
+                else:
+                    _LOGGER.exception("Max connection tries exceeded. Stopping.")
+                    raise
+            except TimeoutError:
+                if attempt < RECONNECT_TRIES - 1:
+                    _LOGGER.debug(
+                        f"TimeoutError, try again in {RECONNECT_DELAY} seconds..."
+                    )
+                    await asyncio.sleep(RECONNECT_DELAY)
+                else:
+                    _LOGGER.error("Max tries exceeded. Stopping.")
+                    raise
+            except ConnectionError:
+                if attempt < RECONNECT_TRIES - 1:
+                    _LOGGER.debug(
+                        f"ConnectionError, try again in {RECONNECT_DELAY} seconds..."
+                    )
+                    await asyncio.sleep(RECONNECT_DELAY)
+                else:
+                    _LOGGER.error("Max tries exceeded. Stopping.")
+                    raise
+        try:
+            if api_resp:
                 data = await asyncio.wait_for(
-                    lox_app_data.content.read(), timeout=self.timeout or TIMEOUT
+                    api_resp.content.read(), timeout=self.timeout or TIMEOUT
                 )
-                self.structure_file = json.loads(data)
-                self.structure_file["softwareVersion"] = (
-                    self.miniserver_version
-                )  # FIXME Legacy use only. Need to fix pyloxone
-            except asyncio.TimeoutError:
-                raise TimeoutError("Timeout reading structure file")
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON in structure file: {e}") from e
-            except Exception as e:
-                raise RuntimeError(f"Failed to read structure file: {e}") from e
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout reading API key response")
+        except Exception as e:
+            raise RuntimeError(f"Failed to read API key response: {e}") from e
 
-            # Get the public key
+        try:
+            _value = LLResponse(data).value
+        except Exception as e:
+            raise ValueError(f"Invalid API key response format: {e}") from e
+
+        # The json returned by the miniserver is invalid. It contains " and '.
+        # We need to normalize it
+        try:
+            value = json.loads(_value.replace("'", '"'))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in API key response: {e}") from e
+        except Exception as e:
+            raise ValueError(f"Failed to parse API key response: {e}") from e
+
+        # Validate response structure
+        if not isinstance(value, dict):
+            raise ValueError(f"Expected dict response, got {type(value)}")
+
+        version_str = value.get("version")
+        if version_str:
             try:
-                pk_data = await connector.get(CMD_GET_PUBLIC_KEY)
-            except Exception as e:
-                raise RuntimeError(f"Failed to get public key: {e}") from e
+                self.miniserver_version = [int(x) for x in version_str.split(".")]
+            except (ValueError, AttributeError) as e:
+                _LOGGER.warning(f"Invalid version format '{version_str}': {e}")
+                self.miniserver_version = []
+        else:
+            _LOGGER.warning("No version in API response")
+            self.miniserver_version = []
+
+        self.miniserver_serial = value.get("snr", "")
+        local = value.get("local", True)
 
+        if not local:
             try:
-                pk_data_text = await asyncio.wait_for(
-                    pk_data.content.read(), timeout=self.timeout or TIMEOUT
+                connector.base_url = str(api_resp.url).replace(CMD_GET_API_KEY, "")
+                self.url = connector.base_url.replace("https://", "").replace(
+                    "http://", ""
                 )
-            except asyncio.TimeoutError:
-                raise TimeoutError("Timeout reading public key")
             except Exception as e:
-                raise RuntimeError(f"Failed to read public key: {e}") from e
+                _LOGGER.warning(f"Failed to update URL for remote access: {e}")
 
-            try:
-                pk = LLResponse(pk_data_text).value
-            except Exception as e:
-                raise ValueError(f"Invalid public key response format: {e}") from e
+    async def _get_public_key(self, connector: LoxoneAsyncHttpClient) -> None:
+        if public_key := _public_keys.get(self.miniserver_serial):
+            _LOGGER.debug("Using cached public key")
+            self._public_key = public_key
+            return
+        try:
+            pk_data = await connector.get(CMD_GET_PUBLIC_KEY)
+        except Exception as e:
+            raise RuntimeError(f"Failed to get public key: {e}") from e
 
-            if not pk:
-                raise ValueError("Empty public key received")
+        try:
+            pk_data_text = await asyncio.wait_for(
+                pk_data.content.read(), timeout=self.timeout or TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout reading public key")
+        except Exception as e:
+            raise RuntimeError(f"Failed to read public key: {e}") from e
 
-            # Loxone returns a certificate instead of a key
-            self._public_key = pk.replace(
-                "-----BEGIN CERTIFICATE-----", "-----BEGIN PUBLIC KEY-----\n"
-            ).replace("-----END CERTIFICATE-----", "\n-----END PUBLIC KEY-----\n")
-        except LoxoneServiceUnAvailableError:
-            raise
+        try:
+            pk = LLResponse(pk_data_text).value
         except Exception as e:
-            _LOGGER.error(f"Failed to initialize connection: {e}", exc_info=True)
-            raise
-        finally:
-            # Async httpx client must always be closed
-            if session is None and connector:
-                try:
-                    await connector.session.close()
-                except Exception as e:
-                    _LOGGER.warning(f"Error closing HTTP session: {e}")
+            raise ValueError(f"Invalid public key response format: {e}") from e
+
+        if not pk:
+            raise ValueError("Empty public key received")
 
+        # Loxone returns a certificate instead of a key
+        self._public_key = pk.replace(
+            "-----BEGIN CERTIFICATE-----", "-----BEGIN PUBLIC KEY-----\n"
+        ).replace("-----END CERTIFICATE-----", "\n-----END PUBLIC KEY-----\n")
+        if self.miniserver_serial:
+            _public_keys[self.miniserver_serial] = self._public_key
+
+    def _init_session_key(self) -> None:
+        """Encrypt the AES session key with the public key of the Miniserver.
+
+        Blocking, runs in an executor.
+        """
         # Init RSA cipher
         try:
             if not self._public_key:
@@ -1009,14 +1589,7 @@ class LoxoneConnection(LoxoneBaseConnection):
             _LOGGER.error(f"Error generating session key: {exc}")
             raise LoxoneException(f"Session key generation failed: {exc}") from exc
 
-        # generate first salt
-        try:
-            self._generate_salt()
-        except Exception as e:
-            _LOGGER.error(f"Failed to generate initial salt: {e}")
-            raise
-
-        # Establish websocket connection
+    async def _connect_websocket(self) -> LoxoneClientConnection:
         try:
             params = {"url": self.url}
             if self.scheme == "https":
@@ -1060,6 +1633,63 @@ class LoxoneConnection(LoxoneBaseConnection):
             _LOGGER.error(f"Failed to establish websocket connection: {e}")
             raise
 
+    async def _get_structure_version(self, connector: LoxoneAsyncHttpClient) -> str:
+        """Return the lastModified of the structure file on the Miniserver."""
+        response = await connector.get(CMD_GET_STRUCTURE_VERSION)
+        data = await asyncio.wait_for(
+            response.content.read(), timeout=self.timeout or TIMEOUT
+        )
+        return LLResponse(data).value
+
+    async def _get_structure_file(self, connector: LoxoneAsyncHttpClient) -> dict:
+        """Return the structure file, from the cache if it is up to date."""
+        loop = asyncio.get_running_loop()
+        use_cache = self._structure_cache is not None and self.miniserver_serial
+        if use_cache:
+            try:
+                last_modified = await self._get_structure_version(connector)
+                structure_file = await loop.run_in_executor(
+                    None,
+                    self._structure_cache.load,
+                    self.miniserver_serial,
+                    last_modified,
+                )
+            except Exception as e:
+                _LOGGER.warning(f"Could not check the cached structure file: {e}")
+            else:
+                if structure_file is not None:
+                    _LOGGER.debug(f"Using cached structure file from {last_modified}")
+                    return structure_file
+
+        try:
+            lox_app_data = await connector.get(LOXAPPPATH)
+        except Exception as e:
+            _LOGGER.error(f"Failed to get structure file: {e}", exc_info=True)
+            raise
+
+        if lox_app_data.status != 200:
+            raise RuntimeError(
+                f"Failed to get structure file, status: {lox_app_data.status}"
+            )
+
+        try:
+            data = await asyncio.wait_for(
+                lox_app_data.content.read(), timeout=self.timeout or TIMEOUT
+            )
+            structure_file = await loop.run_in_executor(None, json.loads, data)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout reading structure file")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in structure file: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Failed to read structure file: {e}") from e
+
+        if use_cache:
+            await loop.run_in_executor(
+                None, self._structure_cache.save, self.miniserver_serial, structure_file
+            )
+        return structure_file
+
     async def close(self) -> None:
         """Gracefully close the connection and drain message queues."""
         if self._closed:
@@ -1105,6 +1735,8 @@ class LoxoneConnection(LoxoneBaseConnection):
             # clear pending tasks
             self._pending_task = []
 
+        self._fail_pending_requests(LoxoneConnectionError("Connection closed"))
+
         # Close websocket connection if present
         if self.connection:
             try:
@@ -1121,11 +1753,15 @@ class LoxoneConnection(LoxoneBaseConnection):
         _LOGGER.debug("Connection closed successfully.")
 
     async def send_websocket_command(
-        self, device_uuid: str, value: Union[str, int, float]
+        self,
+        device_uuid: str,
+        value: Union[str, int, float],
+        lane: Lane = Lane.INTERACTIVE,
     ):
         """Send a websocket command to the Miniserver.
 
         value may be a str, int or float — it will be converted to string when sent.
+        Waits while the lane of the command is full.
         """
 
         if not device_uuid or not isinstance(device_uuid, str):
@@ -1138,16 +1774,38 @@ class LoxoneConnection(LoxoneBaseConnection):
             command = "jdev/sps/io/{}/{}".format(device_uuid, str(value))
             _LOGGER.debug("Call send_websocket_command: {}".format(command))
 
+            key = coalesce_key(value)
+            if key is None:
+                # Keep the order of commands for this control
+                self._pending_values.pop(device_uuid, None)
+            else:
+                queued = self._pending_values.get(device_uuid, {}).get(key)
+                if queued is not None:
+                    # Last write wins, the queued command has not been sent yet
+                    queued.command = command
+                    self.coalesced_commands += 1
+                    return
+
+            # Never overtake commands for this control queued in a slower lane
+            queued_lane, count = self._queued_per_device.get(device_uuid, (lane, 0))
+            lane = max(lane, queued_lane)
+            message = MessageForQueue(
+                command=command,
+                flag=True,
+                device_uuid=device_uuid,
+                coalesce_key=key,
+                lane=lane,
+            )
+            self._queued_per_device[device_uuid] = (lane, count + 1)
+            if key is not None:
+                self._pending_values.setdefault(device_uuid, {})[key] = message
+            if self._message_queue.full(lane):
+                _LOGGER.debug(f"{lane.name} lane is full, waiting to queue {command}")
             try:
-                # Use put_nowait with QueueFull exception handling for backpressure
-                self._message_queue.put_nowait(
-                    MessageForQueue(command=command, flag=True)
-                )
-            except asyncio.QueueFull:
-                _LOGGER.error(
-                    f"Message queue full (size: {self._message_queue.maxsize}), dropping command for {device_uuid}"
-                )
-                raise RuntimeError("Message queue is full, cannot send command")
+                await self._message_queue.put(message, lane)
+            except BaseException:
+                self._dequeued(message)
+                raise
         except Exception as e:
             _LOGGER.error(f"Failed to send websocket command: {e}")
             raise
@@ -1162,281 +1820,63 @@ class LoxoneConnection(LoxoneBaseConnection):
         if not code or not isinstance(code, str):
             raise ValueError("code must be a non-empty string")
 
-        try:
-            command = f"{CMD_GET_VISUAL_PASSWD}{self.username}"
-            _LOGGER.debug(f"Call send_secured__websocket_command: {command}")
-
-            try:
-                # Use put_nowait with QueueFull exception handling
-                self._secured_queue.put_nowait(
-                    self._send_secure(device_uuid, value, code)
+        # A newer command for the same control replaces a waiting one, the
+        # caller of the replaced one gets LoxoneCommandSupersededError
+        waiter = asyncio.get_running_loop().create_future()
+        replaced = self._pending_secured.pop(device_uuid, None)
+        if replaced is not None and not replaced[2].done():
+            replaced[2].set_exception(
+                LoxoneCommandSupersededError(
+                    f"Secured command for {device_uuid} replaced by a newer one"
                 )
-                self._message_queue.put_nowait(
-                    MessageForQueue(command=command, flag=True)
-                )
-            except asyncio.QueueFull:
-                _LOGGER.error("Queue is full, dropping secured command")
-                raise RuntimeError("Queue is full, cannot send secured command")
+            )
+            self.coalesced_commands += 1
+        self._pending_secured[device_uuid] = (value, code, waiter)
+        if self._secured_sender is None or self._secured_sender.done():
+            self._secured_sender = asyncio.create_task(self._send_pending_secured())
+
+        try:
+            await waiter
+        except LoxoneCommandSupersededError:
+            raise
         except Exception as e:
             _LOGGER.error(f"Failed to send secured websocket command: {e}")
             raise
 
-    async def _websocket_event(self, message: dict[str, Any] | BaseMessage) -> None:
-        """Handle websocket event."""
+    async def _websocket_event(self, message: BaseMessage) -> None:
+        """Handle websocket event.
+
+        The message is parsed once in _do_start_listening and shared with the
+        callback, so it is never parsed again here.
+        """
         if message is None:
             _LOGGER.warning("Received None message")
             return
+        if not isinstance(message, BaseMessage):
+            _LOGGER.warning(f"Unexpected message type: {type(message)}")
+            return
 
-        mess_obj = None
+        mess_obj = message
         try:
-            if isinstance(message, str):
-                if message.startswith("{"):
-                    try:
-                        mess_obj = parse_message(
-                            message,
-                            (
-                                self.message_header.message_type
-                                if self.message_header
-                                else None
-                            ),
-                        )
-                    except Exception as e:
-                        _LOGGER.error(f"Failed to parse string message: {e}")
-                        return
-            elif isinstance(message, bytes):
-                try:
-                    mess_obj = parse_message(
-                        message,
-                        (
-                            self.message_header.message_type
-                            if self.message_header
-                            else None
-                        ),
-                    )
-                except Exception as e:
-                    _LOGGER.error(f"Failed to parse bytes message: {e}")
-                    return
-            elif isinstance(message, BaseMessage):
-                mess_obj = message
-            else:
-                _LOGGER.warning(f"Unexpected message type: {type(message)}")
-                return
-
-            if mess_obj is None:
-                return
-
             # Decrypt if needed
             if (
                 hasattr(mess_obj, "control")
                 and mess_obj.control
-                and mess_obj.control.find("/enc/") > -1
+                and (
+                    mess_obj.control.find("/enc/") > -1
+                    or mess_obj.control.find("/fenc/") > -1
+                )
             ):
                 try:
                     mess_obj.control = self._decrypt(mess_obj.control)
+                    mess_obj.clear_dict()
                 except Exception as e:
                     _LOGGER.error(f"Failed to decrypt control message: {e}")
                     return
 
-            # Handle key exchange
-            if isinstance(mess_obj, TextMessage) and "keyexchange" in mess_obj.message:
-                _LOGGER.debug("Key exchange with miniserver...")
-                command = f"{CMD_GET_KEY_AND_SALT}/{self.username}"
-                try:
-                    # Use put() for critical protocol messages
-                    await self._message_queue.put(MessageForQueue(command, True)),
-                except asyncio.TimeoutError:
-                    _LOGGER.error("Timeout queueing key exchange command")
-
-            # Handle getkey2
-            elif isinstance(mess_obj, TextMessage) and "getkey2" in mess_obj.message:
-                _LOGGER.debug("Got get key2")
-                try:
-                    value_dict = mess_obj.value_as_dict
-                    if not isinstance(value_dict, dict):
-                        raise ValueError("value_as_dict is not a dictionary")
-
-                    self._key = value_dict.get("key", "")
-                    self._user_salt = value_dict.get("salt", "")
-                    self._hash_alg = value_dict.get("hashAlg", "SHA1")
-
-                    if not self._key:
-                        raise ValueError("Key is empty")
-                    if not self._user_salt:
-                        raise ValueError("Salt is empty")
-
-                    if self._token.seconds_to_expire() > 100:
-                        _LOGGER.debug("Use old token...")
-                        token_hash = self._hash_token()
-                        if token_hash is None:
-                            raise RuntimeError("Failed to hash token")
-                        command = "{}{}/{}".format(
-                            CMD_AUTH_WITH_TOKEN, token_hash, self.username
-                        )
-                        await self._message_queue.put(MessageForQueue(command, True))
-                    else:
-                        _LOGGER.debug("Acquire new token...")
-                        new_hash = self._hash_credentials()
-                        if new_hash is None:
-                            raise RuntimeError("Failed to hash credentials")
-
-                        # Request new Token
-                        if self.miniserver_version < [10, 2]:
-                            command = f"{CMD_REQUEST_TOKEN}/{new_hash}/{self.username}/{TOKEN_PERMISSION}/edfc5f9a-df3f-4cad-9dddcdc42c732b82/pyloxone_api"
-                        else:
-                            command = f"{CMD_REQUEST_TOKEN_JSON_WEB}/{new_hash}/{self.username}/{TOKEN_PERMISSION}/edfc5f9a-df3f-4cad-9dddcdc42c732b82/pyloxone_api"
-                        await self._message_queue.put(MessageForQueue(command, True))
-
-                except KeyError as e:
-                    _LOGGER.error(f"Missing key in getkey2 response: {e}")
-                except asyncio.TimeoutError:
-                    _LOGGER.error("Timeout queueing getkey2 command")
-                except Exception as e:
-                    _LOGGER.error(f"Error processing getkey2: {e}")
-
-            # Handle getkey
-            elif isinstance(mess_obj, TextMessage) and "getkey" in mess_obj.message:
-                _LOGGER.debug("Got get getkey")
-                try:
-                    value_dict = mess_obj.value_as_dict
-                    if not isinstance(value_dict, dict):
-                        raise ValueError("value_as_dict is not a dictionary")
-                    self._key = value_dict.get("value", "")
-                    # Signal that key has been updated
-                    if self._key_update_event is not None:
-                        self._key_update_event.set()
-
-                except Exception as e:
-                    _LOGGER.error(f"Error processing getkey: {e}")
-
-            # Handle visual salt
-            elif (
-                isinstance(mess_obj, TextMessage) and "getvisusalt" in mess_obj.message
-            ):
-                try:
-                    value_dict = mess_obj.value_as_dict
-                    if not isinstance(value_dict, dict):
-                        raise ValueError("value_as_dict is not a dictionary")
-                    self._key = value_dict.get("value", "")
-
-                    key_and_salt = LxJsonKeySalt()
-                    key_and_salt.read_user_salt_response(mess_obj.message)
-                    key_and_salt.time_elapsed_in_seconds = time_elapsed_in_seconds()
-                    self._visual_hash = key_and_salt
-
-                    while not self._secured_queue.empty():
-                        try:
-                            awaitable = self._secured_queue.get_nowait()
-                            if awaitable:
-                                await awaitable
-                            self._secured_queue.task_done()
-                        except asyncio.QueueEmpty:
-                            break
-                        except Exception as e:
-                            _LOGGER.error(f"Error processing secured queue item: {e}")
-
-                except Exception as e:
-                    _LOGGER.error(f"Error processing visual salt: {e}")
-
-            # Handle token response
-            elif isinstance(mess_obj, TextMessage) and (
-                "gettoken" in mess_obj.message or "getjwt" in mess_obj.message
-            ):
-                try:
-                    value_dict = mess_obj.value_as_dict
-                    if not isinstance(value_dict, dict):
-                        raise ValueError("value_as_dict is not a dictionary")
-
-                    self._token.token = value_dict.get("token")
-                    self._token.valid_until = value_dict.get("validUntil", 0)
-                    self._token.key = value_dict.get("key", "")
-                    self._token.hash_alg = self._hash_alg
-
-                    if "unsecurePass" in value_dict:
-                        self._token.unsecure_password = value_dict.get(
-                            "unsecurePass", False
-                        )
-
-                    if not self._token.token:
-                        raise ValueError("Received empty token")
-
-                    await self._message_queue.put(
-                        MessageForQueue(f"{CMD_ENABLE_UPDATES}", True)
-                    )
-
-                except KeyError as e:
-                    _LOGGER.error(f"Missing key in token response: {e}")
-                except asyncio.TimeoutError:
-                    _LOGGER.error("Timeout queueing enable updates command")
-                except Exception as e:
-                    _LOGGER.error(f"Error processing token: {e}")
-
-            # Handle auth with token
-            elif isinstance(mess_obj, TextMessage) and (
-                "authwithtoken" in mess_obj.message
-            ):
-                if mess_obj.code == 401:
-                    _LOGGER.error("Token authentication failed (401)")
-                    self.reset_token()
-                    self._reconnect_event.set()
-                else:
-                    _LOGGER.debug("Got message authwithtoken")
-                    try:
-                        await self._message_queue.put(
-                            MessageForQueue(f"{CMD_ENABLE_UPDATES}", True)
-                        )
-                    except asyncio.TimeoutError:
-                        _LOGGER.error("Timeout queueing authwithtoken command")
-
-            # Handle token refresh
-            elif isinstance(mess_obj, TextMessage) and (
-                "refreshjwt" in mess_obj.message or "refresh" in mess_obj.message
-            ):
-                _LOGGER.debug(f"Got token refresh response")
-                try:
-                    value_dict = mess_obj.value_as_dict
-                    if not isinstance(value_dict, dict):
-                        raise ValueError("value_as_dict is not a dictionary")
-
-                    token = value_dict.get("token")
-                    valid_until = value_dict.get("validUntil")
-
-                    if not token:
-                        raise ValueError("Received empty token in refresh")
-                    if valid_until is None:
-                        raise ValueError("Missing validUntil in refresh")
-
-                    self._token.token = token
-                    self._token.valid_until = valid_until
-
-                    if "unsecurePass" in value_dict:
-                        self._token.unsecure_password = value_dict.get(
-                            "unsecurePass", False
-                        )
-
-                    _LOGGER.debug(
-                        f"Token refreshed successfully, valid until: {valid_until}"
-                    )
-
-                except KeyError as e:
-                    _LOGGER.error(
-                        f"Missing key in token refresh response: {e}. "
-                        f"Response: {mess_obj.value_as_dict}, "
-                        f"Message type: {type(mess_obj)}, "
-                        f"Message: {getattr(mess_obj, 'message', 'N/A')}"
-                    )
-                except Exception as e:
-                    _LOGGER.error(
-                        f"Unexpected error processing token refresh: {e}. "
-                        f"Response: {getattr(mess_obj, 'value_as_dict', 'N/A')}"
-                    )
-            # Handle binary file
-            elif isinstance(mess_obj, BinaryFile):
-                pass
-
-            elif isinstance(mess_obj, Keepalive):
-                pass
-            else:
-                pass
+            # Hand responses to the requests waiting for them
+            if isinstance(mess_obj, TextMessage):
+                self._resolve_request(mess_obj)
 
         except LoxoneTokenError:
             raise
@@ -11,22 +11,73 @@ from typing import Final
 
 RECONNECT_DELAY = 5  # maximum delay in seconds
 RECONNECT_TRIES = 100  # number of tries to reconnect before giving up
+# Backoff of the websocket resume after a lost connection, in seconds
+RECONNECT_BACKOFF_BASE: Final = 0.5
+RECONNECT_BACKOFF_MAX: Final = 60.0
 
 # Loxone constants
 MAX_WEBSOCKET_MESSAGE_SIZE: Final = 5 * 1024 * 1024  # 5 megabytes = 5,242,880 bytes
 DELAY_CHECK_TOKEN_REFRESH: Final = 20
 TIMEOUT: Final = 30
+# Keep-alive HTTP connections opened to the Miniserver while bootstrapping
+HTTP_CONNECTIONS_PER_HOST: Final = 2
 KEEP_ALIVE_PERIOD: Final = 30
 THROTTLE_CHECK_TOKEN_STILL_VALID: Final = (
     90  # 90 * KEEP_ALIVE_PERIOD -> 43200 sek -> 6 h
 )
 
+# Received messages wait in a bounded queue until they are dispatched in order.
+DISPATCH_QUEUE_SIZE: Final = 1000
+# What to do with a state table when the dispatch queue is full:
+# "block" stops reading from the websocket until there is room again,
+# "drop_newest" drops the state table. Text messages always wait.
+DISPATCH_OVERFLOW_BLOCK: Final = "block"
+DISPATCH_OVERFLOW_DROP_NEWEST: Final = "drop_newest"
+
+# Which commands queued as encrypted are sent with jdev/sys/enc:
+# "always" encrypts all of them,
+# "auto" sends plain jdev/sps/io commands unencrypted on TLS connections,
+# the connection is encrypted already. Token and secured commands are
+# always encrypted.
+# "full" sends all of them with jdev/sys/fenc, the Miniserver encrypts the
+# responses as well. For Miniservers without TLS.
+COMMAND_ENCRYPTION_ALWAYS: Final = "always"
+COMMAND_ENCRYPTION_AUTO: Final = "auto"
+COMMAND_ENCRYPTION_FULL: Final = "full"
+
+# Limits of the outbound queue lanes, see outbound_queue.Lane
+PROTOCOL_LANE_SIZE: Final = 100
+SECURED_LANE_SIZE: Final = 50
+INTERACTIVE_LANE_SIZE: Final = 500
+BULK_LANE_SIZE: Final = 1000
+
+# Sub commands which set a value. While such a command waits in the outbound
+# queue, a newer one for the same control replaces it. Plain numeric values
+# are always replaced. Everything else (pulse, on, FullUp, ...) is sent as is.
+COALESCED_COMMANDS: Final = frozenset(
+    {
+        "hsv",
+        "manualLamelle",
+        "manualPosition",
+        "moveToPosition",
+        "setBrightness",
+        "setComfortModeTemp",
+        "setManualTemperature",
+        "setTarget",
+        "setTemp",
+        "temp",
+        "volume",
+    }
+)
+
 IV_BYTES: Final = 16
 AES_KEY_SIZE: Final = 32
 
 SALT_BYTES: Final = 16
 SALT_MAX_AGE_SECONDS: Final = 60 * 60
 SALT_MAX_USE_COUNT: Final = 100
+# Seconds a visual password salt is used for secured commands
+VISUAL_SALT_MAX_AGE_SECONDS: Final = 30
 
 
 # TOKEN_PERMISSION can be 2 for a 'short' lifespan token (days), or 4 for
@@ -45,10 +96,13 @@ MAX_REFRESH_DELAY: Final = 86400  # 60 * 60 * 24  # 1 day
 
 
 LOXAPPPATH: Final = "/data/LoxAPP3.json"
+# File name of a cached structure file, see StructureCache
+STRUCTURE_CACHE_FILE: Final = "loxone_{serial}_LoxAPP3.snapshot"
 
 CMD_KEEP_ALIVE: Final = "keepalive"
 CMD_GET_API_KEY: Final = "/jdev/cfg/apiKey"
 CMD_GET_PUBLIC_KEY: Final = "/jdev/sys/getPublicKey"
+CMD_GET_STRUCTURE_VERSION: Final = "/jdev/sps/LoxAPPversion3"
 CMD_KEY_EXCHANGE: Final = "jdev/sys/keyexchange/"
 CMD_GET_KEY: Final = "jdev/sys/getkey"
 CMD_GET_KEY_AND_SALT: Final = "jdev/sys/getkey2"
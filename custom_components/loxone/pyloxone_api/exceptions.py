@@ -51,6 +51,14 @@ class LoxoneCommandError(LoxoneException):
         return f"{self.code}: {self.message}"
 
 
+class LoxoneCommandSupersededError(LoxoneException):
+    """A waiting command was replaced by a newer one for the same control"""
+
+
+class LoxoneStructureChangedError(LoxoneException):
+    """The structure file changed while the connection was lost"""
+
+
 class LoxoneTimeOutError(LoxoneException):
     """An exception indicating an unusual http response from the miniserver"""
 
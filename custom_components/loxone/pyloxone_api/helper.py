@@ -41,3 +41,28 @@ def generate_hmac(data: str, hash_alg: str) -> str | None:
 
     m.update(data.encode("utf-8"))
     return m.hexdigest().upper()
+
+
+def get_control_state_uuids(control: dict):
+    """Yield the uuid of every state of a control and its sub controls."""
+    if control.get("uuidAction"):
+        yield control["uuidAction"]
+    for state in control.get("states", {}).values():
+        if isinstance(state, list):
+            yield from state
+        else:
+            yield state
+    for sub_control in control.get("subControls", {}).values():
+        yield from get_control_state_uuids(sub_control)
+
+
+def get_state_uuids(structure_file: dict):
+    """Yield the uuid of every state in the structure file."""
+    controls = structure_file.get("controls", {})
+    if hasattr(controls, "state_uuids"):
+        # A structure snapshot knows them without decoding the controls
+        yield from controls.state_uuids()
+    else:
+        for control in controls.values():
+            yield from get_control_state_uuids(control)
+    yield from structure_file.get("globalStates", {}).values()
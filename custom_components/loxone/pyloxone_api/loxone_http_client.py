@@ -11,7 +11,7 @@ import warnings
 
 import aiohttp
 
-from .const import TIMEOUT
+from .const import HTTP_CONNECTIONS_PER_HOST, TIMEOUT
 from .exceptions import (LoxoneMaxNumOfConnectionsError,
                          LoxoneServiceUnAvailableError,
                          LoxoneUnauthorisedError,
@@ -44,7 +44,12 @@ class LoxoneAsyncHttpClient:
 
         # super().__init__()
         if session is None:
-            self.session = aiohttp.ClientSession()
+            # Reuse a few keep-alive connections for all bootstrap requests
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=HTTP_CONNECTIONS_PER_HOST
+                )
+            )
             self._own_session = True
         # session.auth = aiohttp.BasicAuth(username, password)
         else:
@@ -59,6 +64,8 @@ class LoxoneAsyncHttpClient:
         self.verify_ssl = verify_ssl
         self.username = username
         self.password = password
+        self._auth = aiohttp.BasicAuth(username, password, encoding="utf-8")
+        self._client_timeout = aiohttp.ClientTimeout(total=self.timeout)
         self._closed = False
 
     async def get(self, endpoint):
@@ -78,8 +85,8 @@ class LoxoneAsyncHttpClient:
         try:
             _LOGGER.debug(f"Making GET request to: {url}")
             request_kwargs = {
-                "auth": aiohttp.BasicAuth(self.username, self.password, encoding="utf-8"),
-                "timeout": aiohttp.ClientTimeout(total=self.timeout),
+                "auth": self._auth,
+                "timeout": self._client_timeout,
             }
             if self.scheme == "https":
                 request_kwargs["ssl"] = self.verify_ssl
@@ -8,17 +8,24 @@ https://github.com/JoDehli/pyloxone-api
 import hashlib
 import json
 import logging
-import math
 import re
 import struct
+import sys
 import time
-import uuid
 from enum import IntEnum
 from functools import lru_cache
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 from .exceptions import LoxoneException
 
+if TYPE_CHECKING:
+    from .state_store import StateStore
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
 _LOGGER = logging.getLogger(__name__)
 
 # small in-memory cache for expensive encoding detection results
@@ -26,6 +33,32 @@ _encoding_cache: dict[str, Optional[str]] = {}
 _DETECT_SAMPLE_SIZE = 512  # sample length used for detection & caching
 _DETECT_MAX_BYTES = 4096  # only run heavy detection for messages <= this size
 
+# See MessageHeader for the layout
+_HEADER_STRUCT = struct.Struct("<cBccI")
+# header bytes -> parsed MessageHeader. The miniserver sends the same few
+# headers (keepalives, single value changes) over and over.
+_header_cache: dict[bytes, "MessageHeader"] = {}
+_HEADER_CACHE_MAX_SIZE = 256
+
+# raw 16 byte uuid -> interned Loxone uuid string, see uuid_key()
+_uuid_cache: dict[bytes, str] = {}
+_UUID_CACHE_MAX_SIZE = 20000
+
+# A value state record is a 16 byte uuid followed by a little endian double
+_VALUE_STATE_SIZE = 24
+_VALUE_STATE_STRUCT = struct.Struct("<16sd")
+# Below this number of records the numpy setup costs more than it saves
+_NUMPY_MIN_RECORDS = 64
+# A text state record header is a 16 byte uuid, a 16 byte icon uuid and the
+# text length as a little endian uint32. The text follows the header.
+_TEXT_STATE_HEADER = struct.Struct("<16s16xI")
+_TEXT_STATE_HEADER_WITH_ICON = struct.Struct("<16s16sI")
+_TEXT_STATE_HEADER_SIZE = _TEXT_STATE_HEADER.size
+if np is not None:
+    _VALUE_STATE_DTYPE = np.dtype([("uuid", "V16"), ("val", "<f8")])
+    # Byte order which turns a bytes_le uuid into its canonical (big endian) form
+    _UUID_LE_ORDER = np.array([3, 2, 1, 0, 5, 4, 7, 6, *range(8, 16)], dtype=np.intp)
+
 
 class AsyncTimer:
     def __init__(self, label: str, logger: logging.Logger = _LOGGER):
@@ -136,6 +169,206 @@ def check_and_decode_if_needed(message):
     return b.decode("utf-8", errors="replace")
 
 
+def loxone_uuid_str(raw: bytes) -> str:
+    """Return the Loxone string form of a 16 byte little endian uuid.
+
+    Loxone joins the last two groups of the canonical uuid string, so the
+    result looks like "xxxxxxxx-xxxx-xxxx-xxxxxxxxxxxxxxxx".
+    """
+    return (
+        f"{raw[3::-1].hex()}-{raw[5:3:-1].hex()}-{raw[7:5:-1].hex()}-{raw[8:16].hex()}"
+    )
+
+
+def loxone_uuid_bytes(uuid_str: str) -> bytes:
+    """Return the 16 byte little endian form of a Loxone uuid string.
+
+    This is the inverse of loxone_uuid_str. Raises ValueError if uuid_str
+    is not a Loxone uuid.
+    """
+    fields = uuid_str.split("-")
+    if len(fields) != 4 or [len(f) for f in fields] != [8, 4, 4, 16]:
+        raise ValueError(f"Not a Loxone uuid: {uuid_str}")
+    return (
+        bytes.fromhex(fields[0])[::-1]
+        + bytes.fromhex(fields[1])[::-1]
+        + bytes.fromhex(fields[2])[::-1]
+        + bytes.fromhex(fields[3])
+    )
+
+
+def _cache_uuid(raw: bytes, uuid_str: str) -> str:
+    uuid_str = sys.intern(uuid_str)
+    if len(_uuid_cache) >= _UUID_CACHE_MAX_SIZE:
+        # Drop the oldest entry. Dicts keep insertion order.
+        del _uuid_cache[next(iter(_uuid_cache))]
+    _uuid_cache[raw] = uuid_str
+    return uuid_str
+
+
+def uuid_key(raw: bytes) -> str:
+    """Return the interned Loxone uuid string for a raw 16 byte uuid.
+
+    The miniserver sends the same few thousand uuids over and over, so the
+    strings are cached by their raw bytes.
+    """
+    try:
+        return _uuid_cache[raw]
+    except KeyError:
+        return _cache_uuid(raw, loxone_uuid_str(raw))
+
+
+def seed_uuid_cache(uuids) -> int:
+    """Pre-fill the uuid cache from Loxone uuid strings.
+
+    Entries which are not Loxone uuids are skipped. Returns the number of
+    uuids added.
+    """
+    added = 0
+    for uuid_str in uuids:
+        try:
+            raw = loxone_uuid_bytes(uuid_str)
+        except (ValueError, AttributeError):
+            continue
+        if raw not in _uuid_cache:
+            _cache_uuid(raw, uuid_str)
+            added += 1
+    return added
+
+
+@lru_cache(maxsize=4)
+def _state_filter_array(state_filter: frozenset) -> "np.ndarray":
+    return np.array(list(state_filter), dtype="V16")
+
+
+def _decode_value_states_numpy(
+    message: bytes,
+    count: int,
+    state_filter: Optional[frozenset] = None,
+    store: Optional["StateStore"] = None,
+) -> dict:
+    records = np.frombuffer(message, dtype=_VALUE_STATE_DTYPE, count=count)
+    if state_filter is not None:
+        records = records[np.isin(records["uuid"], _state_filter_array(state_filter))]
+        count = len(records)
+    raw_uuids = records["uuid"].tolist()
+    cache_get = _uuid_cache.get
+    keys = [cache_get(raw) for raw in raw_uuids]
+    if None in keys:
+        # Format all the unknown uuids from a single hex dump
+        raw = records.view(np.uint8).reshape(count, _VALUE_STATE_SIZE)
+        hex_uuids = raw[:, _UUID_LE_ORDER].tobytes().hex()
+        for index, key in enumerate(keys):
+            if key is None:
+                i = index * 32
+                keys[index] = _cache_uuid(
+                    raw_uuids[index],
+                    f"{hex_uuids[i:i + 8]}-{hex_uuids[i + 8:i + 12]}-"
+                    f"{hex_uuids[i + 12:i + 16]}-{hex_uuids[i + 16:i + 32]}",
+                )
+    values = records["val"]
+    if store is not None:
+        store.set_values(keys, values)
+    return dict(zip(keys, values.tolist()))
+
+
+def _decode_value_states_struct(
+    message: bytes,
+    count: int,
+    state_filter: Optional[frozenset] = None,
+    store: Optional["StateStore"] = None,
+) -> dict:
+    view = memoryview(message)[: count * _VALUE_STATE_SIZE]
+    if state_filter is not None:
+        result = {
+            uuid_key(raw): value
+            for raw, value in _VALUE_STATE_STRUCT.iter_unpack(view)
+            if raw in state_filter
+        }
+    else:
+        result = {
+            uuid_key(raw): value for raw, value in _VALUE_STATE_STRUCT.iter_unpack(view)
+        }
+    if store is not None:
+        store.set_values(list(result), list(result.values()))
+    return result
+
+
+def _iter_text_states(
+    message: bytes, with_icons: bool = False, state_filter: Optional[frozenset] = None
+):
+    """Walk a text states table, yielding (uuid, icon, text) per entry.
+
+    uuid and icon are the raw 16 bytes (icon is None unless with_icons is
+    set), text is a memoryview over the text bytes. Nothing is copied.
+    Entries whose uuid is not in state_filter are skipped.
+    """
+    header = _TEXT_STATE_HEADER_WITH_ICON if with_icons else _TEXT_STATE_HEADER
+    view = memoryview(message)
+    end = len(view)
+    offset = 0
+    while offset < end:
+        if offset + _TEXT_STATE_HEADER_SIZE > end:
+            raise LoxoneException(f"Truncated text state header at offset {offset}")
+        if with_icons:
+            raw_uuid, icon, text_length = header.unpack_from(view, offset)
+        else:
+            raw_uuid, text_length = header.unpack_from(view, offset)
+            icon = None
+        text_start = offset + _TEXT_STATE_HEADER_SIZE
+        if text_start + text_length > end:
+            raise LoxoneException(f"Truncated text state at offset {offset}")
+        if state_filter is None or raw_uuid in state_filter:
+            yield raw_uuid, icon, view[text_start : text_start + text_length]
+        # Every entry starts at a multiple of 4
+        offset = (text_start + text_length + 3) & ~3
+
+
+def _decode_text(text: memoryview) -> str:
+    try:
+        return str(text, "utf-8")
+    except UnicodeDecodeError:
+        return check_and_decode_if_needed(text)
+
+
+def decode_text_states(
+    message: bytes,
+    state_filter: Optional[frozenset] = None,
+    store: Optional["StateStore"] = None,
+) -> dict:
+    """Decode a text states table into a {uuid: text} dict.
+
+    If state_filter (a set of raw 16 byte uuids) is given, other entries are
+    dropped without being decoded. The texts are written to store, if given.
+    """
+    result = {
+        uuid_key(raw_uuid): _decode_text(text)
+        for raw_uuid, _, text in _iter_text_states(message, state_filter=state_filter)
+    }
+    if store is not None:
+        store.set_texts(result)
+    return result
+
+
+def decode_value_states(
+    message: bytes,
+    state_filter: Optional[frozenset] = None,
+    store: Optional["StateStore"] = None,
+) -> dict:
+    """Decode a value states table into a {uuid: value} dict.
+
+    Large tables (e.g. the full dump after enablebinstatusupdate) are decoded
+    in bulk with numpy if it is installed, small ones with struct. If
+    state_filter (a set of raw 16 byte uuids) is given, other records are
+    dropped without being decoded. The values are written to the slots of
+    store, if given, in bulk when decoded with numpy.
+    """
+    count = len(message) // _VALUE_STATE_SIZE
+    if np is not None and count >= _NUMPY_MIN_RECORDS:
+        return _decode_value_states_numpy(message, count, state_filter, store)
+    return _decode_value_states_struct(message, count, state_filter, store)
+
+
 class MessageType(IntEnum):
     """The different types of message which the miniserver might send"""
 
@@ -177,6 +410,9 @@ class LLResponse:
             self.value: str = str(self._parsed["LL"]["value"])
         except (ValueError, KeyError, TypeError) as exc:
             raise ValueError(exc)
+        # Seconds between sending the request and receiving this response,
+        # set by LoxoneConnection.request
+        self.round_trip: Optional[float] = None
 
     @property
     def value_as_dict(self) -> dict:
@@ -198,11 +434,13 @@ class MessageHeader:
         #   UINT nLen;         // 32-Bit Unsigned Integer (little endian)
         # } PACKED WsBinHdr;
         self.header = header
+        self.estimated: bool = False
+        self.payload_length: int = 0
         if not header[0] == 3:
             self.message_type = MessageType.UNKNOWN
         else:
             try:
-                unpacked_data = struct.unpack("<cBccI", header)
+                unpacked_data = _HEADER_STRUCT.unpack(header)
             except (struct.error, TypeError) as exc:
                 raise LoxoneException(f"Invalid header received: {exc} - {header}")
 
@@ -216,13 +454,32 @@ class BaseMessage:
     """The base class for all messages from the miniserver"""
 
     message_type = MessageType.UNKNOWN
+    # Raw 16 byte uuids of the states to decode. None decodes all states.
+    # Only used by the state tables.
+    state_filter: Optional[frozenset] = None
+    # Store the decoded states are written to. Only used by the state tables.
+    state_store: Optional["StateStore"] = None
 
     def __init__(self, message: bytes | str):
         self.message = message
-        # For the base class, the dict is the message
+        self._dict: Optional[dict] = None
 
     def as_dict(self) -> dict:
-        """Return the contents of the message as a dict"""
+        """Return the contents of the message as a dict
+
+        The message is decoded on the first call only. The same dict is
+        returned to every caller, so it must not be modified.
+        """
+        if self._dict is None:
+            self._dict = self._decode()
+        return self._dict
+
+    def clear_dict(self) -> None:
+        """Drop the decoded dict, e.g. after the message has been changed."""
+        self._dict = None
+
+    def _decode(self) -> dict:
+        # For the base class, the dict is empty
         return {}
 
 
@@ -241,13 +498,13 @@ class TextMessage(BaseMessage):
         super().__init__(message)
         message = check_and_decode_if_needed(message)
         ll_message = LLResponse(message)
+        self.response = ll_message
         self.code = ll_message.code
         self.control = ll_message.control
         self.value = ll_message.value
         self.value_as_dict = ll_message.value_as_dict
 
-    def as_dict(self) -> dict:
-        """Return the contents of the message as a dict"""
+    def _decode(self) -> dict:
         cleaned_control = clean_up_control(self.control)
         return {"control": cleaned_control, "value": self.value, "Code": self.code}
 
@@ -256,7 +513,7 @@ class BinaryFile(BaseMessage):
     message_type = MessageType.BINARY
 
     # The message is a binary file. There is nothing parse
-    def as_dict(self):
+    def _decode(self) -> dict:
         return {}
 
 
@@ -269,22 +526,8 @@ class ValueStatesTable(BaseMessage):
     #     double dVal;  // 64-Bit Float (little endian) value
     # } PACKED EvData;
 
-    def as_dict(self):
-        event_dict = {}
-        length = len(self.message)
-        num = length / 24
-        start = 0
-        end = 24
-        for _ in range(int(num)):
-            packet = self.message[start:end]
-            event_uuid = uuid.UUID(bytes_le=packet[0:16])
-            fields = event_uuid.urn.replace("urn:uuid:", "").split("-")
-            uuidstr = f"{fields[0]}-{fields[1]}-{fields[2]}-{fields[3]}{fields[4]}"
-            value = struct.unpack("d", packet[16:24])[0]
-            event_dict[uuidstr] = value
-            start += 24
-            end += 24
-        return event_dict
+    def _decode(self) -> dict:
+        return decode_value_states(self.message, self.state_filter, self.state_store)
 
 
 class TextStatesTable(BaseMessage):
@@ -297,53 +540,28 @@ class TextStatesTable(BaseMessage):
     #     unsigned long textLength;    // 32-Bit Unsigned Integer (little endian)
     #     // text follows here
     #     } PACKED EvDataText;
-    def as_dict(self):
-        event_dict = {}
-        start = 0
-
-        def get_text(message: bytes, start: int, offset: int) -> int:
-            first = start
-            second = start + offset
-            event_uuid = uuid.UUID(bytes_le=self.message[first:second])  # type: ignore
-            first += offset
-            second += offset
-
-            icon_uuid_fields = event_uuid.urn.replace("urn:uuid:", "").split("-")
-            uuidstr = "{}-{}-{}-{}{}".format(
-                icon_uuid_fields[0],
-                icon_uuid_fields[1],
-                icon_uuid_fields[2],
-                icon_uuid_fields[3],
-                icon_uuid_fields[4],
-            )
-
-            icon_uuid = uuid.UUID(bytes_le=self.message[first:second])  # type: ignore
-            icon_uuid_fields = icon_uuid.urn.replace("urn:uuid:", "").split("-")
-
-            first = second
-            second += 4
-
-            text_length = struct.unpack("<I", message[first:second])[0]
-
-            first = second
-            second = first + text_length
-            message_str = struct.unpack(f"{text_length}s", message[first:second])[0]
-            start += (math.floor((4 + text_length + 16 + 16 - 1) / 4) + 1) * 4
-            event_dict[uuidstr] = check_and_decode_if_needed(message_str)
-            return start
-
-        if not isinstance(self.message, bytes):
+    def _decode(self) -> dict:
+        """Return a {uuid: text} dict. The icon uuids are skipped."""
+        return decode_text_states(self._bytes(), self.state_filter, self.state_store)
+
+    def icons(self) -> dict:
+        """Return a {uuid: icon uuid} dict."""
+        return {
+            uuid_key(raw_uuid): loxone_uuid_str(icon)
+            for raw_uuid, icon, _ in _iter_text_states(self._bytes(), with_icons=True)
+        }
+
+    def _bytes(self) -> bytes:
+        if not isinstance(self.message, (bytes, bytearray, memoryview)):
             raise LoxoneException("Expected bytes table, got str")
-        while start < len(self.message):
-            start = get_text(self.message, start, 16)
-        return event_dict
+        return self.message
 
 
 class DaytimerStatesTable(BaseMessage):
     message_type = MessageType.DAYTIMER_STATES
 
     # We dont currently handle this.
-    def as_dict(self):
+    def _decode(self) -> dict:
         return {}
 
 
@@ -357,24 +575,61 @@ class Keepalive(BaseMessage):
     message_type = MessageType.KEEPALIVE
 
     # Nothing to do. The dict is the message (which is b'keepalive')
-    def as_dict(self):
+    def _decode(self) -> dict:
         return {"keep_alive": "received"}
 
 
 class WeatherStatesTable(BaseMessage):
     message_type = MessageType.WEATHER_STATES
 
-    def as_dict(self):
+    def _decode(self) -> dict:
         return {}
 
 
-def parse_header(header: bytes) -> MessageHeader:
-    return MessageHeader(header)
+# message type -> BaseMessage subclass
+_MESSAGE_CLASSES: dict[MessageType, type[BaseMessage]] = {
+    klass.message_type: klass for klass in BaseMessage.__subclasses__()
+}
+# A keepalive carries no data, so a single instance is shared
+KEEPALIVE = Keepalive(b"keepalive")
 
 
-def parse_message(message: bytes | str, message_type: int) -> BaseMessage:
-    """Return an instance of the appropriate BaseMessage subclass"""
-    for klass in BaseMessage.__subclasses__():
-        if klass.message_type == message_type:
-            return klass(message)
-    raise LoxoneException(f"Unknown message type {message_type}")
+def parse_header(header: bytes) -> MessageHeader:
+    """Return the MessageHeader for header. Headers are shared, do not modify them."""
+    try:
+        return _header_cache[header]
+    except KeyError:
+        pass
+    except TypeError:
+        # unhashable, e.g. a bytearray
+        return MessageHeader(header)
+    parsed = MessageHeader(header)
+    if len(_header_cache) >= _HEADER_CACHE_MAX_SIZE:
+        _header_cache.clear()
+    _header_cache[header] = parsed
+    return parsed
+
+
+def parse_message(
+    message: bytes | str,
+    message_type: int,
+    state_filter: Optional[frozenset] = None,
+    state_store: Optional["StateStore"] = None,
+) -> BaseMessage:
+    """Return an instance of the appropriate BaseMessage subclass
+
+    state_filter and state_store are passed on to the state tables, see
+    BaseMessage.
+    """
+    if message_type == MessageType.KEEPALIVE:
+        return KEEPALIVE
+    try:
+        klass = _MESSAGE_CLASSES[message_type]
+    except (KeyError, TypeError):
+        raise LoxoneException(f"Unknown message type {message_type}") from None
+    parsed = klass(message)
+    if state_filter is not None:
+        parsed.state_filter = state_filter
+    if state_store is not None:
+        parsed.state_store = state_store
+    return parsed
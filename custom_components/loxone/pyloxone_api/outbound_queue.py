@@ -0,0 +1,125 @@
+"""
+Component to create an interface to the Loxone Miniserver.
+
+For more details about this component, please refer to the documentation at
+https://github.com/JoDehli/pyloxone-api
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass
+from enum import IntEnum
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Lane(IntEnum):
+    """Lanes of the outbound queue. Lower values are sent first."""
+
+    PROTOCOL = 0  # key exchange, token handling, enabling status updates
+    SECURED = 1  # visual password protected commands
+    INTERACTIVE = 2  # commands from entities
+    BULK = 3  # commands from services and automations
+
+
+@dataclass
+class LaneStats:
+    queued: int = 0
+    sent: int = 0
+    waits: int = 0  # producers which had to wait for room in the lane
+    max_depth: int = 0
+
+
+class OutboundQueue(Generic[T]):
+    """A queue with one bounded FIFO lane per priority.
+
+    get() always returns the oldest item of the highest priority lane that is
+    not empty, so protocol traffic never waits behind commands. Each lane has
+    its own limit: a full lane only makes its own producers wait (put) or fail
+    (put_nowait), the other lanes keep accepting items. The interface follows
+    asyncio.Queue, put and put_nowait take the lane as extra argument.
+    """
+
+    def __init__(self, limits: dict[Lane, int]) -> None:
+        self._lanes: dict[Lane, deque[T]] = {lane: deque() for lane in Lane}
+        self._limits = {lane: limits[lane] for lane in Lane}
+        self._not_empty = asyncio.Event()
+        self._not_full = {lane: asyncio.Event() for lane in Lane}
+        for event in self._not_full.values():
+            event.set()
+        self._unfinished_tasks = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self.stats = {lane: LaneStats() for lane in Lane}
+
+    def qsize(self) -> int:
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def empty(self) -> bool:
+        return not any(self._lanes.values())
+
+    def full(self, lane: Lane) -> bool:
+        return len(self._lanes[lane]) >= self._limits[lane]
+
+    def put_nowait(self, item: T, lane: Lane) -> None:
+        """Add item to lane. Raises asyncio.QueueFull if the lane is full."""
+        if self.full(lane):
+            raise asyncio.QueueFull
+        queue = self._lanes[lane]
+        queue.append(item)
+        stats = self.stats[lane]
+        stats.queued += 1
+        stats.max_depth = max(stats.max_depth, len(queue))
+        if self.full(lane):
+            self._not_full[lane].clear()
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._not_empty.set()
+
+    async def put(self, item: T, lane: Lane) -> None:
+        """Add item to lane, waiting for room in the lane if needed."""
+        if self.full(lane):
+            self.stats[lane].waits += 1
+            while self.full(lane):
+                await self._not_full[lane].wait()
+        self.put_nowait(item, lane)
+
+    def get_nowait(self) -> T:
+        for lane, queue in self._lanes.items():
+            if queue:
+                item = queue.popleft()
+                self.stats[lane].sent += 1
+                self._not_full[lane].set()
+                if self.empty():
+                    self._not_empty.clear()
+                return item
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> T:
+        while self.empty():
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def task_done(self) -> None:
+        if self._unfinished_tasks <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished_tasks -= 1
+        if self._unfinished_tasks == 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        await self._finished.wait()
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Return the statistics and the current depth of every lane."""
+        return {
+            lane.name.lower(): {
+                **asdict(self.stats[lane]),
+                "depth": len(self._lanes[lane]),
+                "limit": self._limits[lane],
+            }
+            for lane in Lane
+        }
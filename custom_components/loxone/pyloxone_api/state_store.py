@@ -0,0 +1,132 @@
+"""
+Component to create an interface to the Loxone Miniserver.
+
+For more details about this component, please refer to the documentation at
+https://github.com/JoDehli/pyloxone-api
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from .helper import get_state_uuids
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+_NAN = math.nan
+
+
+class StateStore:
+    """The current value of every state of a Miniserver.
+
+    Every state uuid gets a slot in a float64 array, which holds the values
+    of the value states. Text states are kept in a separate table. States
+    without a value yet are NaN in the array. Slots are assigned from the
+    structure file; uuids first seen in a state table get a new slot. The
+    decoder of the state tables writes the values, see parse_message.
+    """
+
+    def __init__(self, uuids: Iterable[str] = ()) -> None:
+        self._slots: dict[str, int] = {}
+        self._values = array("d")
+        self._texts: dict[str, str] = {}
+        for uuid in uuids:
+            self._slot(uuid)
+
+    @classmethod
+    def from_structure(cls, structure_file: dict) -> StateStore:
+        return cls(get_state_uuids(structure_file))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, uuid: str) -> bool:
+        return uuid in self._texts or (
+            uuid in self._slots and not math.isnan(self._values[self._slots[uuid]])
+        )
+
+    def _slot(self, uuid: str) -> int:
+        slot = self._slots.get(uuid)
+        if slot is None:
+            slot = self._slots[uuid] = len(self._values)
+            self._values.append(_NAN)
+        return slot
+
+    def slot(self, uuid: str) -> int | None:
+        """Return the index of uuid in the value array."""
+        return self._slots.get(uuid)
+
+    def set_values(self, uuids: Sequence[str], values: Sequence[float]) -> None:
+        """Write the values of a decoded value states table to their slots.
+
+        values is in the order of uuids. A numpy array is written in bulk.
+        """
+        slots = list(map(self._slots.get, uuids))
+        if None in slots:
+            slots = [
+                self._slot(uuid) if slot is None else slot
+                for uuid, slot in zip(uuids, slots)
+            ]
+        if np is not None and isinstance(values, np.ndarray):
+            np.frombuffer(self._values, dtype=np.float64)[slots] = values
+            return
+        store = self._values
+        for slot, value in zip(slots, values):
+            store[slot] = value
+
+    def set_texts(self, texts: dict[str, str]) -> None:
+        """Store the texts of a decoded text states table."""
+        self._texts.update(texts)
+
+    def get(self, uuid: str, default: Any = None) -> Any:
+        """Return the current value of a state."""
+        if uuid in self._texts:
+            return self._texts[uuid]
+        slot = self._slots.get(uuid)
+        if slot is None:
+            return default
+        value = self._values[slot]
+        return default if math.isnan(value) else value
+
+    def values_array(self):
+        """Return the value array, as numpy view if numpy is installed.
+
+        The numpy array shares the memory of the store, it must not be kept
+        across updates which add slots.
+        """
+        if np is None:
+            return self._values
+        return np.frombuffer(self._values, dtype=np.float64)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the states which have a value, as {state uuid: value}."""
+        values = self._values
+        result = {
+            uuid: values[slot]
+            for uuid, slot in self._slots.items()
+            if not math.isnan(values[slot])
+        }
+        result.update(self._texts)
+        return result
+
+    def diff(self, snapshot: dict[str, Any]) -> dict[str, Any]:
+        """Return the states whose value differs from an older snapshot."""
+        return {
+            uuid: value
+            for uuid, value in self.snapshot().items()
+            if snapshot.get(uuid) != value
+        }
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            "slots": len(self._slots),
+            "values": len(self._values) - sum(map(math.isnan, self._values)),
+            "texts": len(self._texts),
+            "value_bytes": self._values.itemsize * len(self._values),
+        }
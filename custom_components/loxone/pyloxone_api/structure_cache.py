@@ -0,0 +1,64 @@
+"""
+Component to create an interface to the Loxone Miniserver.
+
+For more details about this component, please refer to the documentation at
+https://github.com/JoDehli/pyloxone-api
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Optional
+
+from .const import STRUCTURE_CACHE_FILE
+from .structure_snapshot import close_snapshot, dump_snapshot, open_snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StructureCache:
+    """Structure files (LoxAPP3.json) stored in a directory by serial.
+
+    The files are stored as snapshots, see structure_snapshot. A cached
+    file is only used while its lastModified matches the one returned by
+    jdev/sps/LoxAPPversion3. The methods do blocking file I/O, run them in
+    an executor.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def path(self, serial: str) -> str:
+        return os.path.join(self.directory, STRUCTURE_CACHE_FILE.format(serial=serial))
+
+    def load(self, serial: str, last_modified: str) -> Optional[dict]:
+        """Return the cached structure file if it is still up to date."""
+        try:
+            structure_file = open_snapshot(self.path(serial))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            _LOGGER.warning(f"Could not read cached structure file: {e}")
+            return None
+        if structure_file.get("lastModified") != last_modified:
+            _LOGGER.debug(
+                f"Cached structure file from {structure_file.get('lastModified')} "
+                f"is outdated, the Miniserver has {last_modified}"
+            )
+            close_snapshot(structure_file)
+            return None
+        return structure_file
+
+    def save(self, serial: str, structure_file: dict) -> None:
+        """Store a parsed structure file, replacing the cached one."""
+        path = self.path(serial)
+        tmp_path = f"{path}.tmp"
+        try:
+            data = dump_snapshot(structure_file)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            _LOGGER.warning(f"Could not cache structure file: {e}")
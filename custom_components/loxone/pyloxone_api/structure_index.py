@@ -0,0 +1,99 @@
+"""
+Component to create an interface to the Loxone Miniserver.
+
+For more details about this component, please refer to the documentation at
+https://github.com/JoDehli/pyloxone-api
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Optional, Union
+
+from .helper import get_control_state_uuids
+
+
+class StructureIndex:
+    """Lookup tables for a LoxAPP3.json structure file.
+
+    The tables hold the control dicts of the structure file itself, not
+    copies, so changes to a control are seen through every table. The
+    uuid and state lookups are built on first use; for a structure
+    snapshot, get_all only decodes the controls of the requested types.
+    """
+
+    def __init__(self, structure_file: Optional[dict]) -> None:
+        structure_file = structure_file or {}
+        self._source: Mapping[str, dict] = structure_file.get("controls", {})
+        # type -> [(position in the structure file, uuid)]
+        self._by_type: dict[str, list[tuple[int, str]]] = {}
+        # uuid -> control or subcontrol
+        self._controls: Optional[dict[str, dict]] = None
+        # state uuid -> (control or subcontrol, state key)
+        self._states: dict[str, tuple[dict, str]] = {}
+        self._rooms = {
+            uuid: room.get("name", "")
+            for uuid, room in structure_file.get("rooms", {}).items()
+        }
+        self._cats = {
+            uuid: cat.get("name", "")
+            for uuid, cat in structure_file.get("cats", {}).items()
+        }
+        if hasattr(self._source, "types"):
+            types = self._source.types()
+        else:
+            types = ((uuid, c.get("type")) for uuid, c in self._source.items())
+        for position, (uuid, type_) in enumerate(types):
+            self._by_type.setdefault(type_, []).append((position, uuid))
+
+    def _lookups(self) -> dict[str, dict]:
+        if self._controls is None:
+            self._controls = {}
+            for uuid, control in self._source.items():
+                self._add_control(uuid, control)
+        return self._controls
+
+    def _add_control(self, uuid: str, control: dict) -> None:
+        self._controls[uuid] = control
+        for key, state in control.get("states", {}).items():
+            for state_uuid in state if isinstance(state, list) else [state]:
+                self._states[state_uuid] = (control, key)
+        for sub_uuid, sub_control in control.get("subControls", {}).items():
+            self._add_control(sub_uuid, sub_control)
+
+    def get_all(self, name: Union[str, list[str]]) -> list[dict]:
+        """Return the controls of one or more types in structure file order.
+
+        Only the controls of the requested types are visited.
+        """
+        if isinstance(name, str):
+            entries = self._by_type.get(name, [])
+        else:
+            entries = [
+                entry for type_ in name for entry in self._by_type.get(type_, [])
+            ]
+            if len(name) > 1:
+                entries.sort(key=lambda entry: entry[0])
+        return [self._source[uuid] for _, uuid in entries]
+
+    def control(self, uuid: str) -> Optional[dict]:
+        """Return the control or subcontrol with the given uuid."""
+        return self._lookups().get(uuid)
+
+    def state_owner(self, state_uuid: str) -> Optional[tuple[dict, str]]:
+        """Return the control using a state and the key of the state."""
+        self._lookups()
+        return self._states.get(state_uuid)
+
+    def room_name(self, room_uuid: str) -> str:
+        return self._rooms.get(room_uuid, "")
+
+    def cat_name(self, cat_uuid: str) -> str:
+        return self._cats.get(cat_uuid, "")
+
+    def state_uuids(self, uuid: str) -> set[str]:
+        """Return the uuids of all states of a control and its subcontrols."""
+        control = self._lookups().get(uuid)
+        if control is None:
+            return set()
+        return set(get_control_state_uuids(control))
@@ -0,0 +1,198 @@
+"""
+Component to create an interface to the Loxone Miniserver.
+
+For more details about this component, please refer to the documentation at
+https://github.com/JoDehli/pyloxone-api
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from collections.abc import Iterator, Mapping
+from typing import Any, Optional, Union
+
+from .helper import get_control_state_uuids
+
+# A snapshot file is
+#   magic, header length (uint32 little endian), header, control blobs
+# The header is json:
+#   {"top": {all keys of the structure file except "controls"},
+#    "types": [control types],
+#    "controls": [[uuid, index in types, blob offset, blob length], ...],
+#    "state_uuids": [uuids of all states of the controls]}
+# Every control is stored as its own compact json blob, so it can be
+# decoded without decoding the other controls.
+SNAPSHOT_MAGIC = b"LXSNAP\x00\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+_BODY_START = len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size
+# Longer strings (descriptions, urls, ...) are rarely repeated
+_INTERN_MAX_LENGTH = 64
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _intern_pairs(pairs: list[tuple[str, Any]]) -> dict:
+    """Intern keys and short strings, they repeat in every control."""
+    return {
+        sys.intern(key): (
+            sys.intern(value)
+            if isinstance(value, str) and len(value) <= _INTERN_MAX_LENGTH
+            else value
+        )
+        for key, value in pairs
+    }
+
+
+class LazyControls(Mapping):
+    """The controls of a snapshot, decoded when they are first accessed.
+
+    Decoded controls are kept, so changes to a control dict stay visible
+    like in a parsed structure file. type_of and state_uuids are answered
+    from the header without decoding any control. close() releases a
+    memory mapped file, controls not decoded until then can not be read
+    anymore.
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, mmap.mmap],
+        index: list[list],
+        types: list[str],
+        state_uuids: list[str],
+    ) -> None:
+        self._buffer = buffer
+        # uuid -> (index in types, offset in buffer, length)
+        self._index = {
+            uuid: (type_index, offset, length)
+            for uuid, type_index, offset, length in index
+        }
+        self._types = types
+        self._state_uuids = state_uuids
+        self._controls: dict[str, dict] = {}
+
+    def __getitem__(self, uuid: str) -> dict:
+        control = self._controls.get(uuid)
+        if control is None:
+            control = self._controls[uuid] = self._decode(uuid)
+        return control
+
+    def _decode(self, uuid: str) -> dict:
+        _, offset, length = self._index[uuid]
+        return json.loads(
+            self._buffer[offset : offset + length], object_pairs_hook=_intern_pairs
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, uuid: object) -> bool:
+        return uuid in self._index
+
+    @property
+    def decoded(self) -> int:
+        """Number of controls decoded so far."""
+        return len(self._controls)
+
+    def type_of(self, uuid: str) -> str:
+        return self._types[self._index[uuid][0]]
+
+    def types(self) -> Iterator[tuple[str, str]]:
+        """Yield (uuid, type) of every control in structure file order."""
+        types = self._types
+        for uuid, (type_index, _, _) in self._index.items():
+            yield uuid, types[type_index]
+
+    def state_uuids(self) -> list[str]:
+        """Return the uuids of all states of the controls."""
+        return self._state_uuids
+
+    def close(self) -> None:
+        """Close the memory map of the snapshot file, if any."""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def to_dict(self) -> dict[str, dict]:
+        """Return all controls as dict, without keeping the decoded ones."""
+        return {uuid: self._controls.get(uuid) or self._decode(uuid) for uuid in self}
+
+
+def dump_snapshot(structure_file: dict) -> bytes:
+    """Serialize a parsed structure file."""
+    types: dict[str, int] = {}
+    index = []
+    blobs = []
+    state_uuids = []
+    offset = 0
+    for uuid, control in structure_file.get("controls", {}).items():
+        blob = _dumps(control)
+        type_index = types.setdefault(control.get("type"), len(types))
+        index.append([uuid, type_index, offset, len(blob)])
+        blobs.append(blob)
+        offset += len(blob)
+        state_uuids.extend(get_control_state_uuids(control))
+    header = _dumps(
+        {
+            "top": {
+                key: value for key, value in structure_file.items() if key != "controls"
+            },
+            "types": list(types),
+            "controls": index,
+            "state_uuids": state_uuids,
+        }
+    )
+    # Blob offsets are relative to the end of the header
+    return b"".join([SNAPSHOT_MAGIC, _HEADER_LENGTH.pack(len(header)), header, *blobs])
+
+
+def load_snapshot(buffer: Union[bytes, mmap.mmap]) -> dict:
+    """Return the structure file of a snapshot, with lazily decoded controls.
+
+    Raises ValueError if buffer is no snapshot.
+    """
+    if buffer[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError("Not a structure snapshot")
+    (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(SNAPSHOT_MAGIC))
+    body = _BODY_START + header_length
+    header = json.loads(buffer[_BODY_START:body])
+    index = header["controls"]
+    for entry in index:
+        entry[2] += body
+    structure_file = header["top"]
+    structure_file["controls"] = LazyControls(
+        buffer, index, header["types"], header["state_uuids"]
+    )
+    return structure_file
+
+
+def open_snapshot(path: str) -> dict:
+    """Memory map a snapshot file and return its structure file."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return load_snapshot(buffer)
+    except Exception:
+        buffer.close()
+        raise
+
+
+def close_snapshot(structure_file: Optional[dict]) -> None:
+    """Close the snapshot file of a structure file, if it was loaded from one."""
+    controls = (structure_file or {}).get("controls")
+    if isinstance(controls, LazyControls):
+        controls.close()
+
+
+def snapshot_to_dict(structure_file: dict) -> dict:
+    """Return a structure file with plain dicts only, e.g. to dump it."""
+    controls = structure_file.get("controls")
+    if not isinstance(controls, LazyControls):
+        return structure_file
+    return {**structure_file, "controls": controls.to_dict()}
@@ -15,7 +15,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import SENDDOMAIN
-from .helpers import add_room_and_cat_to_value_values, get_all, get_or_create_device
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -98,11 +98,12 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for select_entity in get_all(loxconfig, ["Radio"]):
-        select_entity = add_room_and_cat_to_value_values(loxconfig, select_entity)
+    for select_entity in miniserver.index.get_all(["Radio"]):
+        select_entity = add_room_and_cat_to_value_values(
+            miniserver.index, select_entity
+        )
         new_select = LoxoneSelect(**select_entity)
         entities.append(new_select)
 
@@ -116,7 +117,6 @@ class LoxoneSelect(LoxoneEntity, SelectEntity):
         super().__init__(**kwargs)
         """Initialize the Loxone select."""
         self._icon = None
-        self._locked = None
 
         (
             self._options,
@@ -124,7 +124,6 @@ class LoxoneSelect(LoxoneEntity, SelectEntity):
             self._option_to_num,
             self._all_off_num
         ) = build_option_maps(self.details)
-        self._attr_current_option = None
 
         self.type = "Radio"
         self._attr_device_info = get_or_create_device(self.unique_id, self.name, self.type, self.room)
@@ -147,21 +146,23 @@ class LoxoneSelect(LoxoneEntity, SelectEntity):
     @property
     def current_option(self) -> str | None:
         """Return the currently selected option."""
-        return self._attr_current_option
+        try:
+            number = int(float(self.get_stored_state("activeOutput")))
+        except (TypeError, ValueError):
+            number = None
+        return self._num_to_option.get(number)
+
+    @property
+    def locked(self) -> bool | None:
+        """Return if the Radio block is locked, None while unknown."""
+        locked = self.get_stored_state("jLocked")
+        return None if locked is None else bool(locked)
 
     async def event_handler(self, e):
-        if self.states["activeOutput"] in e.data:
-            value = e.data[self.states["activeOutput"]]
-            try:
-                number = int(float(value))
-            except (TypeError, ValueError):
-                number = None
-            self._attr_current_option = self._num_to_option.get(number)
-            self.async_schedule_update_ha_state()
-
-        if "jLocked" in self.states and self.states["jLocked"] in e.data:
-            self._locked = bool(e.data[self.states["jLocked"]])
-            self.async_schedule_update_ha_state()
+        if self.states["activeOutput"] in e.data or (
+            "jLocked" in self.states and self.states["jLocked"] in e.data
+        ):
+            self.async_schedule_state_write()
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
@@ -183,5 +184,5 @@ class LoxoneSelect(LoxoneEntity, SelectEntity):
             "state_uuid": self.states["activeOutput"],
             "device_type": self.type,
             "platform": "loxone",
-            "locked": self._locked,
+            "locked": self.locked,
         }
@@ -32,7 +32,7 @@ from homeassistant.util import dt as dt_util
 
 from . import LoxoneEntity, MiniServer
 from .const import CONF_ACTIONID, DOMAIN, SENDDOMAIN, THROTTLE_KEEP_ALIVE_TIME
-from .helpers import (add_room_and_cat_to_value_values, clean_unit, get_all,
+from .helpers import (add_room_and_cat_to_value_values, clean_unit,
                       get_or_create_device)
 from .miniserver import get_miniserver_from_hass
 
@@ -208,18 +208,18 @@ async def async_setup_entry(
     if "softwareVersion" in loxconfig:
         entities.append(LoxoneVersionSensor(miniserver.serial, loxconfig["softwareVersion"]))
 
-    for sensor in get_all(loxconfig, "InfoOnlyAnalog"):
-        sensor = add_room_and_cat_to_value_values(loxconfig, sensor)
+    for sensor in miniserver.index.get_all("InfoOnlyAnalog"):
+        sensor = add_room_and_cat_to_value_values(miniserver.index, sensor)
         sensor.update({"type": "analog"})
         entities.append(LoxoneSensor(**sensor))
 
-    for sensor in get_all(loxconfig, "TextInput"):
-        sensor = add_room_and_cat_to_value_values(loxconfig, sensor)
+    for sensor in miniserver.index.get_all("TextInput"):
+        sensor = add_room_and_cat_to_value_values(miniserver.index, sensor)
         entities.append(LoxoneTextSensor(**sensor))
 
-    for sensor in get_all(loxconfig, "Meter"):
+    for sensor in miniserver.index.get_all("Meter"):
         _LOGGER.info("Found Meter: %s", sensor)
-        sensor = add_room_and_cat_to_value_values(loxconfig, sensor)
+        sensor = add_room_and_cat_to_value_values(miniserver.index, sensor)
         device_info = LoxoneMeterSensor.create_device_info_from_sensor(sensor)
 
         for state_key, name_suffix, format_key in [
@@ -283,7 +283,7 @@ class LoxoneCustomSensor(LoxoneEntity, SensorEntity):
             else:
                 self._attr_native_value = data
 
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def native_unit_of_measurement(self):
@@ -314,6 +314,11 @@ class LoxoneKeepAliveSensor(LoxoneEntity, SensorEntity):
         """Return a unique ID."""
         return f"{self._miniserver_serial}-{self._attr_unique_id}"
 
+    @property
+    def state_uuids(self) -> set[str]:
+        """Keep alive responses are dispatched as {"keep_alive": "received"}."""
+        return {"keep_alive"}
+
     async def event_handler(self, e):
         if "keep_alive" in e.data and e.data["keep_alive"] == "received":
             now = dt_util.utcnow()
@@ -326,7 +331,7 @@ class LoxoneKeepAliveSensor(LoxoneEntity, SensorEntity):
 
             # update the timestamp
             self._attr_native_value = now
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -357,14 +362,9 @@ class LoxoneVersionSensor(LoxoneEntity, SensorEntity):
 class LoxoneTextSensor(LoxoneEntity, SensorEntity):
     """Representation of a Text Sensor."""
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self._state = STATE_UNKNOWN
-
     async def event_handler(self, e):
         if self.states["text"] in e.data:
-            self._state = str(e.data[self.states["text"]])
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def device_class(self):
@@ -374,7 +374,8 @@ class LoxoneTextSensor(LoxoneEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return self._state
+        text = self.get_stored_state("text")
+        return STATE_UNKNOWN if text is None else str(text)
 
     async def async_set_value(self, value):
         """Set new value."""
@@ -405,6 +406,8 @@ class LoxoneSensor(LoxoneEntity, SensorEntity):
         precision = self._parse_digits_after_decimal(self.details["format"])
         if precision:
             self._attr_suggested_display_precision = precision
+        # Changes below the shown precision are not written
+        self._precision = precision
 
         # Device class is detected automatically from unit/category/name.
         # To override for a specific entity, use HA's customize in configuration.yaml:
@@ -443,7 +446,7 @@ class LoxoneSensor(LoxoneEntity, SensorEntity):
     @property
     def available(self) -> bool:
         """Return entity availability."""
-        return self.state is not None
+        return super().available and self.state is not None
 
     def _get_lox_rounded_value(self, value):
         try:
@@ -453,8 +456,17 @@ class LoxoneSensor(LoxoneEntity, SensorEntity):
 
     async def event_handler(self, e):
         if self.uuidAction in e.data:
-            self._attr_native_value = e.data[self.uuidAction]
-            self.async_schedule_update_ha_state()
+            value = e.data[self.uuidAction]
+            last = self._attr_native_value
+            if (
+                self._precision is not None
+                and isinstance(value, float)
+                and isinstance(last, float)
+                and round(value, self._precision) == round(last, self._precision)
+            ):
+                return
+            self._attr_native_value = value
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -16,8 +16,7 @@ from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -40,12 +39,15 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for switch_entity in get_all(loxconfig, ["Switch", "TimedSwitch", "Intercom"]):
+    for switch_entity in miniserver.index.get_all(
+        ["Switch", "TimedSwitch", "Intercom"]
+    ):
 
-        switch_entity = add_room_and_cat_to_value_values(loxconfig, switch_entity)
+        switch_entity = add_room_and_cat_to_value_values(
+            miniserver.index, switch_entity
+        )
 
         if switch_entity["type"] in ["Switch"]:
             new_switch = LoxoneSwitch(**switch_entity)
@@ -61,7 +63,7 @@ async def async_setup_entry(
                     subcontol = switch_entity["subControls"][sub_name]
 
                     _ = subcontol
-                    _ = add_room_and_cat_to_value_values(loxconfig, _)
+                    _ = add_room_and_cat_to_value_values(miniserver.index, _)
                     _.update(
                         {
                             "name": "{} - {}".format(
@@ -89,8 +91,6 @@ class LoxoneTimedSwitch(LoxoneEntity, SwitchEntity):
         self._attr_state = STATE_UNKNOWN
         self._attr_is_on = STATE_UNKNOWN
         self._icon = None
-        self._delay_remain = 0.0
-        self._delay_time_total = 0.0
 
         if "deactivationDelay" in self.states:
             self._deactivation_delay = self.states["deactivationDelay"]
@@ -131,31 +131,16 @@ class LoxoneTimedSwitch(LoxoneEntity, SwitchEntity):
 
     async def event_handler(self, e):
         """Handle timed-switch events and update state attributes."""
-        data = e.data
-        should_update = False
-
-        # If we're currently unavailable but incoming data contains relevant keys,
-        # schedule an async update immediately (preserves original behavior).
-        if not self._attr_available and (
-            self._deactivation_delay in data or self._deactivation_delay_total in data
-        ):
-            self.async_schedule_update_ha_state()
-
-        if self._deactivation_delay in data:
+        if self._deactivation_delay in e.data:
             # Preserve original comparison to 0.0
-            self._attr_is_on = False if data[self._deactivation_delay] == 0.0 else True
-            self._delay_remain = int(data[self._deactivation_delay])
-            should_update = True
-
-        if self._deactivation_delay_total in data:
-            self._delay_time_total = int(data[self._deactivation_delay_total])
-            should_update = True
+            self._attr_is_on = e.data[self._deactivation_delay] != 0.0
 
-        if should_update:
-            # Make entity available if it wasn't and schedule a final update
-            if not self._attr_available:
-                self._attr_available = True
-            self.async_schedule_update_ha_state()
+        if (
+            self._deactivation_delay in e.data
+            or self._deactivation_delay_total in e.data
+        ):
+            self._attr_available = True
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -168,14 +153,18 @@ class LoxoneTimedSwitch(LoxoneEntity, SwitchEntity):
             "device_type": self.type,
         }
 
+        delay_remain = int(self.get_stored_value(self._deactivation_delay, 0.0))
+        delay_time_total = int(
+            self.get_stored_value(self._deactivation_delay_total, 0.0)
+        )
         if self._attr_is_on == False:
-            state_dict.update({"delay_time_total": str(self._delay_time_total)})
+            state_dict.update({"delay_time_total": str(delay_time_total)})
 
         else:
             state_dict.update(
                 {
-                    "delay": str(self._delay_remain),
-                    "delay_time_total": str(self._delay_time_total),
+                    "delay": str(delay_remain),
+                    "delay_time_total": str(delay_time_total),
                 }
             )
         return state_dict
@@ -230,13 +219,13 @@ class LoxoneSwitch(LoxoneEntity, SwitchEntity):
     async def event_handler(self, event):
         if self.uuidAction in event.data or self.states["active"] in event.data:
             if not self._attr_available:
-                self.async_schedule_update_ha_state()
+                self.async_schedule_state_write()
             if self.states["active"] in event.data:
                 self._attr_is_on = event.data[self.states["active"]]
 
             if not self._attr_available:
                 self._attr_available = True
-            self.async_schedule_update_ha_state()
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -9,15 +9,13 @@ import logging
 
 from homeassistant.components.text import TextEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_UNKNOWN
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from . import LoxoneEntity
 from .const import SENDDOMAIN
-from .helpers import (add_room_and_cat_to_value_values, get_all,
-                      get_or_create_device)
+from .helpers import add_room_and_cat_to_value_values, get_or_create_device
 from .miniserver import get_miniserver_from_hass
 
 _LOGGER = logging.getLogger(__name__)
@@ -40,12 +38,11 @@ async def async_setup_entry(
 ) -> None:
     """Set up entry."""
     miniserver = get_miniserver_from_hass(hass, config_entry)
-    loxconfig = miniserver.lox_config.json
     entities = []
 
-    for text_entity in get_all(loxconfig, ["TextInput"]):
+    for text_entity in miniserver.index.get_all(["TextInput"]):
 
-        text_entity = add_room_and_cat_to_value_values(loxconfig, text_entity)
+        text_entity = add_room_and_cat_to_value_values(miniserver.index, text_entity)
         text_entity.update(
             {
                 "config_entry": config_entry,
@@ -63,10 +60,8 @@ class LoxoneText(LoxoneEntity, TextEntity):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         """Initialize the Loxone text."""
-        self._state = STATE_UNKNOWN
         self._icon = None
         self._assumed = False
-        self._native_value = ""
 
         self.type = "TextInput"
         self._attr_device_info = get_or_create_device(
@@ -86,7 +81,7 @@ class LoxoneText(LoxoneEntity, TextEntity):
     @property
     def native_value(self):
         """Return the native_min_value to use for device if any."""
-        return self._native_value
+        return str(self.get_stored_state("text", ""))[:255]
 
     @property
     def assumed_state(self):
@@ -94,18 +89,8 @@ class LoxoneText(LoxoneEntity, TextEntity):
         return self._assumed
 
     async def event_handler(self, e):
-        if self.uuidAction in e.data:
-            data = e.data[self.uuidAction]
-            if isinstance(data, (list, dict)):
-                data = str(data)
-                if len(data) >= 255:
-                    self._state = data[:255]
-                else:
-                    self._state = data
-            else:
-                self._state = data
-
-            self.schedule_update_ha_state()
+        if self.uuidAction in e.data or self.states.get("text") in e.data:
+            self.async_schedule_state_write()
 
     @property
     def extra_state_attributes(self):
@@ -0,0 +1,87 @@
+"""Compare the throughput of jdev/sys/enc and jdev/sys/fenc.
+
+With enc only the commands are encrypted, with fenc the Miniserver encrypts
+the responses as well, which have to be decrypted before they are parsed.
+"per command" encrypts every command with a new AES object, as before the
+session CommandCipher.
+
+Run from the repository root:
+    python scripts/benchmark_encryption.py
+"""
+
+import json
+import sys
+import timeit
+import urllib.parse
+from base64 import b64encode
+from pathlib import Path
+
+from Crypto.Cipher import AES
+from Crypto.Util import Padding
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.loxone.pyloxone_api import command_cipher  # noqa: E402
+
+KEY = bytes(range(32))
+IV = bytes(range(16, 32))
+SALT = "0123456789abcdef0123456789abcdef"
+COMMANDS = [
+    f"salt/{SALT}/jdev/sps/io/1d8af56e-036e-e9ad-ffffed57184a04{i:02x}/{i}\x00"
+    for i in range(100)
+]
+RESPONSES = [
+    json.dumps(
+        {
+            "LL": {
+                "control": command[len(f"salt/{SALT}/") :].rstrip("\x00"),
+                "value": str(i),
+                "Code": "200",
+            }
+        }
+    )
+    for i, command in enumerate(COMMANDS)
+]
+
+
+def main(number: int = 200) -> None:
+    enc = command_cipher.CommandCipher(KEY, IV)
+    fenc = command_cipher.CommandCipher(KEY, IV, full=True)
+    # The Miniserver answers fenc commands with the base64 cipher text
+    encrypted_responses = [
+        urllib.parse.unquote(fenc.encrypt(response + "\x00")[len(fenc.prefix) :])
+        for response in RESPONSES
+    ]
+
+    def per_command_round_trips():
+        for command in COMMANDS:
+            padded = Padding.pad(command.encode(), AES.block_size)
+            cipher = b64encode(AES.new(KEY, AES.MODE_CBC, IV).encrypt(padded))
+            command_cipher.ENC_PREFIX + urllib.parse.quote(cipher.decode())
+        for response in RESPONSES:
+            json.loads(response)
+
+    def enc_round_trips():
+        for command in COMMANDS:
+            enc.encrypt(command)
+        for response in RESPONSES:
+            json.loads(response)
+
+    def fenc_round_trips():
+        for command in COMMANDS:
+            fenc.encrypt(command)
+        for response in encrypted_responses:
+            json.loads(fenc.decrypt(response))
+
+    for name, func in (
+        ("per command", per_command_round_trips),
+        ("enc", enc_round_trips),
+        ("fenc", fenc_round_trips),
+    ):
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        per_second = number * len(COMMANDS) / seconds
+        print(f"{name:>11}: {per_second:10.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
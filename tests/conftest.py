@@ -0,0 +1,184 @@
+"""Fixtures shared by the tests of the Miniserver connection."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import re
+import struct
+import urllib.parse
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.loxone.pyloxone_api.command_cipher import (
+    ENC_PREFIX,
+    FENC_PREFIX,
+)
+from custom_components.loxone.pyloxone_api.connection import (
+    LoxoneConnection,
+    request_key,
+)
+from custom_components.loxone.pyloxone_api.message import LLResponse, TextMessage
+
+# Salt prepended to encrypted commands
+_SALT = re.compile(r"^(?:salt/[0-9a-f]*|nextSalt/[0-9a-f]*/[0-9a-f]*)/")
+
+
+class FakeWebsocket:
+    """Stands in for the websocket of a LoxoneConnection.
+
+    raw holds the commands as sent, sent the same commands in plain text:
+    encrypted commands are decrypted and their salt is removed. Messages
+    added with receive are yielded when the connection listens.
+    """
+
+    state = SimpleNamespace(CLOSED="closed")
+    protocol = SimpleNamespace(state=SimpleNamespace(name="OPEN"))
+
+    def __init__(self, connection: LoxoneConnection) -> None:
+        self._connection = connection
+        self._frames: list[bytes | str] = []
+        self.raw: list[str] = []
+        self.sent: list[str] = []
+        self.closed = False
+
+    async def send(self, commands: list[str]) -> None:
+        for command in commands:
+            self.raw.append(command)
+            if command.startswith((ENC_PREFIX, FENC_PREFIX)):
+                command = self._connection._cipher.decrypt(
+                    urllib.parse.unquote(command)
+                ).decode()
+                command = _SALT.sub("", command)
+            self.sent.append(command)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aiter__(self):
+        for frame in self._frames:
+            yield frame
+
+    def receive(self, message_type: int, payload: bytes | str = b"") -> None:
+        """Add a message of the Miniserver, with its header."""
+        self._frames.append(struct.pack("<BBBBI", 3, message_type, 0, 0, len(payload)))
+        if payload:
+            self._frames.append(payload)
+
+    async def flush(self) -> list[str]:
+        """Send the queued commands and return all commands sent so far."""
+        async with self.sending():
+            await self._connection._message_queue.join()
+        return self.sent
+
+    @contextlib.asynccontextmanager
+    async def sending(self):
+        """Send queued commands in the background, like start_listening."""
+        processor = asyncio.create_task(self._connection._process_message())
+        try:
+            yield
+        finally:
+            processor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await processor
+
+    async def wait_sent(self, count: int, timeout: float = 1.0) -> list[str]:
+        """Wait until count commands have been sent."""
+
+        async def wait():
+            while len(self.sent) < count:
+                await asyncio.sleep(0)
+
+        await asyncio.wait_for(wait(), timeout)
+        return self.sent
+
+    async def respond(self, control: str, value="1", code: int = 200) -> None:
+        """Hand a response of the Miniserver to the connection."""
+        await self._connection._websocket_event(
+            TextMessage(
+                json.dumps(
+                    {"LL": {"control": control, "value": value, "Code": str(code)}}
+                )
+            )
+        )
+
+    async def dispatch(self, callback) -> None:
+        """Hand the received messages to callback, like start_listening."""
+        connection = self._connection
+        listener = asyncio.create_task(connection._do_start_listening(self))
+        dispatcher = asyncio.create_task(connection._dispatch_messages(callback))
+        await listener
+        await connection._dispatch_queue.join()
+        dispatcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await dispatcher
+
+
+@pytest.fixture
+def make_connection():
+    """Return a factory of connections to a Miniserver which is not there."""
+
+    def make(**kwargs) -> LoxoneConnection:
+        kwargs = {
+            "host": "192.0.2.1",
+            "username": "user",
+            "password": "password",
+            **kwargs,
+        }
+        return LoxoneConnection(**kwargs)
+
+    return make
+
+
+@pytest.fixture
+def connection(make_connection) -> LoxoneConnection:
+    return make_connection()
+
+
+@pytest.fixture
+def make_websocket():
+    """Return a factory which connects a connection to a FakeWebsocket."""
+
+    def make(connection: LoxoneConnection) -> FakeWebsocket:
+        connection.connection = FakeWebsocket(connection)
+        return connection.connection
+
+    return make
+
+
+@pytest.fixture
+def websocket(connection, make_websocket) -> FakeWebsocket:
+    return make_websocket(connection)
+
+
+@pytest.fixture
+def answer_authentication():
+    """Return a function which lets a connection authenticate.
+
+    The requests of the authentication are answered with code 200, or the
+    code given for their request key, and recorded by their request key.
+    """
+
+    def answer(connection: LoxoneConnection, codes: dict | None = None) -> list:
+        connection._session_key = b"session-key"
+        connection.miniserver_version = [14, 0]
+        requests = []
+
+        async def request(command, encrypted=False, timeout=None, lane=None):
+            requests.append(request_key(command))
+            value = "1"
+            if "getkey2" in command:
+                value = {"key": "0a1b", "salt": "2c3d", "hashAlg": "SHA256"}
+            elif "getjwt" in command:
+                value = {"token": "new-token", "validUntil": 500000000, "key": ""}
+            code = (codes or {}).get(request_key(command), "200")
+            return LLResponse(
+                json.dumps({"LL": {"control": command, "value": value, "Code": code}})
+            )
+
+        connection.request = request
+        return requests
+
+    return answer
@@ -0,0 +1,119 @@
+"""Tests for opening the connection to the Miniserver."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def _stub_stages(connection, steps: list[str], websocket) -> None:
+    structure_ready = asyncio.Event()
+
+    async def get_api_key(connector):
+        steps.append("api key")
+
+    async def get_structure_file(connector):
+        steps.append("structure started")
+        await structure_ready.wait()
+        steps.append("structure done")
+        return {"controls": {}}
+
+    async def get_public_key(connector):
+        steps.append("public key")
+
+    def init_session_key():
+        steps.append("session key")
+
+    async def connect_websocket():
+        steps.append("websocket")
+        structure_ready.set()
+        return websocket
+
+    connection._get_api_key = get_api_key
+    connection._get_structure_file = get_structure_file
+    connection._get_public_key = get_public_key
+    connection._init_session_key = init_session_key
+    connection._connect_websocket = connect_websocket
+
+
+def test_websocket_connects_while_structure_is_loading(connection, websocket) -> None:
+    steps = []
+    _stub_stages(connection, steps, websocket)
+
+    opened = asyncio.run(connection.open())
+
+    assert opened is websocket
+    assert steps.index("websocket") < steps.index("structure done")
+    assert steps[0] == "api key"
+    assert connection.structure_file["controls"] == {}
+
+
+def test_failed_structure_fails_open(connection, websocket) -> None:
+    _stub_stages(connection, [], websocket)
+
+    async def get_structure_file(connector):
+        raise ValueError("Invalid JSON in structure file")
+
+    connection._get_structure_file = get_structure_file
+
+    with pytest.raises(ValueError):
+        asyncio.run(connection.open())
+    assert websocket.closed
+
+
+def test_open_records_stage_timings(connection, websocket) -> None:
+    _stub_stages(connection, [], websocket)
+
+    asyncio.run(connection.open())
+
+    assert set(connection.bootstrap_timings) == {
+        "api_key",
+        "structure_file",
+        "public_key",
+        "session_key",
+        "websocket",
+        "total",
+    }
+    assert all(timing >= 0 for timing in connection.bootstrap_timings.values())
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.content = SimpleNamespace(read=self._read)
+        self._text = text
+
+    async def _read(self):
+        return self._text.encode()
+
+
+def test_public_key_is_cached_by_serial(make_connection) -> None:
+    requests = []
+    body = json.dumps(
+        {
+            "LL": {
+                "value": "-----BEGIN CERTIFICATE-----key-----END CERTIFICATE-----",
+                "control": "dev/sys/getPublicKey",
+                "Code": "200",
+            }
+        }
+    )
+
+    async def get(endpoint):
+        requests.append(endpoint)
+        return FakeResponse(body)
+
+    connector = SimpleNamespace(get=get)
+
+    async def run(serial):
+        connection = make_connection()
+        connection.miniserver_serial = serial
+        await connection._get_public_key(connector)
+
+    asyncio.run(run("504F94000001"))
+    asyncio.run(run("504F94000001"))
+    asyncio.run(run("504F94000002"))
+
+    assert len(requests) == 2
@@ -0,0 +1,185 @@
+"""Tests for encrypting the commands sent to the Miniserver."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import urllib.parse
+from base64 import b64encode
+
+import pytest
+
+from Crypto.Cipher import AES
+from Crypto.Util import Padding
+
+from custom_components.loxone.pyloxone_api.command_cipher import CommandCipher
+from custom_components.loxone.pyloxone_api.const import (
+    COMMAND_ENCRYPTION_ALWAYS,
+    COMMAND_ENCRYPTION_FULL,
+)
+from custom_components.loxone.pyloxone_api.message import MessageType
+
+KEY = bytes(range(32))
+IV = bytes(range(16, 32))
+COMMANDS = [
+    "salt/0a1b/jdev/sps/io/1d8af56e-036e-e9ad-ffffed57184a04d2/on\x00",
+    "nextSalt/0a1b/2c3d/jdev/sys/getkey2/user\x00",
+    "salt/0a1b/jdev/sps/io/1d8af56e-036e-e9ad-ffffed57184a04d2/setBrightness/30\x00",
+]
+
+
+def _encrypt_per_command(command_string: str) -> str:
+    padded_bytes = Padding.pad(bytes(command_string, "utf-8"), 16)
+    cipher = b64encode(AES.new(KEY, AES.MODE_CBC, IV).encrypt(padded_bytes))
+    return f"jdev/sys/enc/{urllib.parse.quote(cipher.decode())}"
+
+
+def test_cipher_matches_per_command_encryption() -> None:
+    cipher = CommandCipher(KEY, IV)
+
+    assert [cipher.encrypt(command) for command in COMMANDS] == [
+        _encrypt_per_command(command) for command in COMMANDS
+    ]
+
+
+def test_decrypt_returns_the_command() -> None:
+    cipher = CommandCipher(KEY, IV)
+    encrypted = urllib.parse.unquote(cipher.encrypt(COMMANDS[1]))
+
+    assert cipher.decrypt(encrypted) == COMMANDS[1].rstrip("\x00").encode()
+
+
+def test_cipher_starts_every_command_with_the_iv() -> None:
+    cipher = CommandCipher(KEY, IV)
+    encrypted = [cipher.encrypt(COMMANDS[2]) for _ in range(3)]
+
+    assert len(set(encrypted)) == 1
+    with pytest.raises(ValueError):
+        cipher.decrypt(
+            urllib.parse.unquote(CommandCipher(bytes(32), IV).encrypt(COMMANDS[0]))
+        )
+    assert [cipher.decrypt(urllib.parse.unquote(text)) for text in encrypted] == [
+        COMMANDS[2].rstrip("\x00").encode()
+    ] * 3
+
+
+def _send(connection, websocket) -> list[str]:
+    async def run():
+        async with websocket.sending():
+            await connection.send_websocket_command("uuid", "on")
+            for command in ("jdev/sps/ios/hash/uuid/on", "jdev/sys/getkey2/user"):
+                with contextlib.suppress(TimeoutError):
+                    await connection.request(command, encrypted=True, timeout=0.01)
+
+    asyncio.run(run())
+    return websocket.raw
+
+
+def test_plain_value_commands_skip_encryption_on_tls(
+    make_connection, make_websocket
+) -> None:
+    connection = make_connection(host="https://192.0.2.1", port=443)
+    websocket = make_websocket(connection)
+
+    io, ios, getkey2 = _send(connection, websocket)
+
+    assert io == "jdev/sps/io/uuid/on"
+    assert ios.startswith("jdev/sys/enc/")
+    assert getkey2.startswith("jdev/sys/enc/")
+    assert websocket.sent[1:] == ["jdev/sps/ios/hash/uuid/on", "jdev/sys/getkey2/user"]
+
+
+def test_value_commands_are_encrypted_without_tls_or_by_policy(
+    make_connection, make_websocket
+) -> None:
+    plain = make_connection()
+    always = make_connection(
+        host="https://192.0.2.1",
+        port=443,
+        command_encryption=COMMAND_ENCRYPTION_ALWAYS,
+    )
+
+    for connection in (plain, always):
+        websocket = make_websocket(connection)
+        assert _send(connection, websocket)[0].startswith("jdev/sys/enc/")
+        assert websocket.sent[0] == "jdev/sps/io/uuid/on"
+
+
+def test_queued_commands_are_sent_in_order(connection, websocket) -> None:
+    async def run():
+        for value in range(20):
+            await connection.send_websocket_command(f"uuid-{value}", "pulse")
+        return await websocket.flush()
+
+    sent = asyncio.run(run())
+
+    assert sent == [f"jdev/sps/io/uuid-{value}/pulse" for value in range(20)]
+
+
+def _encrypt_response(cipher: CommandCipher, response: dict) -> str:
+    # A fully encrypted response is the base64 cipher text of the json
+    encrypted = cipher.encrypt(json.dumps(response) + "\x00")
+    return urllib.parse.unquote(encrypted[len(cipher.prefix) :])
+
+
+def test_full_encryption_sends_fenc_and_decrypts_responses() -> None:
+    cipher = CommandCipher(KEY, IV, full=True)
+    response = {"LL": {"control": "dev/sys/getkey2/user", "Code": "200"}}
+
+    assert cipher.encrypt(COMMANDS[0]).startswith("jdev/sys/fenc/")
+    decrypted = cipher.decrypt(_encrypt_response(cipher, response).encode())
+    assert json.loads(decrypted) == response
+
+
+def test_decrypt_rejects_wrong_padding() -> None:
+    encrypted = CommandCipher(KEY, IV).encrypt(COMMANDS[0])
+
+    with pytest.raises(ValueError):
+        CommandCipher(bytes(32), IV).decrypt(urllib.parse.unquote(encrypted))
+
+
+def _dispatch(websocket) -> list[dict]:
+    received = []
+
+    async def callback(message_dict):
+        received.append(message_dict)
+
+    asyncio.run(websocket.dispatch(callback))
+    return received
+
+
+def test_fully_encrypted_text_messages_are_decrypted(
+    make_connection, make_websocket
+) -> None:
+    connection = make_connection(command_encryption=COMMAND_ENCRYPTION_FULL)
+    websocket = make_websocket(connection)
+    websocket.receive(
+        MessageType.TEXT,
+        _encrypt_response(
+            connection._cipher,
+            {"LL": {"control": "dev/sys/getkey2/user", "value": "1", "Code": "200"}},
+        ),
+    )
+
+    (message,) = _dispatch(websocket)
+
+    assert message["control"] == "dev/sys/getkey2/user"
+    assert message["Code"] == 200
+
+
+def test_responses_which_can_not_be_decrypted_are_dropped(
+    make_connection, make_websocket
+) -> None:
+    connection = make_connection(command_encryption=COMMAND_ENCRYPTION_FULL)
+    websocket = make_websocket(connection)
+    payload = _encrypt_response(
+        connection._cipher,
+        {"LL": {"control": "dev/sys/getkey2/user", "value": "1", "Code": "200"}},
+    )
+    for text in ("bm90IGEgYmxvY2s=", "not base64 %", payload):
+        websocket.receive(MessageType.TEXT, text)
+
+    received = _dispatch(websocket)
+
+    assert [message["control"] for message in received] == ["dev/sys/getkey2/user"]
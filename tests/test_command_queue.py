@@ -0,0 +1,96 @@
+"""Tests for queueing commands sent to the Miniserver."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.loxone.pyloxone_api.connection import (
+    LoxoneConnection,
+    coalesce_key,
+)
+from custom_components.loxone.pyloxone_api.outbound_queue import Lane
+
+UUID = "1d8af56e-036e-e9ad-ffffed57184a04d2"
+OTHER_UUID = "12345678-9abc-def0-0123456789abcdef"
+
+
+def _send(connection: LoxoneConnection, websocket, *batches) -> list[str]:
+    """Send batches of (uuid, value), flushing the queue after each batch."""
+
+    async def run():
+        for commands in batches:
+            for device_uuid, value in commands:
+                await connection.send_websocket_command(device_uuid, value)
+            await websocket.flush()
+        return websocket.sent
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "value, key",
+    [
+        (42, ""),
+        ("42.5", ""),
+        ("setBrightness/30", "setBrightness"),
+        ("setTemp/1/21.5", "setTemp/1"),
+        ("hsv(10,20,30)", "hsv"),
+        ("pulse", None),
+        ("FullUp", None),
+        ("on", None),
+        ("addMood/3", None),
+        (True, None),
+    ],
+)
+def test_coalesce_key(value, key) -> None:
+    assert coalesce_key(value) == key
+
+
+def test_queued_values_are_replaced_by_newer_ones(connection, websocket) -> None:
+    sent = _send(
+        connection,
+        websocket,
+        [(UUID, 10), (OTHER_UUID, 1), (UUID, 20), (UUID, 30), (OTHER_UUID, 2)],
+    )
+
+    assert sent == [f"jdev/sps/io/{UUID}/30", f"jdev/sps/io/{OTHER_UUID}/2"]
+    assert connection.coalesced_commands == 3
+
+
+def test_pulse_commands_are_not_coalesced(connection, websocket) -> None:
+    sent = _send(
+        connection,
+        websocket,
+        [(UUID, 10), (UUID, "pulse"), (UUID, "pulse"), (UUID, 20)],
+    )
+
+    assert sent == [
+        f"jdev/sps/io/{UUID}/10",
+        f"jdev/sps/io/{UUID}/pulse",
+        f"jdev/sps/io/{UUID}/pulse",
+        f"jdev/sps/io/{UUID}/20",
+    ]
+
+
+def test_sent_values_are_not_replaced(connection, websocket) -> None:
+    sent = _send(connection, websocket, [(UUID, 10)], [(UUID, 20)])
+
+    assert sent == [f"jdev/sps/io/{UUID}/10", f"jdev/sps/io/{UUID}/20"]
+
+
+def test_commands_do_not_overtake_commands_in_slower_lanes(
+    connection, websocket
+) -> None:
+    async def send():
+        await connection.send_websocket_command(UUID, "pulse", lane=Lane.BULK)
+        await connection.send_websocket_command(UUID, "on")
+        await connection.send_websocket_command(OTHER_UUID, "on")
+        return await websocket.flush()
+
+    assert asyncio.run(send()) == [
+        f"jdev/sps/io/{OTHER_UUID}/on",
+        f"jdev/sps/io/{UUID}/pulse",
+        f"jdev/sps/io/{UUID}/on",
+    ]
@@ -0,0 +1,253 @@
+"""Tests for decoding binary state tables sent by the Miniserver."""
+
+from __future__ import annotations
+
+import struct
+import uuid
+
+import pytest
+
+from custom_components.loxone.pyloxone_api import message
+from custom_components.loxone.pyloxone_api.exceptions import LoxoneException
+from custom_components.loxone.pyloxone_api.message import (
+    KEEPALIVE,
+    MessageType,
+    TextStatesTable,
+    ValueStatesTable,
+    decode_text_states,
+    decode_value_states,
+    loxone_uuid_bytes,
+    loxone_uuid_str,
+    parse_header,
+    parse_message,
+    seed_uuid_cache,
+    uuid_key,
+)
+from custom_components.loxone.pyloxone_api.state_store import StateStore
+
+UUIDS = [
+    "0f1e2d3c-4b5a-6978-8796a5b4c3d2e1f0",
+    "12345678-9abc-def0-0123456789abcdef",
+    "1d8af56e-036e-e9ad-ffffed57184a04d2",
+]
+
+
+def _uuid_bytes(loxone_uuid: str) -> bytes:
+    canonical = f"{loxone_uuid[:23]}-{loxone_uuid[23:]}"
+    return uuid.UUID(canonical).bytes_le
+
+
+def _value_states(values: dict[str, float]) -> bytes:
+    return b"".join(
+        _uuid_bytes(key) + struct.pack("<d", value) for key, value in values.items()
+    )
+
+
+def _text_state(key: str, icon: str, text: bytes) -> bytes:
+    record = _uuid_bytes(key) + _uuid_bytes(icon) + struct.pack("<I", len(text)) + text
+    return record + b"\x00" * (-len(record) % 4)
+
+
+def test_loxone_uuid_str_matches_uuid_module() -> None:
+    for key in UUIDS:
+        assert loxone_uuid_str(_uuid_bytes(key)) == key
+
+
+def test_value_states_table_as_dict() -> None:
+    values = {UUIDS[0]: 21.5, UUIDS[1]: -3.0, UUIDS[2]: 0.0}
+
+    assert ValueStatesTable(_value_states(values)).as_dict() == values
+
+
+def test_value_states_ignores_trailing_partial_record() -> None:
+    values = {UUIDS[0]: 1.0}
+
+    assert decode_value_states(_value_states(values) + b"\x00" * 10) == values
+
+
+@pytest.mark.skipif(message.np is None, reason="numpy is not installed")
+def test_numpy_and_struct_decoders_agree() -> None:
+    raw = bytes(range(256)) * 3
+    table = b"".join(raw[i : i + 16] + struct.pack("<d", i / 7) for i in range(200))
+
+    numpy_result = message._decode_value_states_numpy(table, 200)
+    struct_result = message._decode_value_states_struct(table, 200)
+
+    assert numpy_result == struct_result
+    assert list(numpy_result) == list(struct_result)
+
+
+@pytest.mark.parametrize("count", [3, 200])
+def test_value_states_state_filter(count) -> None:
+    keys = [loxone_uuid_str(struct.pack("<QQ", i, i * 31)) for i in range(count)]
+    table = _value_states({key: float(i) for i, key in enumerate(keys)})
+    state_filter = frozenset({loxone_uuid_bytes(keys[0]), loxone_uuid_bytes(keys[2])})
+
+    assert decode_value_states(table, state_filter) == {keys[0]: 0.0, keys[2]: 2.0}
+
+
+def test_text_states_table_as_dict() -> None:
+    table = (
+        _text_state(UUIDS[0], UUIDS[2], "Küche".encode())
+        + _text_state(UUIDS[1], UUIDS[2], b"")
+        + _text_state(UUIDS[2], UUIDS[0], b"abcd")
+    )
+
+    assert TextStatesTable(table).as_dict() == {
+        UUIDS[0]: "Küche",
+        UUIDS[1]: "",
+        UUIDS[2]: "abcd",
+    }
+
+
+def test_text_states_table_icons() -> None:
+    table = _text_state(UUIDS[0], UUIDS[2], b"on") + _text_state(
+        UUIDS[1], UUIDS[0], b"off"
+    )
+
+    assert TextStatesTable(table).icons() == {UUIDS[0]: UUIDS[2], UUIDS[1]: UUIDS[0]}
+
+
+def test_text_states_state_filter() -> None:
+    table = _text_state(UUIDS[0], UUIDS[2], b"on") + _text_state(
+        UUIDS[1], UUIDS[0], b"off"
+    )
+
+    assert decode_text_states(table, frozenset({_uuid_bytes(UUIDS[1])})) == {
+        UUIDS[1]: "off"
+    }
+
+
+def test_text_states_table_falls_back_for_non_utf8_text() -> None:
+    table = _text_state(UUIDS[0], UUIDS[1], "Grüße".encode("latin-1"))
+
+    assert TextStatesTable(table).as_dict() == {UUIDS[0]: "Grüße"}
+
+
+def test_text_states_table_rejects_truncated_text() -> None:
+    table = _text_state(UUIDS[0], UUIDS[1], b"abcdefgh")[:-4]
+
+    with pytest.raises(LoxoneException):
+        TextStatesTable(table).as_dict()
+
+
+def test_loxone_uuid_bytes_is_inverse_of_loxone_uuid_str() -> None:
+    for key in UUIDS:
+        assert loxone_uuid_str(loxone_uuid_bytes(key)) == key
+
+    with pytest.raises(ValueError):
+        loxone_uuid_bytes("not-a-uuid")
+
+
+def test_uuid_key_returns_the_same_string_object() -> None:
+    raw = _uuid_bytes(UUIDS[1])
+
+    assert uuid_key(raw) is uuid_key(bytes(raw))
+    assert uuid_key(raw) == UUIDS[1]
+
+
+def test_seed_uuid_cache_skips_invalid_entries(monkeypatch) -> None:
+    monkeypatch.setattr(message, "_uuid_cache", {})
+
+    assert seed_uuid_cache([UUIDS[0], UUIDS[0], "12345678-1234/AI1", None]) == 1
+    assert message._uuid_cache == {_uuid_bytes(UUIDS[0]): UUIDS[0]}
+
+
+def test_uuid_cache_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(message, "_uuid_cache", {})
+    monkeypatch.setattr(message, "_UUID_CACHE_MAX_SIZE", 2)
+
+    for key in UUIDS:
+        uuid_key(_uuid_bytes(key))
+
+    assert list(message._uuid_cache.values()) == UUIDS[1:]
+
+
+def test_parse_header() -> None:
+    header = parse_header(struct.pack("<cBccI", b"\x03", 2, b"\x80", b"\x00", 48))
+
+    assert header.message_type is MessageType.VALUE_STATES
+    assert header.estimated is True
+    assert header.payload_length == 48
+
+
+def test_parse_header_is_shared_for_identical_headers() -> None:
+    data = struct.pack("<cBccI", b"\x03", 6, b"\x00", b"\x00", 0)
+
+    assert parse_header(data) is parse_header(bytes(data))
+
+
+def test_parse_message_dispatches_on_type() -> None:
+    values = {UUIDS[0]: 1.0}
+
+    parsed = parse_message(_value_states(values), MessageType.VALUE_STATES)
+
+    assert isinstance(parsed, ValueStatesTable)
+    assert parsed.as_dict() == values
+    assert parse_message(b"", int(MessageType.KEEPALIVE)) is KEEPALIVE
+
+
+def test_parse_message_rejects_unknown_type() -> None:
+    with pytest.raises(LoxoneException):
+        parse_message(b"", MessageType.UNKNOWN)
+    with pytest.raises(LoxoneException):
+        parse_message(b"", None)
+
+
+def test_parse_message_applies_state_filter() -> None:
+    values = {UUIDS[0]: 1.0, UUIDS[1]: 2.0}
+
+    parsed = parse_message(
+        _value_states(values),
+        MessageType.VALUE_STATES,
+        frozenset({_uuid_bytes(UUIDS[1])}),
+    )
+
+    assert parsed.as_dict() == {UUIDS[1]: 2.0}
+
+
+@pytest.mark.parametrize("count", [3, 200])
+def test_value_states_are_written_to_the_store(count) -> None:
+    keys = [loxone_uuid_str(struct.pack("<QQ", i, i * 31)) for i in range(count)]
+    values = {key: float(i) for i, key in enumerate(keys)}
+    store = StateStore(keys[:2])
+
+    parsed = parse_message(
+        _value_states(values), MessageType.VALUE_STATES, state_store=store
+    )
+
+    assert store.snapshot() == {}
+    assert parsed.as_dict() == values
+    assert store.snapshot() == values
+
+
+def test_text_states_are_written_to_the_store() -> None:
+    store = StateStore()
+    table = _text_state(UUIDS[0], UUIDS[2], b"on")
+
+    parse_message(table, MessageType.TEXT_STATES, state_store=store).as_dict()
+    parse_message(
+        '{"LL": {"control": "jdev/sps/io/x/on", "value": "1", "Code": "200"}}',
+        MessageType.TEXT,
+        state_store=store,
+    ).as_dict()
+
+    assert store.snapshot() == {UUIDS[0]: "on"}
+
+
+def test_as_dict_is_decoded_once(monkeypatch) -> None:
+    calls = []
+    decode = message.decode_value_states
+    monkeypatch.setattr(
+        message,
+        "decode_value_states",
+        lambda *args: calls.append(args) or decode(*args),
+    )
+    parsed = parse_message(_value_states({UUIDS[0]: 1.0}), MessageType.VALUE_STATES)
+
+    assert parsed.as_dict() is parsed.as_dict()
+    assert len(calls) == 1
+
+    parsed.clear_dict()
+    assert parsed.as_dict() == {UUIDS[0]: 1.0}
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+"""Tests for dispatching received websocket messages."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+
+import pytest
+
+from custom_components.loxone.pyloxone_api.message import MessageType
+
+TEXT = json.dumps({"LL": {"control": "jdev/sys/getkey", "value": "1", "Code": "200"}})
+
+
+def _value_states(value: float) -> bytes:
+    return bytes(range(16)) + struct.pack("<d", value)
+
+
+def _dispatch(websocket) -> list[dict]:
+    received = []
+
+    async def callback(message_dict):
+        received.append(message_dict)
+
+    asyncio.run(websocket.dispatch(callback))
+    return received
+
+
+def test_messages_are_dispatched_in_order(websocket) -> None:
+    websocket.receive(MessageType.VALUE_STATES, _value_states(1.0))
+    websocket.receive(MessageType.KEEPALIVE)
+    websocket.receive(MessageType.VALUE_STATES, _value_states(2.0))
+
+    received = _dispatch(websocket)
+
+    assert [list(message.values()) for message in received] == [
+        [1.0],
+        ["received"],
+        [2.0],
+    ]
+
+
+def test_drop_newest_policy_only_drops_state_tables(
+    make_connection, make_websocket
+) -> None:
+    connection = make_connection(dispatch_queue_size=1, overflow_policy="drop_newest")
+    websocket = make_websocket(connection)
+    websocket.receive(MessageType.VALUE_STATES, _value_states(1.0))
+    websocket.receive(MessageType.VALUE_STATES, _value_states(2.0))
+    websocket.receive(MessageType.TEXT, TEXT)
+
+    received = _dispatch(websocket)
+
+    assert list(received[0].values()) == [1.0]
+    assert received[1]["control"] == "jdev/sys/getkey"
+    assert len(received) == 2
+    assert connection.dropped_messages == 1
+
+
+def test_unknown_overflow_policy_is_rejected(make_connection) -> None:
+    with pytest.raises(ValueError):
+        make_connection(overflow_policy="drop_everything")
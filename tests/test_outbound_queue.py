@@ -0,0 +1,75 @@
+"""Tests for the priority lanes of the outbound queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.loxone.pyloxone_api.outbound_queue import Lane, OutboundQueue
+
+
+def _queue(size: int = 10) -> OutboundQueue:
+    return OutboundQueue({lane: size for lane in Lane})
+
+
+def test_higher_priority_lanes_are_served_first() -> None:
+    queue = _queue()
+    queue.put_nowait("bulk 1", Lane.BULK)
+    queue.put_nowait("interactive", Lane.INTERACTIVE)
+    queue.put_nowait("bulk 2", Lane.BULK)
+    queue.put_nowait("protocol", Lane.PROTOCOL)
+    queue.put_nowait("secured", Lane.SECURED)
+
+    items = [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert items == ["protocol", "secured", "interactive", "bulk 1", "bulk 2"]
+    with pytest.raises(asyncio.QueueEmpty):
+        queue.get_nowait()
+
+
+def test_full_lane_does_not_block_other_lanes() -> None:
+    queue = _queue(size=1)
+    queue.put_nowait("bulk 1", Lane.BULK)
+
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait("bulk 2", Lane.BULK)
+    queue.put_nowait("protocol", Lane.PROTOCOL)
+
+    assert queue.get_nowait() == "protocol"
+
+
+def test_put_waits_for_room_in_its_lane() -> None:
+    queue = _queue(size=1)
+
+    async def run():
+        queue.put_nowait("bulk 1", Lane.BULK)
+        waiting = asyncio.create_task(queue.put("bulk 2", Lane.BULK))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        assert await queue.get() == "bulk 1"
+        await waiting
+        return await queue.get()
+
+    assert asyncio.run(run()) == "bulk 2"
+    metrics = queue.metrics()["bulk"]
+    assert metrics["queued"] == 2
+    assert metrics["sent"] == 2
+    assert metrics["waits"] == 1
+    assert metrics["max_depth"] == 1
+    assert metrics["depth"] == 0
+
+
+def test_join_waits_for_task_done() -> None:
+    queue = _queue()
+
+    async def run():
+        queue.put_nowait("protocol", Lane.PROTOCOL)
+        join = asyncio.create_task(queue.join())
+        queue.get_nowait()
+        await asyncio.sleep(0)
+        assert not join.done()
+        queue.task_done()
+        await join
+
+    asyncio.run(run())
@@ -0,0 +1,140 @@
+"""Tests for resuming a lost connection to the Miniserver."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.loxone.pyloxone_api import connection as connection_module
+from custom_components.loxone.pyloxone_api.connection import reconnect_delay
+from custom_components.loxone.pyloxone_api.const import (
+    RECONNECT_BACKOFF_BASE,
+    RECONNECT_BACKOFF_MAX,
+)
+from custom_components.loxone.pyloxone_api.exceptions import (
+    LoxoneConnectionError,
+    LoxoneStructureChangedError,
+)
+
+
+def test_reconnect_delay_grows_up_to_the_maximum() -> None:
+    for attempt, delay in (
+        (0, RECONNECT_BACKOFF_BASE),
+        (3, RECONNECT_BACKOFF_BASE * 8),
+    ):
+        assert delay / 2 <= reconnect_delay(attempt) <= delay
+    assert reconnect_delay(100) <= RECONNECT_BACKOFF_MAX
+
+
+def test_lost_connection_is_resumed(monkeypatch, connection) -> None:
+    monkeypatch.setattr(connection_module, "reconnect_delay", lambda attempt: 0)
+    events = []
+    resumes = []
+
+    async def listen(callback, authenticated):
+        if not resumes:
+            raise LoxoneConnectionError("Connection closed")
+        authenticated()
+        await connection.close()
+
+    async def resume():
+        resumes.append(True)
+        if len(resumes) == 1:
+            raise ConnectionError("Miniserver not reachable")
+        return None
+
+    connection._listen = listen
+    connection.resume = resume
+
+    asyncio.run(connection.start_listening(connection_callback=events.append))
+
+    assert events == [False, True]
+    assert len(resumes) == 2
+    assert connection.reconnects == 1
+
+
+def test_failed_authentication_is_retried_with_backoff(monkeypatch, connection) -> None:
+    attempts = []
+
+    def delay(attempt):
+        attempts.append(attempt)
+        return 0
+
+    monkeypatch.setattr(connection_module, "reconnect_delay", delay)
+    events = []
+    listens = []
+
+    async def listen(callback, authenticated):
+        listens.append(True)
+        if len(listens) < 3:
+            raise LoxoneConnectionError("Authentication failed")
+        authenticated()
+        await connection.close()
+
+    async def resume():
+        return None
+
+    connection._listen = listen
+    connection.resume = resume
+
+    asyncio.run(connection.start_listening(connection_callback=events.append))
+
+    assert attempts == [0, 1]
+    assert events == [False, False, True]
+    assert connection.reconnects == 1
+
+
+def test_changed_structure_stops_resuming(monkeypatch, connection) -> None:
+    monkeypatch.setattr(connection_module, "reconnect_delay", lambda attempt: 0)
+    connection.structure_file = {"lastModified": "2024-01-01 10:00:00"}
+
+    async def listen(callback, authenticated):
+        raise LoxoneConnectionError("Connection closed")
+
+    async def get_structure_version(connector):
+        return "2024-02-01 10:00:00"
+
+    connection._listen = listen
+    connection._get_structure_version = get_structure_version
+
+    with pytest.raises(LoxoneStructureChangedError):
+        asyncio.run(connection.start_listening())
+
+
+def test_rejected_token_is_replaced_when_resuming(
+    monkeypatch, make_connection, make_websocket, answer_authentication
+) -> None:
+    monkeypatch.setattr(connection_module, "reconnect_delay", lambda attempt: 0)
+    saved = []
+    connection = make_connection(
+        token={"token": "stored", "valid_until": 2**31, "hash_alg": "SHA256"},
+        token_callback=saved.append,
+    )
+    websocket = make_websocket(connection)
+    requests = answer_authentication(connection, codes={"authwithtoken": "401"})
+    events = []
+
+    async def resume():
+        return websocket
+
+    def connection_callback(connected):
+        events.append(connected)
+        if connected:
+            asyncio.get_running_loop().create_task(connection.close())
+
+    connection.resume = resume
+
+    asyncio.run(connection.start_listening(connection_callback=connection_callback))
+
+    assert requests == [
+        "dev/sys/keyexchange",
+        "dev/sys/getkey2",
+        "authwithtoken",
+        "dev/sys/keyexchange",
+        "dev/sys/getkey2",
+        "dev/sys/getjwt",
+    ]
+    assert events == [False, True]
+    assert saved[-1]["token"] == "new-token"
+    assert connection.reconnects == 1
@@ -0,0 +1,125 @@
+"""Tests for matching Miniserver responses to requests."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.loxone.pyloxone_api.connection import request_key
+from custom_components.loxone.pyloxone_api.exceptions import (
+    LoxoneConnectionError,
+    LoxoneTokenError,
+)
+
+
+@pytest.mark.parametrize(
+    "control, key",
+    [
+        ("jdev/sys/getkey2/user", "dev/sys/getkey2"),
+        ("dev/sys/getkey2/user", "dev/sys/getkey2"),
+        ("/jdev/sys/getkey", "dev/sys/getkey"),
+        (b"salt/0a1b/jdev/sys/getjwt/abc/user\x00", "dev/sys/getjwt"),
+        ("nextSalt/0a1b/2c3d/jdev/sys/getvisusalt/user", "dev/sys/getvisusalt"),
+        (
+            "jdev/sps/io/1d8af56e-036e-e9ad-ffffed57184a04d2/on",
+            "dev/sps/io/1d8af56e-036e-e9ad-ffffed57184a04d2",
+        ),
+        ("jdev/sps/enablebinstatusupdate", "dev/sps/enablebinstatusupdate"),
+        ("authwithtoken/abc/user", "authwithtoken"),
+    ],
+)
+def test_request_key(control, key) -> None:
+    assert request_key(control) == key
+
+
+def test_request_returns_matching_response(connection, websocket) -> None:
+    async def run():
+        async with websocket.sending():
+            requests = asyncio.gather(
+                connection.request("jdev/sys/getkey2/user"),
+                connection.request("jdev/sys/getkey"),
+            )
+            await websocket.wait_sent(2)
+            # Responses arrive in a different order than the requests were sent
+            await websocket.respond("dev/sys/getkey", "key")
+            await websocket.respond("jdev/sys/getkey2/user", {"key": "k", "salt": "s"})
+            return await requests
+
+    getkey2, getkey = asyncio.run(run())
+
+    assert websocket.sent == ["jdev/sys/getkey2/user", "jdev/sys/getkey"]
+    assert getkey2.value_as_dict["salt"] == "s"
+    assert getkey.value == "key"
+    assert getkey.round_trip is not None
+
+
+def test_request_times_out(connection, websocket) -> None:
+    async def run():
+        async with websocket.sending():
+            try:
+                await connection.request("jdev/sys/getkey", timeout=0.01)
+            finally:
+                # A late response finds no request waiting for it
+                await websocket.respond("jdev/sys/getkey", "key")
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(run())
+    assert websocket.sent == ["jdev/sys/getkey"]
+
+
+def test_unexpected_responses_are_ignored(websocket) -> None:
+    asyncio.run(websocket.respond("jdev/sps/io/abc/on"))
+
+
+@pytest.fixture
+def authenticate(answer_authentication):
+    def authenticate(connection, codes: dict[str, str] | None = None) -> list[str]:
+        requests = answer_authentication(connection, codes)
+        asyncio.run(connection._authenticate())
+        return requests
+
+    return authenticate
+
+
+STORED_TOKEN = {"token": "stored", "valid_until": 2**31, "hash_alg": "SHA256"}
+
+
+def test_stored_token_authenticates_without_new_token(
+    make_connection, authenticate
+) -> None:
+    saved = []
+    connection = make_connection(token=STORED_TOKEN, token_callback=saved.append)
+
+    requests = authenticate(connection)
+
+    assert requests == ["dev/sys/keyexchange", "dev/sys/getkey2", "authwithtoken"]
+    assert saved == []
+
+
+def test_new_token_is_handed_to_the_token_callback(
+    make_connection, authenticate
+) -> None:
+    saved = []
+    connection = make_connection(token_callback=saved.append)
+
+    requests = authenticate(connection)
+
+    assert requests == ["dev/sys/keyexchange", "dev/sys/getkey2", "dev/sys/getjwt"]
+    assert saved[0]["token"] == "new-token"
+    assert saved[0]["valid_until"] == 500000000
+
+
+def test_rejected_token_fails_the_authentication(make_connection, authenticate) -> None:
+    saved = []
+    connection = make_connection(token=STORED_TOKEN, token_callback=saved.append)
+
+    with pytest.raises(LoxoneTokenError):
+        authenticate(connection, codes={"authwithtoken": "401"})
+    # The token is reset, the next attempt acquires a new one
+    assert not saved[-1]["token"]
+
+
+def test_failed_key_exchange_fails_the_authentication(connection, authenticate) -> None:
+    with pytest.raises(LoxoneConnectionError):
+        authenticate(connection, codes={"dev/sys/keyexchange": "500"})
@@ -0,0 +1,121 @@
+"""Tests for sending secured commands with the visual password."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from custom_components.loxone.pyloxone_api import connection as connection_module
+from custom_components.loxone.pyloxone_api.const import (
+    VISUAL_SALT_MAX_AGE_SECONDS,
+)
+from custom_components.loxone.pyloxone_api.exceptions import (
+    LoxoneCommandSupersededError,
+)
+from custom_components.loxone.pyloxone_api.message import LLResponse
+
+
+def _answer_salt_requests(
+    connection, requests: list[str], salt_ready: asyncio.Event | None = None
+) -> None:
+    async def request(command, encrypted=False, timeout=None, lane=None):
+        requests.append(command)
+        if salt_ready is not None:
+            await salt_ready.wait()
+        value = {"key": "0a1b", "salt": "2c3d", "hashAlg": "SHA256"}
+        return LLResponse(
+            json.dumps({"LL": {"control": command, "value": value, "Code": "200"}})
+        )
+
+    connection.request = request
+
+
+def test_commands_waiting_for_the_salt_are_sent_together(connection, websocket) -> None:
+    requests = []
+
+    async def run():
+        salt_ready = asyncio.Event()
+        _answer_salt_requests(connection, requests, salt_ready)
+        sends = [
+            asyncio.create_task(
+                connection.send_secured__websocket_command(f"zone-{i}", "on", "1234")
+            )
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        salt_ready.set()
+        await asyncio.gather(*sends)
+        return await websocket.flush()
+
+    commands = asyncio.run(run())
+
+    assert len(requests) == 1
+    assert [command.split("/")[4] for command in commands] == [
+        "zone-0",
+        "zone-1",
+        "zone-2",
+    ]
+    assert len({command.split("/")[3] for command in commands}) == 1
+
+
+def test_newer_command_replaces_a_waiting_one(connection, websocket) -> None:
+    requests = []
+
+    async def run():
+        salt_ready = asyncio.Event()
+        _answer_salt_requests(connection, requests, salt_ready)
+        sends = [
+            asyncio.create_task(
+                connection.send_secured__websocket_command("alarm", value, "1234")
+            )
+            for value in ("on", "off")
+        ]
+        await asyncio.sleep(0)
+        salt_ready.set()
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        return results, await websocket.flush()
+
+    (replaced, sent), commands = asyncio.run(run())
+
+    assert isinstance(replaced, LoxoneCommandSupersededError)
+    assert sent is None
+    assert [command.rsplit("/", 1)[1] for command in commands] == ["off"]
+    assert connection.coalesced_commands == 1
+
+
+def test_salt_is_reused_until_it_expires(monkeypatch, connection) -> None:
+    now = [1000]
+    monkeypatch.setattr(connection_module, "time_elapsed_in_seconds", lambda: now[0])
+    requests = []
+    _answer_salt_requests(connection, requests)
+
+    async def run():
+        await connection.send_secured__websocket_command("door", "open", "1234")
+        await connection.send_secured__websocket_command("door", "open", "1234")
+        now[0] += VISUAL_SALT_MAX_AGE_SECONDS
+        await connection.send_secured__websocket_command("door", "open", "1234")
+
+    asyncio.run(run())
+
+    assert len(requests) == 2
+
+
+def test_failed_salt_request_fails_all_waiting_commands(connection, websocket) -> None:
+    async def request(command, encrypted=False, timeout=None, lane=None):
+        await asyncio.sleep(0)
+        raise TimeoutError("No response")
+
+    connection.request = request
+
+    async def run():
+        results = await asyncio.gather(
+            connection.send_secured__websocket_command("zone-1", "on", "1234"),
+            connection.send_secured__websocket_command("zone-2", "on", "1234"),
+            return_exceptions=True,
+        )
+        return results, await websocket.flush()
+
+    results, commands = asyncio.run(run())
+
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert commands == []
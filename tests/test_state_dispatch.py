@@ -0,0 +1,196 @@
+"""Tests for handing state updates to the subscribed entities."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.loxone.const import (
+    CONF_FILTER_UNUSED_STATES,
+    CONF_FIRE_STATE_EVENTS,
+)
+from custom_components.loxone.coordinator import (
+    LoxoneCoordinator,
+    LoxoneStateEvent,
+    get_event_uuids,
+)
+from custom_components.loxone.pyloxone_api.state_store import StateStore
+from custom_components.loxone.sensor import LoxoneSensor
+
+
+def _coordinator() -> SimpleNamespace:
+    coordinator = SimpleNamespace(
+        _state_handlers={},
+        _last_values={},
+        states=StateStore(),
+        registered=set(),
+    )
+    coordinator.async_register_state_uuids = coordinator.registered.update
+    return coordinator
+
+
+def _subscribe(coordinator, uuids, handler):
+    return LoxoneCoordinator.async_subscribe_states(coordinator, uuids, handler)
+
+
+def _dispatch(coordinator, data) -> None:
+    asyncio.run(LoxoneCoordinator.async_dispatch_states(coordinator, data))
+
+
+def test_only_entities_using_a_changed_state_are_called() -> None:
+    coordinator = _coordinator()
+    calls = []
+
+    async def light(event):
+        calls.append(("light", event.data))
+
+    async def cover(event):
+        calls.append(("cover", event.data))
+
+    _subscribe(coordinator, ["light-1", "light-2"], light)
+    _subscribe(coordinator, ["cover-1"], cover)
+
+    _dispatch(coordinator, {"light-1": 1.0, "light-2": 0.5, "other": 3.0})
+
+    assert calls == [("light", {"light-1": 1.0, "light-2": 0.5})]
+    assert coordinator.registered == {"light-1", "light-2", "cover-1"}
+
+
+def test_unsubscribe_removes_the_handler() -> None:
+    coordinator = _coordinator()
+    calls = []
+
+    async def handler(event):
+        calls.append(event.data)
+
+    unsubscribe = _subscribe(coordinator, ["state"], handler)
+    unsubscribe()
+    _dispatch(coordinator, {"state": 1.0})
+
+    assert calls == []
+    assert coordinator._state_handlers == {}
+
+
+def test_failing_handler_does_not_stop_dispatching() -> None:
+    coordinator = _coordinator()
+    calls = []
+
+    async def failing(event):
+        raise RuntimeError("boom")
+
+    async def handler(event):
+        calls.append(event.data)
+
+    _subscribe(coordinator, ["state"], failing)
+    _subscribe(coordinator, ["state"], handler)
+    _dispatch(coordinator, {"state": 1.0})
+
+    assert calls == [{"state": 1.0}]
+
+
+def test_unchanged_values_are_not_dispatched() -> None:
+    coordinator = _coordinator()
+    calls = []
+
+    async def handler(event):
+        calls.append(event.data)
+
+    _subscribe(coordinator, ["state", "keep_alive"], handler)
+    _dispatch(coordinator, {"state": 1.0})
+    _dispatch(coordinator, {"state": 1.0})
+    _dispatch(coordinator, {"state": 2.0})
+    _dispatch(coordinator, {"keep_alive": "received"})
+    _dispatch(coordinator, {"keep_alive": "received"})
+
+    assert calls == [
+        {"state": 1.0},
+        {"state": 2.0},
+        {"keep_alive": "received"},
+        {"keep_alive": "received"},
+    ]
+
+
+def test_sensor_ignores_changes_below_the_precision() -> None:
+    writes = []
+    sensor = SimpleNamespace(
+        uuidAction="state",
+        _precision=1,
+        _attr_native_value=None,
+        async_schedule_state_write=lambda: writes.append(sensor._attr_native_value),
+    )
+    for value in (21.04, 21.02, 21.07, 21.09, 21.04):
+        asyncio.run(
+            LoxoneSensor.event_handler(sensor, LoxoneStateEvent({"state": value}))
+        )
+
+    assert writes == [21.04, 21.07, 21.04]
+
+
+def test_new_subscribers_get_the_next_value() -> None:
+    coordinator = _coordinator()
+    calls = []
+
+    async def handler(event):
+        calls.append(event.data)
+
+    _subscribe(coordinator, ["state"], handler)
+    _dispatch(coordinator, {"state": 1.0})
+    _subscribe(coordinator, ["state"], handler)
+    _dispatch(coordinator, {"state": 1.0})
+
+    assert len(calls) == 2
+
+
+def test_event_uuids_expand_controls() -> None:
+    structure = {
+        "controls": {
+            "control": {
+                "uuidAction": "control",
+                "states": {"active": "state-1", "value": "state-2"},
+            }
+        }
+    }
+
+    assert get_event_uuids("", structure) is None
+    assert get_event_uuids("control, other", structure) == {
+        "control",
+        "state-1",
+        "state-2",
+        "other",
+    }
+
+
+def test_state_event_data() -> None:
+    coordinator = SimpleNamespace(_fire_state_events=True, _event_uuids=None)
+    data = {"state-1": 1.0, "state-2": 2.0}
+
+    assert LoxoneCoordinator.state_event_data(coordinator, data) is data
+
+    coordinator._event_uuids = frozenset({"state-2"})
+    assert LoxoneCoordinator.state_event_data(coordinator, data) == {"state-2": 2.0}
+    assert LoxoneCoordinator.state_event_data(coordinator, {"state-1": 1.0}) is None
+
+    coordinator._fire_state_events = False
+    assert LoxoneCoordinator.state_event_data(coordinator, data) is None
+
+
+def test_state_filter_keeps_the_event_uuids() -> None:
+    filters = []
+    coordinator = SimpleNamespace(
+        state_uuids={"light-1"},
+        _state_filter_scheduled=False,
+        _fire_state_events=True,
+        _event_uuids=frozenset({"event-1"}),
+        config_entry=SimpleNamespace(
+            options={CONF_FILTER_UNUSED_STATES: True, CONF_FIRE_STATE_EVENTS: True}
+        ),
+        hass=SimpleNamespace(loop=SimpleNamespace(call_soon=lambda job: job())),
+        api=SimpleNamespace(set_state_filter=filters.append),
+    )
+    coordinator._apply_state_filter = lambda: LoxoneCoordinator._apply_state_filter(
+        coordinator
+    )
+
+    LoxoneCoordinator.async_register_state_uuids(coordinator, ["light-2"])
+
+    assert filters == [{"light-1", "light-2", "event-1"}]
@@ -0,0 +1,72 @@
+"""Tests for the store of the current state values."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from custom_components.loxone.pyloxone_api import state_store
+from custom_components.loxone.pyloxone_api.state_store import StateStore
+
+STRUCTURE = {
+    "controls": {
+        "control": {
+            "uuidAction": "control",
+            "states": {"value": "value-1", "text": "text-1"},
+        }
+    },
+    "globalStates": {"sunrise": "sunrise"},
+}
+
+
+def test_slots_are_assigned_from_the_structure() -> None:
+    store = StateStore.from_structure(STRUCTURE)
+
+    assert len(store) == 4
+    assert {store.slot(uuid) for uuid in ("control", "value-1", "sunrise")} <= set(
+        range(4)
+    )
+    assert store.get("value-1") is None
+    assert "value-1" not in store
+
+
+def test_values_and_texts_are_stored_separately() -> None:
+    store = StateStore.from_structure(STRUCTURE)
+
+    store.set_values(["value-1", "new"], [21.5, 1.0])
+    store.set_texts({"text-1": "on"})
+
+    assert store.get("value-1") == 21.5
+    assert store.get("text-1") == "on"
+    assert store.get("new") == 1.0
+    assert store.get("unknown", 0) == 0
+    assert len(store) == 5
+    values = store.values_array()
+    assert values[store.slot("value-1")] == 21.5
+    assert math.isnan(values[store.slot("sunrise")])
+
+
+def test_snapshot_and_diff() -> None:
+    store = StateStore.from_structure(STRUCTURE)
+    store.set_values(["value-1"], [1.0])
+    store.set_texts({"text-1": "off"})
+    snapshot = store.snapshot()
+
+    store.set_values(["value-1", "sunrise"], [2.0, 360.0])
+    store.set_texts({"text-1": "off"})
+
+    assert snapshot == {"value-1": 1.0, "text-1": "off"}
+    assert store.diff(snapshot) == {"value-1": 2.0, "sunrise": 360.0}
+    assert store.metrics()["values"] == 2
+
+
+@pytest.mark.skipif(state_store.np is None, reason="numpy is not installed")
+def test_numpy_values_are_written_in_bulk() -> None:
+    store = StateStore.from_structure(STRUCTURE)
+
+    store.set_values(
+        ["sunrise", "new", "value-1"], state_store.np.array([360.0, 1.0, 2.5])
+    )
+
+    assert store.snapshot() == {"sunrise": 360.0, "new": 1.0, "value-1": 2.5}
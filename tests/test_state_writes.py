@@ -0,0 +1,54 @@
+"""Tests for combining the state writes of an entity."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.loxone import LoxoneEntity
+
+
+def _entity(delay: float = 0.0) -> SimpleNamespace:
+    entity = SimpleNamespace(
+        _state_write_delay=delay, _state_write_handle=None, writes=0
+    )
+    entity.hass = SimpleNamespace(loop=asyncio.get_running_loop())
+
+    def async_write_ha_state():
+        entity.writes += 1
+
+    entity.async_write_ha_state = async_write_ha_state
+    entity._write_state = lambda: LoxoneEntity._write_state(entity)
+    return entity
+
+
+def _schedule(entity) -> None:
+    LoxoneEntity.async_schedule_state_write(entity)
+
+
+def test_updates_of_one_iteration_are_written_once() -> None:
+    async def run():
+        entity = _entity()
+        for _ in range(5):
+            _schedule(entity)
+        assert entity.writes == 0
+        await asyncio.sleep(0)
+        first = entity.writes
+        _schedule(entity)
+        await asyncio.sleep(0)
+        return first, entity.writes
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_updates_are_written_after_the_delay() -> None:
+    async def run():
+        entity = _entity(delay=0.02)
+        _schedule(entity)
+        await asyncio.sleep(0)
+        _schedule(entity)
+        before = entity.writes
+        await asyncio.sleep(0.05)
+        return before, entity.writes
+
+    assert asyncio.run(run()) == (0, 1)
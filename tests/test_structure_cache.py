@@ -0,0 +1,32 @@
+"""Tests for caching the structure file on disk."""
+
+from __future__ import annotations
+
+from custom_components.loxone.pyloxone_api.structure_cache import StructureCache
+
+SERIAL = "504F94A0B1C2"
+STRUCTURE = {
+    "lastModified": "2024-05-10 12:00:00",
+    "controls": {"switch-1": {"type": "Switch", "states": {"active": "active-1"}}},
+}
+
+
+def test_cached_structure_is_used_while_unchanged(tmp_path) -> None:
+    cache = StructureCache(str(tmp_path / "cache"))
+
+    assert cache.load(SERIAL, "2024-05-10 12:00:00") is None
+
+    cache.save(SERIAL, STRUCTURE)
+
+    cached = cache.load(SERIAL, "2024-05-10 12:00:00")
+    assert cached["lastModified"] == STRUCTURE["lastModified"]
+    assert dict(cached["controls"]) == STRUCTURE["controls"]
+    assert cache.load(SERIAL, "2024-06-01 08:00:00") is None
+    assert cache.load("other", "2024-05-10 12:00:00") is None
+
+
+def test_broken_cache_file_is_ignored(tmp_path) -> None:
+    cache = StructureCache(str(tmp_path))
+    (tmp_path / f"loxone_{SERIAL}_LoxAPP3.snapshot").write_bytes(b"LXSNAP")
+
+    assert cache.load(SERIAL, "2024-05-10 12:00:00") is None
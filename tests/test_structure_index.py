@@ -0,0 +1,70 @@
+"""Tests for the lookup tables of the structure file."""
+
+from __future__ import annotations
+
+from custom_components.loxone.pyloxone_api.structure_index import StructureIndex
+
+STRUCTURE = {
+    "rooms": {"room-1": {"name": "Kitchen"}},
+    "cats": {"cat-1": {"name": "Lights"}},
+    "controls": {
+        "switch-1": {
+            "type": "Switch",
+            "room": "room-1",
+            "states": {"active": "switch-1-active"},
+        },
+        "jalousie-1": {"type": "Jalousie", "states": {"position": "jalousie-pos"}},
+        "switch-2": {"type": "TimedSwitch", "states": {"deactivationDelay": "td"}},
+        "controller": {
+            "type": "LightControllerV2",
+            "cat": "cat-1",
+            "states": {"moodList": "moods", "activeMoods": ["mood-1", "mood-2"]},
+            "subControls": {
+                "controller/dimmer": {
+                    "type": "Dimmer",
+                    "states": {"position": "dimmer-pos"},
+                }
+            },
+        },
+    },
+}
+
+
+def test_get_all_keeps_the_structure_file_order() -> None:
+    index = StructureIndex(STRUCTURE)
+    controls = STRUCTURE["controls"]
+
+    assert index.get_all("Switch") == [controls["switch-1"]]
+    assert index.get_all(["TimedSwitch", "Switch"]) == [
+        controls["switch-1"],
+        controls["switch-2"],
+    ]
+    assert index.get_all("Unknown") == []
+    assert index.get_all(["Switch"])[0] is controls["switch-1"]
+
+
+def test_lookups() -> None:
+    index = StructureIndex(STRUCTURE)
+    controller = STRUCTURE["controls"]["controller"]
+    dimmer = controller["subControls"]["controller/dimmer"]
+
+    assert index.control("controller/dimmer") is dimmer
+    assert index.state_owner("dimmer-pos") == (dimmer, "position")
+    assert index.state_owner("mood-2") == (controller, "activeMoods")
+    assert index.state_owner("unknown") is None
+    assert index.room_name("room-1") == "Kitchen"
+    assert index.cat_name("cat-1") == "Lights"
+    assert index.room_name("unknown") == ""
+    assert index.state_uuids("controller") == {
+        "moods",
+        "mood-1",
+        "mood-2",
+        "dimmer-pos",
+    }
+
+
+def test_empty_structure() -> None:
+    index = StructureIndex(None)
+
+    assert index.get_all(["Switch"]) == []
+    assert index.control("switch-1") is None
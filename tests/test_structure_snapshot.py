@@ -0,0 +1,91 @@
+"""Tests for the compact snapshot of the structure file."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.loxone.pyloxone_api.helper import get_state_uuids
+from custom_components.loxone.pyloxone_api.structure_index import StructureIndex
+from custom_components.loxone.pyloxone_api.structure_snapshot import (
+    close_snapshot,
+    dump_snapshot,
+    load_snapshot,
+    open_snapshot,
+    snapshot_to_dict,
+)
+
+STRUCTURE = {
+    "lastModified": "2024-05-10 12:00:00",
+    "msInfo": {"serialNr": "504F94A0B1C2", "msName": "Haus"},
+    "globalStates": {"sunrise": "sunrise-1"},
+    "controls": {
+        "switch-1": {
+            "name": "Küche",
+            "type": "Switch",
+            "states": {"active": "active-1"},
+        },
+        "jalousie-1": {"type": "Jalousie", "states": {"position": "position-1"}},
+        "switch-2": {
+            "type": "Switch",
+            "states": {"active": "active-2"},
+            "subControls": {"sub-1": {"type": "Pushbutton", "states": {}}},
+        },
+    },
+}
+
+
+def test_snapshot_has_the_mapping_api_of_the_structure_file() -> None:
+    structure = load_snapshot(dump_snapshot(STRUCTURE))
+
+    assert structure["msInfo"] == STRUCTURE["msInfo"]
+    assert structure.get("missing", 1) == 1
+    assert "controls" in structure
+    controls = structure["controls"]
+    assert list(controls) == ["switch-1", "jalousie-1", "switch-2"]
+    assert "jalousie-1" in controls
+    assert controls["switch-1"] == STRUCTURE["controls"]["switch-1"]
+    assert snapshot_to_dict(structure) == STRUCTURE
+
+
+def test_controls_are_decoded_on_access() -> None:
+    structure = load_snapshot(dump_snapshot(STRUCTURE))
+    controls = structure["controls"]
+
+    assert sorted(get_state_uuids(structure)) == [
+        "active-1",
+        "active-2",
+        "position-1",
+        "sunrise-1",
+    ]
+    index = StructureIndex(structure)
+    assert controls.decoded == 0
+
+    switches = index.get_all("Switch")
+
+    assert [c["states"]["active"] for c in switches] == ["active-1", "active-2"]
+    assert controls.decoded == 2
+    switches[0]["room"] = "Kitchen"
+    assert controls["switch-1"]["room"] == "Kitchen"
+    assert controls.type_of("jalousie-1") == "Jalousie"
+
+
+def test_open_snapshot(tmp_path) -> None:
+    path = tmp_path / "structure.snapshot"
+    path.write_bytes(dump_snapshot(STRUCTURE))
+
+    structure = open_snapshot(str(path))
+
+    assert structure["controls"]["switch-2"] == STRUCTURE["controls"]["switch-2"]
+
+    close_snapshot(structure)
+
+    # Decoded controls stay readable, the others are gone with the file
+    assert structure["controls"]["switch-2"] == STRUCTURE["controls"]["switch-2"]
+    with pytest.raises(ValueError):
+        structure["controls"]["switch-1"]
+    close_snapshot(STRUCTURE)
+
+
+def test_invalid_snapshot() -> None:
+    with pytest.raises(ValueError):
+        load_snapshot(b'{"controls": {}}')